@@ -0,0 +1,183 @@
+"""Замеры производительности расчета типовых схем ГТУ (1B, 2N, 2NIH, 2V, 2VIH, 2NR) и функций расчета свойств
+рабочих тел, топлив, газодинамических функций и стандартной атмосферы. Результаты сохраняются в JSON для сравнения
+версий.
+
+Запуск: python benchmarks.py [-o results.json] [--repeat 5] [--compare old_results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from gas_turbine_cycle.gases import Air, KeroseneCombustionProducts, NaturalGasCombustionProducts
+from gas_turbine_cycle.fuels import NaturalGas
+from gas_turbine_cycle.tools.gas_dynamics import GasDynamicFunctions as gd
+from gas_turbine_cycle.tools import standard_atmosphere
+from gas_turbine_cycle.schemes import Schemes
+
+schemes = ['1B', '2N', '2NIH', '2V', '2VIH', '2NR']
+"Типовые схемы, сети которых строятся методами Schemes.get_<схема>_solver"
+
+
+def build_solver(scheme: str):
+    """Создает новую сеть схемы"""
+    return getattr(Schemes(), 'get_%s_solver' % scheme)()
+
+
+def get_trace_counts(scheme: str) -> dict:
+    """Число обновлений юнитов и вычислений свойств рабочих тел и топлив по трассе расчета"""
+    solver = build_solver(scheme)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(temp_dir, 'trace.json')
+        solver.solve(trace=filename)
+        with open(filename) as file:
+            trace_events = json.load(file)['traceEvents']
+    begin_events = [event for event in trace_events if event['ph'] == 'B']
+    return {
+        'update_calls': sum(1 for event in begin_events if event['cat'] == 'Unit'),
+        'property_calls': sum(1 for event in begin_events if event['cat'] == 'Property'),
+        'inner_loops': sum(1 for event in begin_events if event['cat'] == 'Loop')
+    }
+
+
+def get_peak_memory(scheme: str) -> int:
+    """Пиковый объем памяти, выделенной при создании и расчете сети, байт"""
+    tracemalloc.start()
+    try:
+        build_solver(scheme).solve()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_scheme(scheme: str, repeat: int) -> dict:
+    times = []
+    iter_number = None
+    for _ in range(repeat):
+        solver = build_solver(scheme)
+        start = time.perf_counter()
+        solver.solve()
+        times.append(time.perf_counter() - start)
+        iter_number = solver.iter_number
+    res = {
+        'time_min': min(times),
+        'time_median': statistics.median(times),
+        'iter_number': iter_number,
+        'peak_memory': get_peak_memory(scheme)
+    }
+    res.update(get_trace_counts(scheme))
+    return res
+
+
+def get_micro_benchmarks() -> dict:
+    """Функции для замеров: имя - функция без аргументов"""
+    air = Air()
+    kerosene_products = KeroseneCombustionProducts()
+    gas_products = NaturalGasCombustionProducts()
+    natural_gas = NaturalGas()
+    T_arr = np.linspace(300, 1600, 1000)
+    return {
+        'gases.Air.c_p_real_func': lambda: air.c_p_real_func(1000),
+        'gases.Air.c_p_av_int_func': lambda: air.c_p_av_int_func(300, 800),
+        'gases.Air.get_ad_temp': lambda: air.get_ad_temp(300, 1e5, 1e6),
+        'gases.KeroseneCombustionProducts.c_p_av_int_func': lambda: kerosene_products.c_p_av_int_func(
+            900, 1400, alpha=2.5),
+        'gases.NaturalGasCombustionProducts.c_p_real_func': lambda: gas_products.c_p_real_func(1400, alpha=2.5),
+        'gases.NaturalGasCombustionProducts.c_p_av_int_func': lambda: gas_products.c_p_av_int_func(
+            900, 1400, alpha=2.5),
+        'gases.NaturalGasCombustionProducts.c_p_av_int_func[1000]': lambda: gas_products.c_p_av_int_func(
+            T_arr, T_arr + 300, alpha=2.5),
+        'fuels.NaturalGas.get_specific_enthalpy': lambda: natural_gas.get_specific_enthalpy(288, p=2e6),
+        'gas_dynamics.pi_lam': lambda: gd.pi_lam(0.5, 1.33),
+        'gas_dynamics.lam': lambda: gd.lam(1.33, q=0.8),
+        'gas_dynamics.pi_lam[1000]': lambda: gd.pi_lam(T_arr / 2000, 1.33),
+        'standard_atmosphere.temperature': lambda: standard_atmosphere.temperature(5000),
+        'standard_atmosphere.pressure': lambda: standard_atmosphere.pressure(5000),
+    }
+
+
+def bench_function(func, repeat: int, min_time=0.1) -> dict:
+    """Время одного вызова функции: число вызовов в серии подбирается так, чтобы серия длилась не менее min_time"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return {'time_min': min(times), 'time_median': statistics.median(times), 'number': number}
+
+
+def get_metadata() -> dict:
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                           cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'revision': revision,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform()
+    }
+
+
+def run(repeat=5, scheme_list=None, micro=True) -> dict:
+    res = {'metadata': get_metadata(), 'schemes': {}, 'micro': {}}
+    for scheme in scheme_list or schemes:
+        res['schemes'][scheme] = bench_scheme(scheme, repeat)
+    if micro:
+        for name, func in get_micro_benchmarks().items():
+            res['micro'][name] = bench_function(func, repeat)
+    return res
+
+
+def format_results(res: dict, baseline: dict=None) -> str:
+    """Таблица результатов; при заданных результатах предыдущей версии выводится отношение времен"""
+    lines = ['%-8s %10s %10s %8s %9s %10s %12s %s' % ('scheme', 'time, ms', 'median', 'iter', 'updates',
+                                                       'props', 'memory, kB', 'ratio' if baseline else '')]
+    for scheme, values in res['schemes'].items():
+        ratio = ''
+        if baseline and scheme in baseline.get('schemes', {}):
+            ratio = '%.2f' % (values['time_min'] / baseline['schemes'][scheme]['time_min'])
+        lines.append('%-8s %10.2f %10.2f %8d %9d %10d %12.1f %s' % (
+            scheme, values['time_min'] * 1e3, values['time_median'] * 1e3, values['iter_number'],
+            values['update_calls'], values['property_calls'], values['peak_memory'] / 1024, ratio))
+    if res['micro']:
+        lines.append('')
+        lines.append('%-60s %12s %s' % ('function', 'time, us', 'ratio' if baseline else ''))
+        for name, values in res['micro'].items():
+            ratio = ''
+            if baseline and name in baseline.get('micro', {}):
+                ratio = '%.2f' % (values['time_min'] / baseline['micro'][name]['time_min'])
+            lines.append('%-60s %12.2f %s' % (name, values['time_min'] * 1e6, ratio))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of gas_turbine_cycle')
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help='JSON file for results')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions')
+    parser.add_argument('--schemes', nargs='*', default=schemes, choices=schemes, help='schemes to solve')
+    parser.add_argument('--no-micro', action='store_true', help='skip micro benchmarks')
+    parser.add_argument('--compare', help='JSON file with results of another version')
+    args = parser.parse_args(argv)
+    res = run(args.repeat, args.schemes, not args.no_micro)
+    with open(args.output, 'w') as file:
+        json.dump(res, file, indent=2)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print(format_results(res, baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import typing
+
+import numpy as np
+
+from .network_lib import Unit, Connection, ConnectionSet
+from .topology import get_writing_unit, get_reading_unit
+
+
+def get_tear_connections(unit_order: typing.List[Unit],
+                         connection_arr: typing.List[ConnectionSet]) -> typing.List[Connection]:
+    """Возвращает разрываемые связи - связи, значение в которых за проход по юнитам в порядке unit_order читается
+    раньше, чем пересчитывается, и потому берется с предыдущей итерации. Это давление в схемах с силовой
+    турбиной, передаваемое против потока, и связи контуров рециркуляции (например, температура газа за турбиной,
+    по которой рассчитывается холодная сторона регенератора). Связи, значение в которых задает юнит, не входящий
+    в unit_order, разрываемыми не считаются."""
+    position = {id(unit): n for n, unit in enumerate(unit_order)}
+    res = []
+    for conn_set in connection_arr:
+        for connection in conn_set.connections:
+            writer = position.get(id(get_writing_unit(connection)))
+            reader = position.get(id(get_reading_unit(connection)))
+            if writer is not None and reader is not None and reader <= writer:
+                res.append(connection)
+    return res
+
+
+class AndersonAccelerator:
+    """Ускорение схождения значений в разрываемых связях методом Андерсона. Проход по юнитам рассматривается как
+    отображение вектора значений в разрываемых связях в начале итерации x в вектор их значений в конце g(x).
+    Новое приближение - комбинация значений g на последних depth + 1 итерациях, коэффициенты которой
+    минимизируют невязку g(x) - x (метод наименьших квадратов). Разрываемые величины связаны между собой:
+    давление, передаваемое против потока через несколько юнитов, доходит до силовой турбины с запаздыванием
+    на несколько итераций, поэтому они ускоряются совместно, а не покомпонентно. Невязки отнесены к значениям
+    величин, поэтому давления и температуры входят в них равноправно. При пакетном расчете коэффициенты находятся
+    для каждого режима отдельно. Если невязка режима выросла по сравнению с предыдущей итерацией, для него
+    делается шаг простой итерации."""
+    depth = 3
+    "Число предыдущих итераций, используемых для построения приближения"
+    regularization = 1e-10
+    "Относительная регуляризация системы для коэффициентов комбинации"
+
+    def __init__(self, connections: typing.List[Connection]):
+        self.connections = connections
+        "Ускоряемые связи"
+        self._g_hist = []
+        self._f_hist = []
+        self._norm = None
+
+    def reset(self):
+        """Сбрасывает историю итераций"""
+        self._g_hist = []
+        self._f_hist = []
+        self._norm = None
+
+    def update(self):
+        """Уточняет значения в связях после прохода по юнитам. Значение в начале прохода берется из
+        previous_value связи, в конце - из value."""
+        number = len(self.connections)
+        values = [connection.previous_value for connection in self.connections] + \
+                 [connection.value for connection in self.connections]
+        if number == 0 or any(value is None for value in values):
+            self.reset()
+            return
+        values = np.array(np.broadcast_arrays(*values), dtype=float)
+        x, g = values[:number], values[number:]
+        finite = np.isfinite(x) & np.isfinite(g)
+        with np.errstate(invalid='ignore'):
+            f = np.where(finite, (g - x) / np.where(finite & (g != 0), np.abs(g), 1.), 0.)
+        norm = np.sqrt((f ** 2).sum(axis=0))
+        if self._norm is not None and np.shape(norm) != np.shape(self._norm):
+            self.reset()
+        growing = norm > self._norm if self._norm is not None else np.full(np.shape(norm), False)
+        self._norm = norm
+        self._g_hist = self._g_hist[-self.depth:] + [g]
+        self._f_hist = self._f_hist[-self.depth:] + [f]
+        if len(self._f_hist) < 2:
+            return
+        df = np.moveaxis(np.stack(np.diff(self._f_hist, axis=0), axis=-1), 0, -2)
+        dg = np.moveaxis(np.stack(np.diff(self._g_hist, axis=0), axis=-1), 0, -2)
+        a = np.einsum('...ki,...kj->...ij', df, df)
+        b = np.einsum('...ki,...k->...i', df, np.moveaxis(f, 0, -1))
+        trace = np.trace(a, axis1=-2, axis2=-1)[..., np.newaxis, np.newaxis]
+        a = a + (self.regularization * trace + np.finfo(float).tiny) * np.eye(a.shape[-1])
+        gamma = np.linalg.solve(a, b[..., np.newaxis])
+        new_values = np.where(finite & ~growing, g - np.moveaxis((dg @ gamma)[..., 0], -1, 0), g)
+        for connection, value in zip(self.connections, new_values):
+            connection.value = float(value) if np.ndim(value) == 0 else value
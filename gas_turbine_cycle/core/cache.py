@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import typing
+
+from .spec import NetworkSpec, _to_jsonable
+
+cache_version = 2
+"Версия формата записей кэша, входит в ключ"
+_model_hash = None
+
+
+def get_model_hash() -> str:
+    """Возвращает хэш исходного кода и табличных данных библиотеки. Входит в ключ кэша, поэтому любое изменение
+    модели (свойств рабочих тел, юнитов, решателя) делает старые записи недействительными."""
+    global _model_hash
+    if _model_hash is None:
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha256()
+        for directory, dir_names, file_names in os.walk(package_dir):
+            dir_names[:] = sorted(name for name in dir_names if name not in ('templates', '__pycache__'))
+            for file_name in sorted(file_names):
+                if file_name.endswith(('.py', '.csv')) and file_name != 'tests.py':
+                    path = os.path.join(directory, file_name)
+                    digest.update(os.path.relpath(path, package_dir).encode('utf-8'))
+                    with open(path, 'rb') as file:
+                        digest.update(file.read())
+        _model_hash = digest.hexdigest()
+    return _model_hash
+
+
+def get_spec_key(spec: NetworkSpec) -> str:
+    """Возвращает стабильный хэш описания сети: классов и параметров юнитов, включая незаданные параметры со
+    значениями по умолчанию, связей, параметров решателя (точность, коэффициент релаксации, рабочие тела) и
+    версии модели (get_model_hash)"""
+    spec_data = spec.to_dict()
+    for unit_data, unit_spec in zip(spec_data['units'], spec.units):
+        unit_data['params'] = {key: _to_jsonable(value) for key, value in unit_spec.get_resolved_params().items()}
+    data = json.dumps({'version': cache_version, 'model': get_model_hash(), 'spec': spec_data}, sort_keys=True,
+                      separators=(',', ':'), default=repr)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Кэш рассчитанных режимов на диске. Каждая запись хранится в отдельном файле, имя которого - хэш описания
+    сети (get_spec_key). Запись содержит выходные параметры, признак и число итераций сходимости и значения
+    во всех связях сети. При превышении max_size удаляются записи, к которым дольше всего не было обращений.
+    Записи пишутся атомарно, поэтому кэш можно использовать из нескольких процессов одновременно."""
+    suffix = '.pkl'
+
+    def __init__(self, directory: str, max_size: int=256 * 2**20):
+        """
+        :param directory: каталог кэша, создается при необходимости
+        :param max_size: максимальный суммарный размер записей, байт
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        "Число найденных записей"
+        self.misses = 0
+        "Число ненайденных записей"
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'max_size': self.max_size, 'hits': 0, 'misses': 0}
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _get_entries(self) -> typing.List[os.DirEntry]:
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(self.suffix)]
+
+    @property
+    def size(self) -> int:
+        """Суммарный размер записей, байт"""
+        return sum(entry.stat().st_size for entry in self._get_entries())
+
+    def __len__(self):
+        return len(self._get_entries())
+
+    def _load(self, key: str) -> typing.Optional[dict]:
+        try:
+            with open(self._get_path(key), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def get(self, key: str, outputs: typing.List[str]=()) -> typing.Optional[dict]:
+        """Возвращает запись или None, если записи нет или в ней нет хотя бы одного из выходных параметров outputs"""
+        entry = self._load(key)
+        if entry is None or any(output not in entry['outputs'] for output in outputs):
+            self.misses += 1
+            return None
+        try:
+            os.utime(self._get_path(key))
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, outputs: typing.Dict[str, typing.Any], converged: bool, iter_number: int, residual,
+            state: typing.List):
+        """Записывает режим. Выходные параметры дополняют параметры, уже сохраненные по этому ключу."""
+        previous = self._load(key)
+        if previous is not None:
+            outputs = dict(previous['outputs'], **outputs)
+        entry = {'outputs': outputs, 'converged': converged, 'iter_number': iter_number, 'residual': residual,
+                 'state': state}
+        path = self._get_path(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.evict(keep=path)
+
+    def evict(self, keep: str=None):
+        """Удаляет записи с наиболее давним обращением, пока суммарный размер превышает max_size.
+
+        :param keep: путь к записи, которая не удаляется
+        """
+        entries = []
+        for entry in self._get_entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        for entry in self._get_entries():
+            os.remove(entry.path)
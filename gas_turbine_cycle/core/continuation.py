@@ -0,0 +1,78 @@
+import typing
+
+from .spec import NetworkSpec
+from .sweep import PointResult, solve_point, get_default_outputs
+
+
+class ContinuationStep:
+    """Шаг продолжения по параметру"""
+    __slots__ = ('lam', 'converged', 'iter_number')
+
+    def __init__(self, lam: float, converged: bool, iter_number: int):
+        self.lam = lam
+        "Доля пути от начального режима к целевому"
+        self.converged = converged
+        "True, если расчет на шаге сошелся"
+        self.iter_number = iter_number
+        "Число внешних итераций на шаге"
+
+    def __repr__(self):
+        return 'ContinuationStep(%s, converged=%s, iter_number=%s)' % (self.lam, self.converged, self.iter_number)
+
+
+def get_intermediate_params(start: typing.Dict[str, typing.Any], target: typing.Dict[str, typing.Any],
+                            lam: float) -> typing.Dict[str, typing.Any]:
+    """Возвращает параметры режима, лежащего на доле пути lam от начального режима к целевому"""
+    if lam >= 1:
+        return dict(target)
+    return {key: start[key] + lam * (target[key] - start[key]) for key in target}
+
+
+def solve_continuation(spec: NetworkSpec, target: typing.Dict[str, typing.Any],
+                       start: typing.Dict[str, typing.Any]=None, outputs: typing.List[str]=None,
+                       initial_step=0.25, min_step=1e-3, max_step=1., step_growth=2.,
+                       steps: typing.List[ContinuationStep]=None) -> PointResult:
+    """Рассчитывает трудный режим продолжением по параметрам: от сошедшегося начального режима к целевому
+    с адаптивным шагом. Каждый шаг начинается от решения предыдущего шага. После успешного шага шаг
+    увеличивается в step_growth раз, после неудачного - уменьшается вдвое.
+
+    :param spec: описание сети
+    :param target: параметры целевого режима - словарь вида {'имя_юнита.параметр': значение}
+    :param start: параметры начального режима, по умолчанию значения из описания сети
+    :param outputs: выходные параметры, по умолчанию get_default_outputs(spec)
+    :param initial_step: начальный шаг по доле пути
+    :param min_step: минимальный шаг, при уменьшении шага ниже него расчет прекращается с ошибкой
+    :param max_step: максимальный шаг
+    :param step_growth: коэффициент увеличения шага после успешного шага
+    :param steps: если задан список, в него записываются сделанные шаги (ContinuationStep)
+    :return: результат для целевого режима; iter_number - суммарное число внешних итераций на всех шагах,
+            включая начальный режим и неудачные шаги
+    """
+    if outputs is None:
+        outputs = get_default_outputs(spec)
+    if start is None:
+        start = {key: spec.get_param(key) for key in target}
+    if steps is None:
+        steps = []
+    res = solve_point(spec, start, outputs, keep_state=True)
+    steps.append(ContinuationStep(0., res.converged, res.iter_number))
+    iter_number = res.iter_number
+    if not res.converged:
+        raise RuntimeError('Convergence is not obtained at the start point')
+    lam = 0.
+    step = initial_step
+    while lam < 1:
+        lam_new = min(1., lam + step)
+        step_res = solve_point(spec, get_intermediate_params(start, target, lam_new), outputs, keep_state=True,
+                               init_state=res.state)
+        steps.append(ContinuationStep(lam_new, step_res.converged, step_res.iter_number))
+        iter_number += step_res.iter_number
+        if step_res.converged:
+            lam = lam_new
+            res = step_res
+            step = min(max_step, step * step_growth)
+        else:
+            step /= 2
+            if step < min_step:
+                raise RuntimeError('Continuation step is less than minimal one at %s' % lam)
+    return PointResult(0, dict(target), res.outputs, True, iter_number, res.residual, res.state)
@@ -0,0 +1,298 @@
+from abc import ABCMeta, abstractmethod
+import enum
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import typing
+
+
+class EventPhase(enum.Enum):
+    """Фаза события"""
+    Begin = 0
+    "Начало интервала"
+    End = 1
+    "Конец интервала"
+    Instant = 2
+    "Мгновенное событие"
+
+
+class EventCategory(enum.Enum):
+    """Категория события"""
+    Solve = 0
+    "Расчет сети целиком"
+    Behaviour = 1
+    "Настройка типов портов"
+    Iteration = 2
+    "Внешняя итерация решателя"
+    Unit = 3
+    "Обновление юнита"
+    Loop = 4
+    "Внутренний итерационный цикл юнита"
+    Property = 5
+    "Вычисление свойств рабочего тела или топлива"
+
+
+class Event:
+    """Структурированное событие, передаваемое в приемники"""
+    __slots__ = ('phase', 'category', 'name', 'time', 'data')
+
+    def __init__(self, phase: EventPhase, category: EventCategory, name: str, time: float, data: dict):
+        self.phase = phase
+        "Фаза события"
+        self.category = category
+        "Категория события"
+        self.name = name
+        "Имя события"
+        self.time = time
+        "Момент времени события, с (time.perf_counter)"
+        self.data = data
+        "Дополнительные данные события"
+
+    def __repr__(self):
+        return 'Event(%s, %s, %s, %s)' % (self.phase.name, self.category.name, self.name, self.data)
+
+
+class EventSink(metaclass=ABCMeta):
+    """Приемник событий инструментирования"""
+
+    @abstractmethod
+    def emit(self, event: Event):
+        """Обрабатывает событие"""
+        pass
+
+    def close(self):
+        """Вызывается по окончании расчета для приемников, созданных решателем (параметры profile и trace
+        метода solve), и при вызове Instrumentation.close() для приемников, подключенных пользователем"""
+        pass
+
+
+class ListSink(EventSink):
+    """Сохраняет все события в списке"""
+    def __init__(self):
+        self.events: typing.List[Event] = []
+
+    def emit(self, event: Event):
+        self.events.append(event)
+
+    def get_events(self, category: EventCategory=None, phase: EventPhase=None) -> typing.List[Event]:
+        """Возвращает события заданной категории и фазы"""
+        return [event for event in self.events if (category is None or event.category == category) and
+                (phase is None or event.phase == phase)]
+
+
+class LoggingSink(EventSink):
+    """Передает события в logging. Форматирование строк выполняется только в этом приемнике."""
+    def __init__(self, logger: logging.Logger=None, level=logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self.level = level
+
+    def emit(self, event: Event):
+        self.logger.log(self.level, '%s %s %s %s', event.category.name, event.phase.name, event.name, event.data)
+
+
+class ChromeTraceSink(EventSink):
+    """Записывает события в файл формата Chrome Trace Event (chrome://tracing, Perfetto, speedscope)"""
+    _phases = {EventPhase.Begin: 'B', EventPhase.End: 'E', EventPhase.Instant: 'i'}
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._events: typing.List[Event] = []
+        self._tid: typing.List[int] = []
+
+    def emit(self, event: Event):
+        self._events.append(event)
+        self._tid.append(threading.get_ident())
+
+    @classmethod
+    def _get_args(cls, data: dict) -> dict:
+        res = {}
+        for key, value in data.items():
+            if isinstance(value, (bool, int, float, str)) or value is None:
+                res[key] = value
+            else:
+                res[key] = str(value)
+        return res
+
+    def get_trace(self) -> dict:
+        """Возвращает трассу в виде словаря"""
+        start_time = self._events[0].time if self._events else 0.
+        pid = os.getpid()
+        trace_events = []
+        for event, tid in zip(self._events, self._tid):
+            trace_event = {
+                'name': event.name,
+                'cat': event.category.name,
+                'ph': self._phases[event.phase],
+                'ts': (event.time - start_time) * 1e6,
+                'pid': pid,
+                'tid': tid,
+                'args': self._get_args(event.data)
+            }
+            if event.phase == EventPhase.Instant:
+                trace_event['s'] = 't'
+            trace_events.append(trace_event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def close(self):
+        with open(self.filename, 'w') as file:
+            json.dump(self.get_trace(), file)
+
+
+class Instrumentation:
+    """Рассылает события решателя по подключенным приемникам. Без приемников выключено, при этом
+    вызывающий код должен проверять атрибут enabled до формирования данных события."""
+    def __init__(self, sinks: typing.List[EventSink]=None):
+        self._sinks: typing.List[EventSink] = list(sinks) if sinks else []
+        self.enabled = len(self._sinks) != 0
+        "True, если подключен хотя бы один приемник"
+
+    @property
+    def sinks(self) -> typing.List[EventSink]:
+        return list(self._sinks)
+
+    def add_sink(self, sink: EventSink):
+        self._sinks.append(sink)
+        self.enabled = True
+
+    def remove_sink(self, sink: EventSink):
+        self._sinks.remove(sink)
+        self.enabled = len(self._sinks) != 0
+
+    def emit(self, phase: EventPhase, category: EventCategory, name: str, data: dict):
+        event = Event(phase, category, name, time.perf_counter(), data)
+        for sink in self._sinks:
+            sink.emit(event)
+
+    def begin(self, category: EventCategory, name: str, **data):
+        """Начало интервала"""
+        self.emit(EventPhase.Begin, category, name, data)
+
+    def end(self, category: EventCategory, name: str, **data):
+        """Конец интервала"""
+        self.emit(EventPhase.End, category, name, data)
+
+    def instant(self, category: EventCategory, name: str, **data):
+        """Мгновенное событие"""
+        self.emit(EventPhase.Instant, category, name, data)
+
+    def close(self):
+        """Закрывает подключенные приемники. Решатель этот метод не вызывает"""
+        for sink in self._sinks:
+            sink.close()
+
+
+_local = threading.local()
+
+
+def get_active_instrumentation() -> typing.Optional[Instrumentation]:
+    """Возвращает включенный объект инструментирования расчета, выполняемого в текущем потоке, или None.
+    Используется юнитами для создания событий внутренних циклов."""
+    return getattr(_local, 'instrumentation', None)
+
+
+def set_active_instrumentation(instrumentation: typing.Optional[Instrumentation]):
+    """Задает объект инструментирования для текущего потока. Возвращает предыдущее значение"""
+    previous = getattr(_local, 'instrumentation', None)
+    _local.instrumentation = instrumentation if instrumentation is not None and instrumentation.enabled else None
+    return previous
+
+
+class PropertyCallTracer:
+    """На время расчета подменяет в объектах рабочих тел и топлив методы вычисления свойств обертками,
+    создающими события категории Property. После detach() объекты возвращаются в исходное состояние."""
+    method_names = ('c_p_real_func', 'c_p_av_func', 'c_p_av_int_func', 'get_c_p_av', 'get_specific_enthalpy')
+
+    def __init__(self, instrumentation: Instrumentation):
+        self.instrumentation = instrumentation
+        self._wrapped: typing.List[typing.Tuple[object, str]] = []
+
+    def _wrap(self, method, name: str):
+        instrumentation = self.instrumentation
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            instrumentation.begin(EventCategory.Property, name)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                instrumentation.end(EventCategory.Property, name)
+        return wrapper
+
+    def attach(self, obj):
+        for method_name in self.method_names:
+            if hasattr(type(obj), method_name) and method_name not in obj.__dict__:
+                name = '%s.%s' % (type(obj).__name__, method_name)
+                setattr(obj, method_name, self._wrap(getattr(obj, method_name), name))
+                self._wrapped.append((obj, method_name))
+
+    def detach(self):
+        for obj, method_name in self._wrapped:
+            delattr(obj, method_name)
+        self._wrapped = []
+
+
+class UnitProfile:
+    """Профиль одного юнита"""
+    def __init__(self, unit, index: int):
+        self.unit = unit
+        self.index = index
+        "Номер юнита в отсортированном списке"
+        self.calls = 0
+        "Число вызовов update()"
+        self.time = 0.
+        "Суммарное время выполнения update(), с"
+        self.inner_iter_number = 0
+        "Суммарное число итераций внутренних циклов"
+
+    @property
+    def name(self) -> str:
+        return '%s[%s]' % (self.unit, self.index)
+
+    @property
+    def time_per_call(self):
+        return self.time / self.calls if self.calls else 0.
+
+    @property
+    def inner_iter_per_call(self):
+        return self.inner_iter_number / self.calls if self.calls else 0.
+
+
+class UnitProfiler(EventSink):
+    """Собирает по событиям обновления юнитов время, число вызовов и число итераций внутренних циклов"""
+    def __init__(self):
+        self._profiles: typing.Dict[int, UnitProfile] = {}
+        self._start_time: typing.Dict[int, float] = {}
+
+    def emit(self, event: Event):
+        if event.category != EventCategory.Unit:
+            return
+        key = id(event.data['unit'])
+        if event.phase == EventPhase.Begin:
+            self._start_time[key] = event.time
+        elif event.phase == EventPhase.End:
+            if key not in self._profiles:
+                self._profiles[key] = UnitProfile(event.data['unit'], event.data['index'])
+            profile = self._profiles[key]
+            profile.calls += 1
+            profile.time += event.time - self._start_time.pop(key)
+            profile.inner_iter_number += event.data['inner_iter_number']
+
+    def get_table(self) -> typing.List[UnitProfile]:
+        """Возвращает профили юнитов в порядке их расчета"""
+        return sorted(self._profiles.values(), key=lambda profile: profile.index)
+
+    def get_total_time(self):
+        return sum(profile.time for profile in self._profiles.values())
+
+    def __str__(self):
+        total_time = self.get_total_time()
+        lines = ['%-28s %7s %10s %10s %7s %8s' % ('unit', 'calls', 'time, ms', 'ms/call', 'share', 'inner')]
+        for profile in self.get_table():
+            lines.append('%-28s %7d %10.3f %10.4f %6.1f%% %8d' % (
+                profile.name, profile.calls, profile.time * 1e3, profile.time_per_call * 1e3,
+                100 * profile.time / total_time if total_time else 0., profile.inner_iter_number
+            ))
+        return '\n'.join(lines)
@@ -1,14 +1,28 @@
 from abc import ABCMeta, abstractmethod
 import enum
 import typing
+import numpy as np
 
 
 class Unit:
+    max_inner_iter_number = 100
+    """Наибольшее число итераций внутренних циклов юнита; при его превышении (например, из-за значений nan во
+    входных параметрах) возбуждается RuntimeError"""
+    direct_feedthrough = True
+    """True, если значения в выходных портах юнита зависят от значений во входных портах. Юниты без прямой
+    передачи (граничные условия) не замыкают контуры в графе зависимостей сети."""
+
     def __init__(self):
         self.input_ports: typing.List[Port] = []
         "Список входных портов"
         self.output_ports: typing.List[Port] = []
         "Список выходных портов"
+        self._inner_iter_number = 0
+
+    @property
+    def inner_iter_number(self):
+        """Число итераций внутренних циклов при последнем вызове update()"""
+        return self._inner_iter_number
 
     def __str__(self):
         return self.__class__.__name__
@@ -85,7 +99,10 @@ class Connection:
         self.previous_value = self.value
 
     def get_residual(self):
-        """Возврат значения невязки"""
+        """Возврат значения невязки. При пакетном расчете (значения - массивы) возвращается максимальная
+        по элементам невязка"""
+        if isinstance(self.value, np.ndarray) or isinstance(self.previous_value, np.ndarray):
+            return self._get_array_residual()
         if self.value is not None and self.previous_value is not None and self.value != 0 and self.previous_value != 0:
             return abs(self.value - self.previous_value) / self.value
         elif self.value is not None and self.previous_value is not None and self.value == 0 \
@@ -94,9 +111,21 @@ class Connection:
         else:
             return 1
 
+    def _get_array_residual(self):
+        if self.value is None or self.previous_value is None:
+            return 1
+        value, previous_value = np.broadcast_arrays(self.value, self.previous_value)
+        nonzero = (value != 0) & (previous_value != 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            res = np.where(nonzero, np.abs(value - previous_value) / value,
+                           np.where((value == 0) & (previous_value == 0), 0., 1.))
+        res[np.isnan(res)] = 0.
+        return float(res.max())
+
     def update_current_state(self, relax_coef=1):
-        """Пересчитывает текущее значение с учетом релаксации"""
-        if self.value is not None and self.previous_value is not None:
+        """Пересчитывает текущее значение с учетом релаксации. Без релаксации (relax_coef = 1) значение не
+        меняется, в том числе бесконечное (коэффициент избытка воздуха чистого воздуха)."""
+        if relax_coef != 1 and self.value is not None and self.previous_value is not None:
             self.value = self.previous_value + relax_coef * (self.value - self.previous_value)
 
 
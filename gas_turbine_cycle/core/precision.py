@@ -0,0 +1,145 @@
+import itertools
+import time
+import typing
+
+import numpy as np
+
+from .spec import NetworkSpec, solver_params, unit_types
+from .sweep import solve_point
+
+precision_unit_types = ('Turbine', 'CombustionChamber')
+"Классы юнитов, имеющие собственную точность расчета"
+
+
+def get_setting_params(spec: NetworkSpec, key: str) -> typing.List[str]:
+    """Возвращает ключи параметров описания сети, задаваемых настройкой точности. Настройка задается именем
+    класса юнита из precision_unit_types (точность всех юнитов этого класса), параметром решателя
+    ('precision', 'max_iter_number') или ключом вида 'имя_юнита.precision'. Для классов юнитов без собственной
+    точности расчета (например, Compressor, FullExtensionNozzle) возбуждается ValueError."""
+    if key in precision_unit_types:
+        return ['%s.precision' % unit_spec.name for unit_spec in spec.units if unit_spec.unit_type == key]
+    if key in unit_types:
+        raise ValueError('Units of type %s have no inner precision, precision unit types are %s' %
+                         (key, ', '.join(precision_unit_types)))
+    if key in solver_params:
+        return [key]
+    name, param = key.split('.', 1) if '.' in key else (key, None)
+    unit_spec = spec.get_unit_spec(name)
+    if param == 'precision' and unit_spec.unit_type not in precision_unit_types:
+        raise ValueError('Unit %s of type %s has no inner precision' % (name, unit_spec.unit_type))
+    return [key]
+
+
+def get_reference_spec(spec: NetworkSpec, precision=1e-6, max_iter_number=500) -> NetworkSpec:
+    """Возвращает описание сети с точностью решателя и всех юнитов, равной precision"""
+    params = {'precision': precision, 'max_iter_number': max(spec.max_iter_number, max_iter_number)}
+    for unit_type in precision_unit_types:
+        params.update({key: precision for key in get_setting_params(spec, unit_type)})
+    return spec.replace(params)
+
+
+class PrecisionTrial:
+    """Результат расчета сети с одним набором настроек точности"""
+    __slots__ = ('settings', 'converged', 'time', 'iter_number', 'outputs', 'errors')
+
+    def __init__(self, settings: typing.Dict[str, typing.Any], converged: bool, time: float, iter_number: int,
+                 outputs: typing.Dict[str, typing.Any], errors: typing.Dict[str, float]):
+        self.settings = settings
+        "Настройки точности"
+        self.converged = converged
+        "True, если расчет сошелся"
+        self.time = time
+        "Время создания и расчета сети, с"
+        self.iter_number = iter_number
+        "Число внешних итераций"
+        self.outputs = outputs
+        "Значения выходных параметров"
+        self.errors = errors
+        "Относительные погрешности выходных параметров по сравнению с эталонным расчетом"
+
+    @property
+    def max_error(self) -> float:
+        return max(self.errors.values()) if self.converged else np.inf
+
+    def __repr__(self):
+        return 'PrecisionTrial(%s, time=%.4g, max_error=%.3g)' % (self.settings, self.time, self.max_error)
+
+
+class PrecisionExploration:
+    """Таблица погрешности и стоимости расчета для матрицы настроек точности"""
+    def __init__(self, reference: typing.Dict[str, typing.Any], reference_time: float,
+                 trials: typing.List[PrecisionTrial]):
+        self.reference = reference
+        "Значения выходных параметров в эталонном расчете"
+        self.reference_time = reference_time
+        "Время эталонного расчета, с"
+        self.trials = trials
+        "Расчеты с настройками из матрицы"
+
+    def recommend(self, tolerance: float, outputs: typing.List[str]=None) -> typing.Optional[PrecisionTrial]:
+        """Возвращает самый быстрый из сошедшихся расчетов, относительная погрешность выходных параметров
+        outputs (по умолчанию всех) в котором не превышает tolerance, или None, если таких расчетов нет"""
+        if outputs is None:
+            outputs = list(self.reference.keys())
+        suitable = [trial for trial in self.trials if trial.converged and
+                    all(trial.errors[output] <= tolerance for output in outputs)]
+        if not suitable:
+            return None
+        return min(suitable, key=lambda trial: trial.time)
+
+    def __str__(self):
+        keys = list(self.trials[0].settings.keys()) if self.trials else []
+        outputs = list(self.reference.keys())
+        header = keys + ['time, ms', 'iter'] + ['err %s' % output for output in outputs]
+        widths = [max(len(name), 9) + 2 for name in header]
+        lines = [''.join(name.rjust(width) for name, width in zip(header, widths))]
+        for trial in sorted(self.trials, key=lambda trial: trial.time):
+            values = [('%.3g' % trial.settings[key]) for key in keys]
+            values += ['%.3f' % (trial.time * 1e3), '%d' % trial.iter_number]
+            values += [('%.3g' % trial.errors[output]) if trial.converged else '-' for output in outputs]
+            lines.append(''.join(value.rjust(width) for value, width in zip(values, widths)))
+        return '\n'.join(lines)
+
+
+def _time_solve(spec: NetworkSpec, outputs: typing.List[str], repeat: int):
+    best_time = None
+    res = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = solve_point(spec, {}, outputs)
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return res, best_time
+
+
+def explore_precision(spec: NetworkSpec, settings: typing.Dict[str, typing.Sequence],
+                      outputs: typing.List[str]=('efficiency', 'specific_power'), reference_precision=1e-6,
+                      repeat=1) -> PrecisionExploration:
+    """Рассчитывает сеть для всех сочетаний настроек точности и сравнивает результаты с эталонным расчетом,
+    в котором точность решателя и всех юнитов равна reference_precision.
+
+    :param spec: описание сети
+    :param settings: значения настроек, например {'CombustionChamber': [1e-2, 1e-3], 'Turbine': [1e-2, 1e-3],
+            'precision': [1e-2, 1e-3], 'max_iter_number': [10, 50]}; ключи описаны в get_setting_params
+    :param outputs: выходные параметры, по погрешности которых оцениваются настройки
+    :param reference_precision: точность эталонного расчета
+    :param repeat: число повторений каждого расчета; время расчета - наименьшее из повторений
+    """
+    outputs = list(outputs)
+    reference_res, reference_time = _time_solve(get_reference_spec(spec, reference_precision), outputs, repeat)
+    if not reference_res.converged:
+        raise RuntimeError('Convergence is not obtained in the reference solution')
+    reference = reference_res.outputs
+    keys = list(settings.keys())
+    params_keys = {key: get_setting_params(spec, key) for key in keys}
+    trials = []
+    for values in itertools.product(*[settings[key] for key in keys]):
+        params = {}
+        for key, value in zip(keys, values):
+            params.update({param: value for param in params_keys[key]})
+        res, trial_time = _time_solve(spec.replace(params), outputs, repeat)
+        errors = {output: abs(res.outputs[output] - reference[output]) / abs(reference[output])
+                  for output in outputs}
+        trials.append(PrecisionTrial(dict(zip(keys, values)), res.converged, trial_time, res.iter_number,
+                                     res.outputs, errors))
+    return PrecisionExploration(reference, reference_time, trials)
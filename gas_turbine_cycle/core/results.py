@@ -0,0 +1,247 @@
+from concurrent.futures import Executor
+import json
+import os
+import typing
+
+import numpy as np
+
+from .sweep import PointResult, iter_solve_indexed, get_default_outputs, point_orders
+from .spec import NetworkSpec
+from .cache import ResultCache
+
+info_columns = [('index', 'i8'), ('converged', '?'), ('iter_number', 'i4'), ('residual', 'f8')]
+"Служебные колонки хранилища: номер режима, признак сходимости, число итераций, невязка"
+
+
+class ResultStore:
+    """Колоночное хранилище результатов расчета режимов. Каждая колонка (служебные колонки, параметры режимов
+    и выходные параметры) хранится в отдельном двоичном файле каталога, описание колонок и число записанных строк -
+    в файле meta.json. Строки дописываются в конец, колонки читаются через np.memmap без загрузки в память.
+
+    Число строк в meta.json обновляется после записи данных, поэтому при аварийном завершении записи хранилище
+    остается согласованным: недописанные строки отбрасываются при следующем открытии."""
+    meta_file = 'meta.json'
+    column_suffix = '.bin'
+
+    def __init__(self, directory: str, inputs: typing.List[str]=None, outputs: typing.List[str]=None,
+                 buffer_size=1024, state_size: int=None):
+        """
+        :param directory: каталог хранилища; если он содержит хранилище, оно открывается для чтения и дозаписи
+        :param inputs: числовые параметры режимов, по умолчанию - ключи params первого записанного результата
+        :param outputs: выходные параметры, по умолчанию - ключи outputs первого записанного результата
+        :param buffer_size: число строк, накапливаемых в памяти перед записью на диск
+        :param state_size: число связей сети; если задано, в колонку state записываются значения во всех связях
+                (PointResult.state), по которым можно начать расчет близкого режима
+        """
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self._buffer: typing.List[PointResult] = []
+        self._columns: typing.List[typing.Tuple[str, str]] = None
+        self._inputs: typing.List[str] = None
+        self._outputs: typing.List[str] = None
+        self._length = 0
+        self._state_size = state_size
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self._get_meta_path()):
+            self._read_meta()
+            for name, _ in self._columns:
+                self._truncate(name)
+        elif inputs is not None and outputs is not None:
+            self._init_columns(inputs, outputs)
+
+    def _get_meta_path(self):
+        return os.path.join(self.directory, self.meta_file)
+
+    def _get_column_path(self, name: str):
+        return os.path.join(self.directory, name + self.column_suffix)
+
+    def _init_columns(self, inputs: typing.List[str], outputs: typing.List[str]):
+        names = [name for name, _ in info_columns]
+        for name in list(inputs) + list(outputs):
+            assert name not in names, 'Column %s is duplicated' % name
+            names.append(name)
+        self._inputs = list(inputs)
+        self._outputs = list(outputs)
+        self._columns = info_columns + [(name, 'f8') for name in self._inputs + self._outputs]
+        if self._state_size is not None:
+            self._columns.append(('state', '(%d,)f8' % self._state_size))
+        self._write_meta()
+
+    def _read_meta(self):
+        with open(self._get_meta_path()) as file:
+            meta = json.load(file)
+        self._inputs = meta['inputs']
+        self._outputs = meta['outputs']
+        self._columns = [tuple(column) for column in meta['columns']]
+        self._length = meta['length']
+        self._state_size = meta['state_size']
+
+    def _write_meta(self):
+        meta = {'inputs': self._inputs, 'outputs': self._outputs, 'columns': self._columns, 'length': self._length,
+                'state_size': self._state_size}
+        temp_path = self._get_meta_path() + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(meta, file)
+        os.replace(temp_path, self._get_meta_path())
+
+    def _truncate(self, name: str):
+        """Отбрасывает данные колонки, записанные после последнего обновления meta.json"""
+        path = self._get_column_path(name)
+        size = self._length * np.dtype(dict(self._columns)[name]).itemsize
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+        if os.path.getsize(path) > size:
+            with open(path, 'r+b') as file:
+                file.truncate(size)
+
+    @property
+    def inputs(self) -> typing.List[str]:
+        return list(self._inputs) if self._inputs is not None else []
+
+    @property
+    def outputs(self) -> typing.List[str]:
+        return list(self._outputs) if self._outputs is not None else []
+
+    @property
+    def state_size(self) -> typing.Optional[int]:
+        return self._state_size
+
+    @property
+    def columns(self) -> typing.List[str]:
+        return [name for name, _ in self._columns] if self._columns is not None else []
+
+    def __len__(self):
+        """Число строк, записанных на диск"""
+        return self._length
+
+    def append(self, result: PointResult):
+        """Добавляет результат расчета режима в буфер. При заполнении буфера строки записываются на диск."""
+        if self._columns is None:
+            self._init_columns(sorted(result.params.keys()), list(result.outputs.keys()))
+        self._buffer.append(result)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def extend(self, results: typing.Iterable[PointResult]):
+        for result in results:
+            self.append(result)
+
+    def _get_buffer_column(self, name: str, dtype: str) -> np.ndarray:
+        if name in self._inputs:
+            values = [result.params.get(name, np.nan) for result in self._buffer]
+        elif name in self._outputs:
+            values = [result.outputs[name] for result in self._buffer]
+        elif name == 'state':
+            values = [[np.nan] * self._state_size if result.state is None else
+                      [np.nan if value is None else value for value in result.state] for result in self._buffer]
+        else:
+            values = [getattr(result, name) for result in self._buffer]
+            if name == 'residual':
+                values = [np.nan if value is None else value for value in values]
+        dtype = np.dtype(dtype)
+        return np.array(values, dtype=dtype.base).reshape((len(values),) + dtype.shape)
+
+    def flush(self):
+        """Записывает буфер на диск"""
+        if not self._buffer:
+            return
+        for name, dtype in self._columns:
+            with open(self._get_column_path(name), 'ab') as file:
+                self._get_buffer_column(name, dtype).tofile(file)
+        self._length += len(self._buffer)
+        self._buffer = []
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Возвращает колонку в виде np.memmap (только для чтения). Колонка state - двумерная."""
+        if self._columns is None or name not in self.columns:
+            raise KeyError('Column %s is not found' % name)
+        dtype = dict(self._columns)[name]
+        if self._length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._get_column_path(name), dtype=dtype, mode='r', shape=(self._length,))
+
+    def to_structured_array(self, columns: typing.List[str]=None) -> np.ndarray:
+        """Возвращает заданные колонки (по умолчанию все) в виде структурированного массива в памяти"""
+        if columns is None:
+            columns = self.columns
+        dtypes = dict(self._columns)
+        res = np.zeros(self._length, dtype=[(name, dtypes[name]) for name in columns])
+        for name in columns:
+            res[name] = self[name]
+        return res
+
+
+def get_state(store: ResultStore, row: int) -> typing.List:
+    """Возвращает значения в связях из строки хранилища в виде, пригодном для NetworkSolver.set_connections_state"""
+    return [None if np.isnan(value) else float(value) for value in store['state'][row]]
+
+
+class NearestSolutionFinder:
+    """Поиск ближайшего по параметрам режима сошедшегося решения в хранилище. Параметры нормируются
+    на диапазоны их изменения, чтобы вклад всех параметров в расстояние был сопоставим."""
+    def __init__(self, store: ResultStore, inputs: typing.List[str], scale: np.ndarray):
+        from scipy.spatial import cKDTree
+        self.store = store
+        self.inputs = inputs
+        self.scale = scale
+        converged = np.array(store['converged']) if len(store) else np.zeros(0, dtype=bool)
+        self.rows = np.nonzero(converged)[0]
+        self.tree = None
+        if len(self.rows):
+            coords = np.column_stack([np.array(store[name])[self.rows] for name in inputs]) / scale
+            self.tree = cKDTree(coords)
+
+    def find(self, params: typing.Dict[str, typing.Any]) -> typing.Optional[typing.List]:
+        """Возвращает значения в связях для ближайшего решения или None, если решений нет"""
+        if self.tree is None:
+            return None
+        _, n = self.tree.query(np.array([params[name] for name in self.inputs], dtype=float) / self.scale)
+        return get_state(self.store, self.rows[n])
+
+
+def run_sweep(spec: NetworkSpec, points: typing.Sequence[typing.Dict[str, typing.Any]], directory: str,
+              outputs: typing.List[str]=None, workers: int=None, executor: Executor=None, chunk_size=16,
+              checkpoint_interval=64, cache: ResultCache=None, warm_start=True, order: str=None) -> ResultStore:
+    """Рассчитывает режимы с записью результатов в хранилище ResultStore в каталоге directory. Результаты
+    сбрасываются на диск каждые checkpoint_interval режимов, а также при прерывании расчета. При повторном
+    запуске с тем же каталогом уже рассчитанные режимы пропускаются, а остальные начинаются от ближайшего по
+    параметрам сохраненного решения.
+
+    :param points: последовательность режимов с одинаковым набором числовых параметров
+    :param warm_start: если True, каждый режим порции начинается от решения для предыдущего режима, а первый
+            режим порции при продолжении расчета - от ближайшего сохраненного решения
+    :param order: порядок расчета режимов (см. iter_solve)
+    :return: хранилище результатов
+    """
+    if outputs is None:
+        outputs = get_default_outputs(spec)
+    inputs = sorted(points[0].keys()) if len(points) else []
+    solver, _ = spec.build()
+    store = ResultStore(directory, inputs, outputs, buffer_size=checkpoint_interval,
+                        state_size=len(solver.get_connections_state()))
+    assert store.inputs == inputs and all(output in store.outputs for output in outputs), \
+        'Results store in %s was created for another sweep' % directory
+    done = set(np.array(store['index']).tolist()) if len(store) else set()
+    finder = None
+    if warm_start and len(store):
+        values = np.array([[point[name] for name in inputs] for point in points], dtype=float)
+        scale = values.max(axis=0) - values.min(axis=0) if len(values) else np.ones(len(inputs))
+        scale[scale == 0] = 1
+        finder = NearestSolutionFinder(store, inputs, scale)
+    indices = point_orders[order](points) if order is not None and len(points) else range(len(points))
+    pending_points = ((index, points[index], finder.find(points[index]) if finder is not None else None)
+                      for index in indices if index not in done)
+    with store:
+        store.extend(iter_solve_indexed(spec, pending_points, store.outputs, workers, executor, chunk_size,
+                                        keep_state=True, cache=cache, warm_start=warm_start))
+    return store
@@ -0,0 +1,130 @@
+from concurrent.futures import Executor
+import typing
+
+import numpy as np
+
+from .spec import NetworkSpec
+from .precision import precision_unit_types
+from .sweep import solve_point, iter_solve_indexed
+
+
+param_bounds = {
+    'sigma': (0, 1), 'sigma_comb': (0, 1), 'sigma_cold': (0, 1), 'sigma_hot': (0, 1),
+    'eta_stag_p': (0, 1), 'eta_m': (0, 1), 'eta_r': (0, 1), 'eta_burn': (0, 1), 'phi': (0, 1),
+    'regeneration_rate': (0, 1), 'g_cooling': (0, 1), 'g_outflow': (0, 1), 'g_return': (0, 1),
+    'pi_c': (1, None)
+}
+"Допустимые диапазоны параметров юнитов по имени параметра, None - без ограничения"
+
+
+def get_param_bounds(name: str) -> typing.Tuple:
+    """Возвращает допустимый диапазон входного параметра вида 'имя_юнита.параметр'"""
+    return param_bounds.get(name.split('.', 1)[-1], (None, None))
+
+
+def _clip(value, bounds: typing.Tuple):
+    lower, upper = bounds
+    if lower is not None:
+        value = max(lower, value)
+    if upper is not None:
+        value = min(upper, value)
+    return value
+
+
+def get_solver_precision(spec: NetworkSpec) -> float:
+    """Возвращает наибольшую из точностей решателя сети и внутренних циклов юнитов. Этой величиной
+    оценивается относительная погрешность выходных параметров."""
+    res = spec.precision
+    for unit_spec in spec.units:
+        if unit_spec.unit_type in precision_unit_types:
+            res = max(res, spec.get_param('%s.precision' % unit_spec.name))
+    return res
+
+
+def get_rel_step(spec: NetworkSpec) -> float:
+    """Возвращает относительный шаг центральной разности. Для погрешности функции eps шаг, минимизирующий
+    сумму погрешностей усечения и округления, пропорционален eps ** (1 / 3)."""
+    return float(np.clip(get_solver_precision(spec) ** (1 / 3), 1e-4, 0.05))
+
+
+class Sensitivities:
+    """Таблица производных выходных параметров по входным параметрам"""
+    def __init__(self, outputs: typing.List[str], inputs: typing.List[str], base_outputs: typing.Dict[str, float],
+                 base_inputs: typing.Dict[str, float], steps: typing.Dict[str, float], derivatives: np.ndarray):
+        self.outputs = outputs
+        "Выходные параметры, строки таблицы"
+        self.inputs = inputs
+        "Входные параметры, столбцы таблицы"
+        self.base_outputs = base_outputs
+        "Выходные параметры в базовом режиме"
+        self.base_inputs = base_inputs
+        "Входные параметры в базовом режиме"
+        self.steps = steps
+        "Шаги по входным параметрам"
+        self.derivatives = derivatives
+        "Производные, массив размера (число выходных параметров, число входных параметров)"
+
+    def get(self, output: str, input: str) -> float:
+        """Производная выходного параметра по входному"""
+        return self.derivatives[self.outputs.index(output), self.inputs.index(input)]
+
+    @property
+    def elasticities(self) -> np.ndarray:
+        """Коэффициенты влияния: относительное изменение выходного параметра на относительное изменение
+        входного параметра, d(ln y) / d(ln x)"""
+        x = np.array([self.base_inputs[name] for name in self.inputs], dtype=float)
+        y = np.array([self.base_outputs[name] for name in self.outputs], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.derivatives * x[np.newaxis, :] / y[:, np.newaxis]
+
+    def __str__(self):
+        output_width = max(len(name) for name in self.outputs)
+        widths = [max(len(name), 11) + 2 for name in self.inputs]
+        lines = [' ' * output_width + ''.join(name.rjust(width) for name, width in zip(self.inputs, widths))]
+        for n, output in enumerate(self.outputs):
+            lines.append(output.ljust(output_width) + ''.join(('%.5g' % value).rjust(width)
+                                                              for value, width in zip(self.derivatives[n], widths)))
+        return '\n'.join(lines)
+
+
+def sensitivities(spec: NetworkSpec, outputs: typing.List[str], inputs: typing.List[str],
+                  rel_step: float=None, workers: int=None, executor: Executor=None) -> Sensitivities:
+    """Вычисляет производные выходных параметров по входным параметрам центральными разностями. Возмущенные
+    режимы (по два на входной параметр) рассчитываются от решения для базового режима, при задании workers или
+    executor - параллельно. Возмущенные значения ограничиваются допустимым диапазоном параметра (см.
+    param_bounds), например коэффициент сохранения давления не превышает 1; у границы диапазона разность
+    становится несимметричной или односторонней.
+
+    :param spec: описание сети в базовом режиме
+    :param outputs: выходные параметры, например ['efficiency', 'specific_power', 'outlet.T_stag_out']
+    :param inputs: входные параметры, например ['compressor.eta_stag_p', 'inlet.sigma', 'compressor.pi_c',
+            'comb_chamber.T_gas', 'sink.g_cooling']
+    :param rel_step: относительный шаг, по умолчанию get_rel_step(spec); для нулевых параметров шаг абсолютный
+    :param workers: число процессов
+    :param executor: пул, в котором выполняются расчеты возмущенных режимов
+    """
+    base = solve_point(spec, {}, outputs, keep_state=True)
+    if not base.converged:
+        raise RuntimeError('Convergence is not obtained at the base point')
+    if rel_step is None:
+        rel_step = get_rel_step(spec)
+    base_inputs = {name: spec.get_param(name) for name in inputs}
+    steps = {name: rel_step * abs(value) if value != 0 else rel_step for name, value in base_inputs.items()}
+    perturbed_inputs = {name: [_clip(base_inputs[name] + sign * steps[name], get_param_bounds(name))
+                               for sign in (-1, 1)] for name in inputs}
+    points = []
+    for n, name in enumerate(inputs):
+        if perturbed_inputs[name][0] == perturbed_inputs[name][1]:
+            raise ValueError('Parameter %s can not be perturbed within its bounds' % name)
+        for upper in (0, 1):
+            points.append((2 * n + upper, {name: perturbed_inputs[name][upper]}, base.state))
+    derivatives = np.zeros((len(outputs), len(inputs)))
+    for res in iter_solve_indexed(spec, points, outputs, workers, executor, chunk_size=1):
+        if not res.converged:
+            raise RuntimeError('Convergence is not obtained for %s' % res.params)
+        n, upper = divmod(res.index, 2)
+        sign = 1 if upper else -1
+        lower_value, upper_value = perturbed_inputs[inputs[n]]
+        for m, output in enumerate(outputs):
+            derivatives[m, n] += sign * res.outputs[output] / (upper_value - lower_value)
+    return Sensitivities(list(outputs), list(inputs), base.outputs, base_inputs, steps, derivatives)
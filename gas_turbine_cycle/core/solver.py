@@ -1,29 +1,96 @@
-import logging
+import copy
+import threading
+
+import numpy as np
 
 from gas_turbine_cycle.core.network_lib import *
-from gas_turbine_cycle.core.turbine_lib import Compressor, Turbine, CombustionChamber, Inlet, Outlet, Load, Atmosphere, Source
+from gas_turbine_cycle.core.instrumentation import Instrumentation, EventCategory, UnitProfiler, ChromeTraceSink, \
+    PropertyCallTracer, set_active_instrumentation
+from gas_turbine_cycle.core.turbine_lib import Compressor, Turbine, CombustionChamber, Inlet, Outlet, Load, Atmosphere, \
+    Source, FullExtensionNozzle, Regenerator, RegeneratorHotSide
+from gas_turbine_cycle.core.acceleration import AndersonAccelerator, get_tear_connections
+from gas_turbine_cycle.core.topology import NetworkComponent, get_components
 from gas_turbine_cycle.gases import IdealGas, Air, KeroseneCombustionProducts
+from gas_turbine_cycle.fuels import Fuel
 
-logging.basicConfig(format='%(levelname)s: %(message)s', filemode='w', filename='cycle.log', level=logging.INFO)
+_units_lock = threading.Lock()
 
 
 class NetworkSolver:
     def __init__(self, unit_arr: typing.List[Unit], relax_coef=1, precision=0.01, max_iter_number=50,
-                 cold_work_fluid: IdealGas=Air(), hot_work_fluid: IdealGas=KeroseneCombustionProducts()):
+                 cold_work_fluid: IdealGas=None, hot_work_fluid: IdealGas=None,
+                 instrumentation: Instrumentation=None, acceleration=True):
+        """
+        :param unit_arr: список юнитов. Входные параметры юнитов (например, T_gas камеры сгорания, pi_c компрессора,
+                T0 и p0 атмосферы) могут быть заданы массивами numpy длины N. В этом случае значения во всех связях
+                становятся массивами, и за один проход по юнитам рассчитываются сразу N режимов (пакетный расчет).
+                Внутренние циклы юнитов ведутся по маске несошедшихся элементов, внешний цикл завершается
+                после схождения всех режимов.
+
+                Сеть разбивается на сильно связные компоненты графа зависимостей юнитов (см.
+                topology.get_components). Юниты ациклических компонент рассчитываются один раз в топологическом
+                порядке, итерационно рассчитываются только компоненты, содержащие контуры (например, силовая
+                турбина и выходное устройство, связанные давлением, передаваемым против потока).
+        :param cold_work_fluid: холодное рабочее тело, по умолчанию Air
+        :param hot_work_fluid: горячее рабочее тело, по умолчанию KeroseneCombustionProducts
+        :param instrumentation: рассылка событий расчета по приемникам, по умолчанию выключена
+        :param acceleration: если True, то значения в разрываемых связях (читаемых за проход по юнитам раньше,
+                чем пересчитываемых, см. acceleration.get_tear_connections) уточняются после каждой итерации
+                методом Андерсона. Ускоряет схождение схем с давлением, передаваемым против потока, и схем
+                с контурами рециркуляции (регенерацией).
+
+        Решатель не разделяет изменяемого состояния с другими решателями: рабочие тела создаются для каждого юнита
+        заново, инструментирование привязано к потоку. Поэтому независимые сети можно рассчитывать одновременно
+        в разных потоках. Одновременный расчет одного и того же юнита двумя решателями запрещен.
+        """
         self._connection_arr: typing.List[ConnectionSet] = []
         self._unit_arr = unit_arr
-        self.cold_work_fluid = cold_work_fluid
-        self.hot_work_fluid = hot_work_fluid
+        self.cold_work_fluid = cold_work_fluid if cold_work_fluid is not None else Air()
+        self.hot_work_fluid = hot_work_fluid if hot_work_fluid is not None else KeroseneCombustionProducts()
         self.relax_coef = relax_coef
         self.precision = precision
         self.max_iter_number = max_iter_number
+        self.acceleration = acceleration
         self._iter_number = 0
-        self._residual_arr = []
+        self._residual = None
+        self._components: typing.List[NetworkComponent] = []
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self._profile: UnitProfiler = None
 
     @property
     def iter_number(self):
+        """Число итераций наиболее медленно сходящейся компоненты сети при последнем расчете"""
         return self._iter_number
 
+    @property
+    def components(self) -> typing.List[NetworkComponent]:
+        """Компоненты сети последнего расчета в порядке расчета"""
+        return self._components
+
+    @property
+    def profile(self) -> UnitProfiler:
+        """Профиль юнитов последнего расчета, выполненного с profile=True"""
+        return self._profile
+
+    @property
+    def residual(self):
+        """Максимальная по компонентам с контурами невязка на их последних итерациях"""
+        return self._residual
+
+    def get_connections_state(self) -> typing.List:
+        """Возвращает значения во всех связях в порядке их создания. Вместе с set_connections_state()
+        используется для запуска расчета от ранее полученного решения."""
+        return [connection.value for conn_set in self._connection_arr for connection in conn_set.connections]
+
+    def set_connections_state(self, state: typing.List):
+        """Задает значения во всех связях. Связи должны быть созданы в том же порядке, что и в сети,
+        состояние которой было сохранено."""
+        connections = [connection for conn_set in self._connection_arr for connection in conn_set.connections]
+        assert len(connections) == len(state), 'State does not match the network connections'
+        for connection, value in zip(connections, state):
+            if value is not None:
+                connection.value = value
+
     def create_mechanical_connection(self, generating_unit: MechEnergyGeneratingUnit,
                                      consuming_unit1: MechEnergyConsumingUnit, consuming_unit2: MechEnergyConsumingUnit):
         """Связывает порты передачи механической энергии вырабатывающего юнита с портами приемы энергии другого юнита
@@ -67,6 +134,22 @@ class NetworkSolver:
         downstream_unit.g_work_fluid_inlet_port.set_connection(g_work_fluid_conn)
         downstream_unit.g_fuel_inlet_port.set_connection(g_fuel_conn)
 
+    def create_heat_exchange_connection(self, cold_unit: Regenerator, hot_unit: RegeneratorHotSide):
+        """Связывает холодную и горячую стороны регенератора: горячая сторона передает холодной температуру газа
+        на входе, холодная горячей - теплоту, полученную воздухом"""
+        assert self._unit_arr.count(cold_unit) != 0 and self._unit_arr.count(hot_unit) != 0, \
+            "You try to connect units, of which at least one isn't added to the solver units list."
+        temp_conn = Connection()
+        heat_conn = Connection()
+        conn_set = ConnectionSet([temp_conn, heat_conn])
+
+        self._connection_arr.append(conn_set)
+
+        hot_unit.hot_temp_outlet_port.set_connection(temp_conn)
+        cold_unit.hot_temp_inlet_port.set_connection(temp_conn)
+        cold_unit.heat_outlet_port.set_connection(heat_conn)
+        hot_unit.heat_inlet_port.set_connection(heat_conn)
+
     def create_static_gas_dynamic_connection(self, upstream_unit: GasDynamicUnitStaticOutlet,
                                              downstream_unit: GasDynamicUnitStaticInlet):
         """Связывает газодинамические порты двух юнитов со статическим выходом и входом."""
@@ -100,49 +183,153 @@ class NetworkSolver:
         downstream_unit.stat_temp_inlet_port.set_connection(stat_temp_conn)
         downstream_unit.stat_pres_inlet_port.set_connection(stat_pres_conn)
 
+    def get_components(self) -> typing.List[NetworkComponent]:
+        """Возвращает сильно связные компоненты графа зависимостей юнитов в порядке их расчета. Если типы
+        портов юнитов не заданы, они предварительно задаются."""
+        if any(unit.has_undefined_ports() for unit in self._unit_arr):
+            self.set_units_behaviour()
+        return get_components(self._unit_arr, self._connection_arr)
+
     def get_sorted_unit_list(self) -> typing.List[Unit]:
-        """Возвращает отсортированный список юнитов, в котором снала следуют газодинамические юниты
-        в порядке протекания через них рабочего тела, затем нагрузки"""
-        res = []
-        for unit in self._unit_arr:
-            if type(unit) == Atmosphere:
-                res.append(unit)
-        unit = res[0].get_downstream_unit()
-        while type(unit) != Atmosphere:
-            res.append(unit)
-            unit = unit.get_downstream_unit()
-        for unit in self._unit_arr:
-            if type(unit) == Load:
-                res.append(unit)
-        return res
+        """Возвращает юниты в порядке их расчета: юниты, задающие значения в связях, предшествуют читающим
+        их юнитам, кроме юнитов одного контура"""
+        return [unit for component in self.get_components() for unit in component.units]
 
     def set_units_behaviour(self):
-        logging.info('Start behaviour setting')
+        instr = self.instrumentation
+        if instr.enabled:
+            instr.begin(EventCategory.Behaviour, 'behaviour')
         is_set = [False for _ in range(len(self._unit_arr))]
         for i in range(self.max_iter_number):
-            logging.info('Iteration %s' % (i + 1))
             for n, unit in enumerate(self._unit_arr):
                 unit.set_behaviour()
                 is_set[n] = unit.has_undefined_ports()
             if is_set.count(True) == 0:
-                logging.info('End behaviour setting\n')
+                if instr.enabled:
+                    instr.end(EventCategory.Behaviour, 'behaviour', iter_number=i + 1)
                 return
         raise RuntimeError('Setting of ports behaviour is not obtained')
 
-    def solve(self):
-        self.set_units_behaviour()
-        sorted_units_list = self.get_sorted_unit_list()
-        self.set_work_fluid(sorted_units_list)
+    def solve(self, profile=False, trace: str=None):
+        """
+        :param profile: если True, то для каждого юнита замеряются время обновления, число вызовов update()
+                и число итераций внутренних циклов; результат доступен через свойство profile
+        :param trace: имя файла, в который записывается трасса расчета в формате Chrome Trace Event
+                (внешние итерации, обновления юнитов, внутренние циклы и вычисления свойств рабочих тел)
+        """
+        instr = self.instrumentation
+        temp_sinks = []
+        if profile:
+            self._profile = UnitProfiler()
+            temp_sinks.append(self._profile)
+        if trace is not None:
+            temp_sinks.append(ChromeTraceSink(trace))
+        for sink in temp_sinks:
+            instr.add_sink(sink)
+        self._acquire_units()
+        try:
+            self._solve(instr, trace_properties=trace is not None)
+        finally:
+            self._release_units()
+            # закрываются только приемники, созданные самим решателем; приемники, подключенные пользователем,
+            # могут накапливать события нескольких расчетов и закрываются через Instrumentation.close()
+            for sink in temp_sinks:
+                instr.remove_sink(sink)
+                sink.close()
+
+    def _acquire_units(self):
+        """Помечает юниты как рассчитываемые данным решателем"""
+        with _units_lock:
+            for unit in self._unit_arr:
+                solver = getattr(unit, '_running_solver', None)
+                if solver is not None and solver is not self:
+                    raise RuntimeError('%s is being solved by another solver at the moment' % unit)
+            for unit in self._unit_arr:
+                unit._running_solver = self
+
+    def _release_units(self):
+        with _units_lock:
+            for unit in self._unit_arr:
+                unit._running_solver = None
+
+    @classmethod
+    def check_state_isolation(cls, unit_list: typing.List[Unit]):
+        """Проверяет, что объекты рабочих тел и топлив не используются несколькими юнитами одновременно"""
+        owners = {}
+        for unit in unit_list:
+            for key, value in unit.__dict__.items():
+                if isinstance(value, (IdealGas, Fuel)):
+                    owner = owners.setdefault(id(value), unit)
+                    if owner is not unit:
+                        raise RuntimeError('Object %s of %s is shared with %s. Each unit must have its own work '
+                                           'fluid and fuel objects.' % (key, unit, owner))
+
+    def _solve(self, instr: Instrumentation, trace_properties=False):
+        previous_instr = set_active_instrumentation(instr)
+        tracer = None
+        if instr.enabled:
+            instr.begin(EventCategory.Solve, 'solve')
+        try:
+            self.set_units_behaviour()
+            self._components = get_components(self._unit_arr, self._connection_arr)
+            sorted_units_list = [unit for component in self._components for unit in component.units]
+            unit_index = {unit: n for n, unit in enumerate(sorted_units_list)}
+            self.set_work_fluid(sorted_units_list)
+            self.check_state_isolation(sorted_units_list)
+            if trace_properties:
+                tracer = PropertyCallTracer(instr)
+                for unit in sorted_units_list:
+                    for value in list(unit.__dict__.values()):
+                        if isinstance(value, (IdealGas, Fuel)):
+                            tracer.attach(value)
+            self._iter_number = 0
+            self._residual = 0
+            for n, component in enumerate(self._components):
+                if component.cyclic:
+                    converged = self._solve_component(n, component, unit_index, instr)
+                    self._residual = max(self._residual, component.residual)
+                else:
+                    component.iter_number = 1
+                    self._update_units_state(component.units, 1, instr, unit_index)
+                    converged = True
+                self._iter_number = max(self._iter_number, component.iter_number)
+                if not converged:
+                    if instr.enabled:
+                        instr.end(EventCategory.Solve, 'solve', converged=False, iter_number=self._iter_number)
+                    raise RuntimeError('Convergence is not obtained')
+            # юниты без прямой передачи рассчитаны раньше юнитов, задающих их входные значения
+            self._update_units_state([unit for unit in sorted_units_list if not unit.direct_feedthrough], 1,
+                                     instr, unit_index)
+            if instr.enabled:
+                instr.end(EventCategory.Solve, 'solve', converged=True, iter_number=self._iter_number)
+        finally:
+            if tracer is not None:
+                tracer.detach()
+            set_active_instrumentation(previous_instr)
+
+    def _solve_component(self, number: int, component: NetworkComponent, unit_index: typing.Dict[Unit, int],
+                         instr: Instrumentation) -> bool:
+        """Итерационно рассчитывает компоненту с контуром. Возвращает True, если расчет сошелся."""
+        connection_arr = [component.connection_set]
+        accelerator = None
+        if self.acceleration:
+            accelerator = AndersonAccelerator(get_tear_connections(component.units, self._connection_arr))
         for i in range(self.max_iter_number):
-            self._iter_number = i + 1
-            logging.info('Iteration %s\n' % i)
-            self._update_previous_connections_state(self._connection_arr)
-            self._update_units_state(sorted_units_list, self.relax_coef)
-            self._residual_arr.append(self._get_max_residual(self._connection_arr))
-            logging.info('MAX RESIDUAL = %.4f\n' % (self._get_max_residual(self._connection_arr)))
-            if self._is_converged(self.precision, self._connection_arr):
-                return
-        raise RuntimeError('Convergence is not obtained')
+            component.iter_number = i + 1
+            if instr.enabled:
+                instr.begin(EventCategory.Iteration, 'iteration', iter_number=i + 1, component=number)
+            self._update_previous_connections_state(connection_arr)
+            self._update_units_state(component.units, self.relax_coef, instr, unit_index)
+            residual = self._get_max_residual(connection_arr)
+            component.residual = residual
+            if instr.enabled:
+                instr.end(EventCategory.Iteration, 'iteration', iter_number=i + 1, component=number,
+                          residual=residual)
+            if self._is_converged(self.precision, connection_arr):
+                return True
+            if accelerator is not None:
+                accelerator.update()
+        return False
 
     @classmethod
     def _update_previous_connections_state(cls, connection_arr: typing.List[ConnectionSet]):
@@ -150,14 +337,17 @@ class NetworkSolver:
             i.update_previous_state()
 
     def set_work_fluid(self, unit_list: typing.List[Unit]):
-        """
+        """Создает для юнитов собственные объекты рабочих тел, а камерам сгорания - копии топлив, чтобы сети,
+        которым передан один и тот же объект, можно было рассчитывать одновременно.
+
         :param unit_list: отсортированный список юнитов
         :return:
         """
         for unit in unit_list:
-            if type(unit) == Inlet or type(unit) == Compressor:
+            if type(unit) == Inlet or type(unit) == Compressor or type(unit) == Regenerator:
                 unit.work_fluid = type(self.cold_work_fluid)()
-            elif type(unit) == Outlet or type(unit) == Turbine:
+            elif type(unit) == Outlet or type(unit) == Turbine or type(unit) == FullExtensionNozzle or \
+                    type(unit) == RegeneratorHotSide:
                 unit.work_fluid = type(self.hot_work_fluid)()
             elif type(unit) == Atmosphere:
                 unit.work_fluid_in = type(self.hot_work_fluid)()
@@ -177,16 +367,30 @@ class NetworkSolver:
                     unit.work_fluid_in = type(self.hot_work_fluid)()
                     unit.work_fluid_out = type(self.hot_work_fluid)()
                     unit.work_fluid_out_T0 = type(self.hot_work_fluid)()
+                # топливо задается пользователем и может быть общим для нескольких камер или сетей
+                unit.fuel = copy.deepcopy(unit.fuel)
 
     @classmethod
-    def _update_units_state(cls, sorted_unit_list: typing.List[Unit], relax_coef=1):
-        for i in sorted_unit_list:
-            if type(i) == Load:
+    def _update_units_state(cls, sorted_unit_list: typing.List[Unit], relax_coef=1,
+                            instrumentation: Instrumentation=None, unit_index: typing.Dict[Unit, int]=None):
+        """
+        :param sorted_unit_list: юниты в порядке обновления
+        :param unit_index: номера юнитов в отсортированном списке всех юнитов сети для событий инструментирования,
+                по умолчанию номера в sorted_unit_list
+        """
+        if instrumentation is None or not instrumentation.enabled:
+            for i in sorted_unit_list:
+                i.update()
+                i.update_output_connection_current_state(relax_coef)
+        else:
+            for n, i in enumerate(sorted_unit_list):
+                if unit_index is not None:
+                    n = unit_index[i]
+                instrumentation.begin(EventCategory.Unit, str(i), unit=i, index=n)
                 i.update()
-        for i in sorted_unit_list:
-            logging.info(str(i) + ' ' + 'updating')
-            i.update()
-            i.update_output_connection_current_state(relax_coef)
+                instrumentation.end(EventCategory.Unit, str(i), unit=i, index=n,
+                                    inner_iter_number=i.inner_iter_number)
+                i.update_output_connection_current_state(relax_coef)
 
     @classmethod
     def _get_max_residual(cls, connection_arr: typing.List[ConnectionSet]):
@@ -0,0 +1,202 @@
+import copy
+import inspect
+import json
+import typing
+
+import numpy as np
+
+from .network_lib import Unit
+from .turbine_lib import Compressor, Turbine, Source, Sink, CombustionChamber, Inlet, Outlet, Atmosphere, \
+    FullExtensionNozzle, Load, Regenerator, RegeneratorHotSide
+from .solver import NetworkSolver
+from ..gases import Air, KeroseneCombustionProducts, NaturalGasCombustionProducts
+from ..fuels import NaturalGas
+
+unit_types = {cls.__name__: cls for cls in [Compressor, Turbine, Source, Sink, CombustionChamber, Inlet, Outlet,
+                                            Atmosphere, FullExtensionNozzle, Load, Regenerator, RegeneratorHotSide]}
+"Классы юнитов, доступные для описания сети"
+fluid_types = {cls.__name__: cls for cls in [Air, KeroseneCombustionProducts, NaturalGasCombustionProducts,
+                                             NaturalGas]}
+"Классы рабочих тел и топлив, доступные для описания сети"
+fluid_params = ('work_fluid', 'work_fluid_in', 'work_fluid_out', 'return_fluid', 'fuel')
+"Параметры юнитов, задаваемые именем класса рабочего тела или топлива"
+point_params = ('return_points',)
+"Параметры юнитов, задаваемые списком точек; в отличие от других списков не преобразуются в массивы пакетного расчета"
+solver_params = ('relax_coef', 'precision', 'max_iter_number', 'cold_work_fluid', 'hot_work_fluid',
+                 'acceleration')
+"Параметры решателя"
+
+
+def _to_jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    return value
+
+
+class UnitSpec:
+    """Описание юнита: имя, класс и параметры конструктора"""
+    def __init__(self, name: str, unit_type: str, **params):
+        assert unit_type in unit_types, 'Unknown unit type: %s' % unit_type
+        self.name = name
+        self.unit_type = unit_type
+        self.params = params
+
+    def create(self) -> Unit:
+        params = {}
+        for key, value in self.params.items():
+            if key in fluid_params and isinstance(value, str):
+                params[key] = fluid_types[value]()
+            elif key in point_params:
+                params[key] = [tuple(point) for point in value]
+            elif isinstance(value, list):
+                params[key] = np.array(value)
+            else:
+                params[key] = value
+        return unit_types[self.unit_type](**params)
+
+    def get_resolved_params(self) -> dict:
+        """Возвращает параметры конструктора юнита, включая незаданные, со значениями по умолчанию"""
+        res = {}
+        for name, parameter in inspect.signature(unit_types[self.unit_type]).parameters.items():
+            if parameter.default is not inspect.Parameter.empty:
+                res[name] = parameter.default
+        res.update(self.params)
+        return res
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'type': self.unit_type,
+                'params': {key: _to_jsonable(value) for key, value in self.params.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['name'], data['type'], **data['params'])
+
+
+class NetworkSpec:
+    """Декларативное описание сети: юниты с параметрами, связи между ними и параметры решателя. Содержит только
+    простые данные, поэтому дешево сериализуется в JSON или pickle и передается в другие процессы, где
+    по нему методом build() создается готовая к расчету сеть."""
+    def __init__(self, relax_coef=1, precision=0.01, max_iter_number=50, cold_work_fluid='Air',
+                 hot_work_fluid='KeroseneCombustionProducts', acceleration=True):
+        self.units: typing.List[UnitSpec] = []
+        self.gas_dynamic_connections: typing.List[typing.Tuple[str, str]] = []
+        self.static_gas_dynamic_connections: typing.List[typing.Tuple[str, str]] = []
+        self.mechanical_connections: typing.List[typing.Tuple[str, str, str]] = []
+        self.heat_exchange_connections: typing.List[typing.Tuple[str, str]] = []
+        self.relax_coef = relax_coef
+        self.precision = precision
+        self.max_iter_number = max_iter_number
+        self.cold_work_fluid = cold_work_fluid
+        self.hot_work_fluid = hot_work_fluid
+        self.acceleration = acceleration
+
+    def get_unit_spec(self, name: str) -> UnitSpec:
+        for unit_spec in self.units:
+            if unit_spec.name == name:
+                return unit_spec
+        raise KeyError('Unit %s is not found in the network specification' % name)
+
+    def _check_names(self, *names):
+        unit_names = [unit_spec.name for unit_spec in self.units]
+        for name in names:
+            assert name in unit_names, 'Unit %s is not added to the network specification' % name
+
+    def add_unit(self, name: str, unit_type: str, **params) -> str:
+        """Добавляет юнит и возвращает его имя"""
+        assert name not in [unit_spec.name for unit_spec in self.units], 'Unit %s is already added' % name
+        self.units.append(UnitSpec(name, unit_type, **params))
+        return name
+
+    def connect_gas_dynamic(self, upstream_unit: str, downstream_unit: str):
+        self._check_names(upstream_unit, downstream_unit)
+        self.gas_dynamic_connections.append((upstream_unit, downstream_unit))
+
+    def connect_static_gas_dynamic(self, upstream_unit: str, downstream_unit: str):
+        self._check_names(upstream_unit, downstream_unit)
+        self.static_gas_dynamic_connections.append((upstream_unit, downstream_unit))
+
+    def connect_mechanical(self, generating_unit: str, consuming_unit1: str, consuming_unit2: str):
+        self._check_names(generating_unit, consuming_unit1, consuming_unit2)
+        self.mechanical_connections.append((generating_unit, consuming_unit1, consuming_unit2))
+
+    def connect_heat_exchange(self, cold_unit: str, hot_unit: str):
+        self._check_names(cold_unit, hot_unit)
+        self.heat_exchange_connections.append((cold_unit, hot_unit))
+
+    def get_param(self, key: str):
+        """Возвращает параметр по ключу вида 'имя_юнита.параметр' или имени параметра решателя. Для
+        незаданных параметров юнитов возвращается значение по умолчанию из конструктора класса юнита."""
+        if key in solver_params:
+            return getattr(self, key)
+        name, param = key.split('.', 1)
+        unit_spec = self.get_unit_spec(name)
+        if param in unit_spec.params:
+            return unit_spec.params[param]
+        parameter = inspect.signature(unit_types[unit_spec.unit_type]).parameters.get(param)
+        if parameter is None or parameter.default is inspect.Parameter.empty:
+            raise KeyError('Parameter %s is not set' % key)
+        return parameter.default
+
+    def replace(self, params: typing.Dict[str, typing.Any]):
+        """Возвращает копию описания с измененными параметрами.
+
+        :param params: словарь вида {'имя_юнита.параметр': значение} или {'параметр_решателя': значение}
+        """
+        res = copy.deepcopy(self)
+        for key, value in params.items():
+            if key in solver_params:
+                setattr(res, key, value)
+            else:
+                name, param = key.split('.', 1)
+                res.get_unit_spec(name).params[param] = value
+        return res
+
+    def build(self) -> typing.Tuple[NetworkSolver, typing.Dict[str, Unit]]:
+        """Создает юниты, решатель и связи. Возвращает решатель и словарь юнитов по именам"""
+        units = {unit_spec.name: unit_spec.create() for unit_spec in self.units}
+        solver = NetworkSolver([units[unit_spec.name] for unit_spec in self.units], relax_coef=self.relax_coef,
+                               precision=self.precision, max_iter_number=self.max_iter_number,
+                               cold_work_fluid=fluid_types[self.cold_work_fluid](),
+                               hot_work_fluid=fluid_types[self.hot_work_fluid](),
+                               acceleration=self.acceleration)
+        for upstream_unit, downstream_unit in self.gas_dynamic_connections:
+            solver.create_gas_dynamic_connection(units[upstream_unit], units[downstream_unit])
+        for upstream_unit, downstream_unit in self.static_gas_dynamic_connections:
+            solver.create_static_gas_dynamic_connection(units[upstream_unit], units[downstream_unit])
+        for generating_unit, consuming_unit1, consuming_unit2 in self.mechanical_connections:
+            solver.create_mechanical_connection(units[generating_unit], units[consuming_unit1],
+                                                units[consuming_unit2])
+        for cold_unit, hot_unit in self.heat_exchange_connections:
+            solver.create_heat_exchange_connection(units[cold_unit], units[hot_unit])
+        return solver, units
+
+    def to_dict(self) -> dict:
+        return {
+            'units': [unit_spec.to_dict() for unit_spec in self.units],
+            'gas_dynamic_connections': [list(conn) for conn in self.gas_dynamic_connections],
+            'static_gas_dynamic_connections': [list(conn) for conn in self.static_gas_dynamic_connections],
+            'mechanical_connections': [list(conn) for conn in self.mechanical_connections],
+            'heat_exchange_connections': [list(conn) for conn in self.heat_exchange_connections],
+            'solver': {key: _to_jsonable(getattr(self, key)) for key in solver_params}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        res = cls(**data['solver'])
+        res.units = [UnitSpec.from_dict(unit_data) for unit_data in data['units']]
+        res.gas_dynamic_connections = [tuple(conn) for conn in data['gas_dynamic_connections']]
+        res.static_gas_dynamic_connections = [tuple(conn) for conn in data['static_gas_dynamic_connections']]
+        res.mechanical_connections = [tuple(conn) for conn in data['mechanical_connections']]
+        res.heat_exchange_connections = [tuple(conn) for conn in data.get('heat_exchange_connections', [])]
+        return res
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_json(cls, data: str):
+        return cls.from_dict(json.loads(data))
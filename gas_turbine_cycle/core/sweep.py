@@ -0,0 +1,360 @@
+import collections
+from concurrent.futures import Executor
+import itertools
+import os
+import typing
+
+import numpy as np
+
+from .network_lib import Unit, GasDynamicUnit
+from .turbine_lib import Compressor, CombustionChamber, Load
+from .spec import NetworkSpec, unit_types
+from .cache import ResultCache, get_spec_key
+
+point_errors = (RuntimeError, ArithmeticError, ValueError)
+"""Исключения, которые при расчете режима считаются несходимостью или недопустимым режимом (RuntimeError -
+несходимость решателя, ArithmeticError и ValueError - численные ошибки). Остальные исключения, например KeyError
+при ошибке в имени выходного параметра, прерывают расчет."""
+
+
+def get_specific_power(units: typing.Dict[str, Unit]):
+    """Удельная мощность, передаваемая внешним нагрузкам, Дж/кг"""
+    return sum(unit.consumable_labour for unit in units.values() if type(unit) == Load and unit.power != 0)
+
+
+def get_g_fuel(units: typing.Dict[str, Unit]):
+    """Суммарный относительный расход топлива во всех камерах сгорания"""
+    return sum(unit.g_fuel_prime * unit.g_in for unit in units.values() if type(unit) == CombustionChamber)
+
+
+def get_efficiency(units: typing.Dict[str, Unit]):
+    """Эффективный КПД: отношение удельной мощности к теплу, подведенному с топливом во всех камерах сгорания"""
+    heat = sum(unit.g_fuel_prime * unit.g_in * unit.Q_n for unit in units.values()
+               if type(unit) == CombustionChamber)
+    return get_specific_power(units) / heat
+
+
+def get_heat_rate(units: typing.Dict[str, Unit]):
+    """Удельный расход теплоты, кДж/(кВт*ч)"""
+    return 3600 / get_efficiency(units)
+
+
+def get_air_flow(units: typing.Dict[str, Unit]):
+    """Расход воздуха, обеспечивающий заданную мощность нагрузок, кг/с"""
+    return sum(unit.power for unit in units.values() if type(unit) == Load) / get_specific_power(units)
+
+
+def get_fuel_flow(units: typing.Dict[str, Unit]):
+    """Расход топлива при заданной мощности нагрузок, кг/с"""
+    return get_air_flow(units) * get_g_fuel(units)
+
+
+derived_outputs = {
+    'specific_power': get_specific_power,
+    'efficiency': get_efficiency,
+    'heat_rate': get_heat_rate,
+    'air_flow': get_air_flow,
+    'fuel_flow': get_fuel_flow
+}
+"Выходные параметры, вычисляемые по сети целиком"
+
+
+def get_default_outputs(spec: NetworkSpec) -> typing.List[str]:
+    """Возвращает список выходных параметров по умолчанию: температуры торможения на выходе всех газодинамических
+    юнитов, работы компрессоров и нагрузок, относительные расходы топлива, удельная мощность и КПД"""
+    res = []
+    for unit_spec in spec.units:
+        unit_type = unit_types[unit_spec.unit_type]
+        if issubclass(unit_type, GasDynamicUnit):
+            res.append('%s.T_stag_out' % unit_spec.name)
+        if unit_type == Compressor or (unit_type == Load and unit_spec.params.get('power', 0) != 0):
+            res.append('%s.consumable_labour' % unit_spec.name)
+        if unit_type == CombustionChamber:
+            res.append('%s.g_fuel_prime' % unit_spec.name)
+    res.extend(derived_outputs.keys())
+    return res
+
+
+def get_outputs(units: typing.Dict[str, Unit], outputs: typing.List[str]) -> typing.Dict[str, typing.Any]:
+    """Возвращает значения выходных параметров по ключам вида 'имя_юнита.атрибут' или именам из derived_outputs"""
+    res = {}
+    for key in outputs:
+        if key in derived_outputs:
+            res[key] = derived_outputs[key](units)
+        else:
+            name, attr = key.split('.', 1)
+            res[key] = getattr(units[name], attr)
+    return res
+
+
+class PointResult:
+    """Компактный результат расчета одного режима. Не содержит ссылок на юниты и решатель."""
+    __slots__ = ('index', 'params', 'outputs', 'converged', 'iter_number', 'residual', 'state', 'cached', 'error')
+
+    def __init__(self, index: int, params: typing.Dict[str, typing.Any], outputs: typing.Dict[str, typing.Any],
+                 converged: bool, iter_number: int, residual, state: typing.List=None, cached=False,
+                 error: str=None):
+        self.index = index
+        "Номер режима в последовательности"
+        self.params = params
+        "Параметры режима"
+        self.outputs = outputs
+        "Значения выходных параметров"
+        self.converged = converged
+        "True, если расчет сошелся"
+        self.iter_number = iter_number
+        "Число внешних итераций"
+        self.residual = residual
+        "Невязка на последней итерации"
+        self.state = state
+        "Значения во всех связях сети (только при keep_state=True)"
+        self.cached = cached
+        "True, если результат взят из кэша"
+        self.error = error
+        "Сообщение об исключении, прервавшем расчет режима, или None"
+
+    def __getstate__(self):
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return 'PointResult(%s, converged=%s, iter_number=%s)' % (self.index, self.converged, self.iter_number)
+
+
+def solve_point(spec: NetworkSpec, params: typing.Dict[str, typing.Any], outputs: typing.List[str], index=0,
+                keep_state=False, init_state: typing.List=None, cache: ResultCache=None) -> PointResult:
+    """Создает сеть по описанию с измененными параметрами, рассчитывает ее и возвращает компактный результат.
+    Несошедшийся режим не прерывает расчет: converged=False, выходные параметры равны nan. Так же обрабатываются
+    численные ошибки при создании или расчете сети (point_errors, например ZeroDivisionError или ValueError в
+    недопустимом режиме); сообщение о них записывается в error. В кэш записываются только сошедшиеся режимы:
+    ключ кэша не зависит от init_state, и режим, не сошедшийся из одного начального приближения, может сойтись
+    из другого.
+
+    :param init_state: значения в связях, от которых начинается расчет (см. NetworkSolver.get_connections_state)
+    :param cache: кэш режимов; если режим найден в кэше, расчет не выполняется
+    """
+    point_spec = spec.replace(params)
+    key = None
+    if cache is not None:
+        key = get_spec_key(point_spec)
+        entry = cache.get(key, outputs)
+        if entry is not None:
+            return PointResult(index, params, {output: entry['outputs'][output] for output in outputs},
+                               entry['converged'], entry['iter_number'], entry['residual'],
+                               entry['state'] if keep_state else None, cached=True)
+    solver = None
+    error = None
+    try:
+        solver, units = point_spec.build()
+        if init_state is not None:
+            solver.set_connections_state(init_state)
+        solver.solve()
+        converged = True
+        point_outputs = get_outputs(units, outputs)
+        state = solver.get_connections_state()
+    except point_errors as exception:
+        converged = False
+        point_outputs = {output: np.nan for output in outputs}
+        state = None
+        error = '%s: %s' % (type(exception).__name__, exception)
+    iter_number = solver.iter_number if solver is not None else 0
+    residual = solver.residual if solver is not None else None
+    if cache is not None and converged:
+        cache.put(key, point_outputs, converged, iter_number, residual, state)
+    return PointResult(index, params, point_outputs, converged, iter_number, residual,
+                       state if keep_state else None, error=error)
+
+
+def _get_normalized_inputs(points: typing.Sequence[typing.Dict[str, typing.Any]]) -> np.ndarray:
+    inputs = sorted(points[0].keys())
+    values = np.array([[point[name] for name in inputs] for point in points], dtype=float).reshape(len(points), -1)
+    scale = values.max(axis=0) - values.min(axis=0)
+    scale[scale == 0] = 1
+    return (values - values.min(axis=0)) / scale
+
+
+def _get_serpentine_order(ranks: np.ndarray, indices: np.ndarray, dim: int, reverse: bool) -> typing.List[int]:
+    if dim == ranks.shape[1] or len(indices) <= 1:
+        res = list(indices)
+    else:
+        res = []
+        for n, rank in enumerate(np.unique(ranks[indices, dim])):
+            group = indices[ranks[indices, dim] == rank]
+            res.extend(_get_serpentine_order(ranks, group, dim + 1, n % 2 == 1))
+    return res[::-1] if reverse else res
+
+
+def get_serpentine_order(points: typing.Sequence[typing.Dict[str, typing.Any]]) -> np.ndarray:
+    """Возвращает номера режимов в порядке обхода змейкой: по первому параметру (в порядке сортировки имен) по
+    возрастанию, по каждому следующему - попеременно по возрастанию и по убыванию. Для сеток соседние в обходе
+    режимы отличаются одним шагом по одному параметру."""
+    values = _get_normalized_inputs(points)
+    ranks = np.column_stack([np.unique(column, return_inverse=True)[1] for column in values.T])
+    return np.array(_get_serpentine_order(ranks, np.arange(len(points)), 0, False), dtype=int)
+
+
+def get_hilbert_keys(coords: np.ndarray, bits: int) -> np.ndarray:
+    """Возвращает номера точек на кривой Гильберта (алгоритм Skilling, 2004).
+
+    :param coords: целые координаты точек, массив размера (N, d), значения от 0 до 2**bits - 1
+    :param bits: число бит на координату, d * bits не должно превышать 63
+    """
+    x = np.array(coords, dtype=np.int64)
+    n, dim = x.shape
+    assert dim * bits <= 63, 'Too many bits for Hilbert key'
+    m = 1 << (bits - 1)
+    q = m
+    while q > 1:
+        p = q - 1
+        for i in range(dim):
+            mask = (x[:, i] & q) != 0
+            t = (x[:, 0] ^ x[:, i]) & p
+            x[:, 0] = np.where(mask, x[:, 0] ^ p, x[:, 0] ^ t)
+            if i != 0:
+                x[:, i] = np.where(mask, x[:, i], x[:, i] ^ t)
+        q >>= 1
+    for i in range(1, dim):
+        x[:, i] ^= x[:, i - 1]
+    t = np.zeros(n, dtype=np.int64)
+    q = m
+    while q > 1:
+        t = np.where((x[:, dim - 1] & q) != 0, t ^ (q - 1), t)
+        q >>= 1
+    x ^= t[:, np.newaxis]
+    res = np.zeros(n, dtype=np.int64)
+    for b in range(bits - 1, -1, -1):
+        for i in range(dim):
+            res = (res << 1) | ((x[:, i] >> b) & 1)
+    return res
+
+
+def get_hilbert_order(points: typing.Sequence[typing.Dict[str, typing.Any]]) -> np.ndarray:
+    """Возвращает номера режимов в порядке обхода по кривой Гильберта в пространстве параметров, нормированных
+    на диапазоны их изменения. Близкие в обходе режимы близки и по параметрам, в том числе для нерегулярных
+    наборов режимов."""
+    values = _get_normalized_inputs(points)
+    bits = min(16, 63 // values.shape[1])
+    coords = np.round(values * ((1 << bits) - 1)).astype(np.int64)
+    return np.argsort(get_hilbert_keys(coords, bits), kind='stable')
+
+
+point_orders = {
+    'serpentine': get_serpentine_order,
+    'hilbert': get_hilbert_order
+}
+"Способы упорядочивания режимов по близости"
+
+
+def _solve_chunk(spec: NetworkSpec, points: typing.List[typing.Tuple[int, dict, typing.List]],
+                 outputs: typing.List[str], keep_state: bool, cache: ResultCache,
+                 warm_start=False) -> typing.List[PointResult]:
+    res = []
+    state = None
+    for index, params, init_state in points:
+        if warm_start and state is not None:
+            init_state = state
+        point_res = solve_point(spec, params, outputs, index, keep_state or warm_start, init_state, cache)
+        if point_res.converged:
+            state = point_res.state
+        if not keep_state:
+            point_res.state = None
+        res.append(point_res)
+    return res
+
+
+def _iter_ordered(points: typing.Iterable[typing.Dict[str, typing.Any]], get_order,
+                  window: typing.Optional[int]) -> typing.Iterator[typing.Tuple[int, dict, typing.List]]:
+    """Упорядочивает режимы окнами по window режимов (None - вся последовательность) и выдает кортежи
+    (исходный номер режима, параметры, None)"""
+    points = iter(points)
+    start = 0
+    while True:
+        window_points = list(itertools.islice(points, window))
+        if not window_points:
+            return
+        for index in get_order(window_points):
+            yield start + int(index), window_points[index], None
+        if window is None:
+            return
+        start += len(window_points)
+
+
+def iter_solve(spec: NetworkSpec, points: typing.Iterable[typing.Dict[str, typing.Any]],
+               outputs: typing.List[str]=None, workers: int=None, executor: Executor=None, chunk_size=16,
+               keep_state=False, cache: ResultCache=None, order: str=None,
+               warm_start=False, order_window: int=None) -> typing.Iterator[PointResult]:
+    """Рассчитывает последовательность режимов и по мере расчета выдает по одному результату на режим в порядке
+    следования режимов. Последовательность режимов читается лениво, а решатели и юниты рассчитанных режимов
+    не сохраняются, поэтому потребляемая память не зависит от числа режимов.
+
+    Если задан порядок order, режимы сначала упорядочиваются по близости и выдаются в порядке расчета
+    (исходный номер режима - PointResult.index). Упорядоченная последовательность делится на непрерывные
+    порции по chunk_size режимов, поэтому каждый процесс рассчитывает соседние режимы. Для упорядочивания
+    режимы считываются в память: при order_window - окнами по order_window режимов, упорядочиваемыми
+    независимо (память ограничена размером окна), иначе целиком (последовательность должна быть конечной).
+
+    :param spec: описание сети
+    :param points: режимы - словари вида {'имя_юнита.параметр': значение} (см. NetworkSpec.replace)
+    :param outputs: ключи выходных параметров, по умолчанию get_default_outputs(spec)
+    :param workers: число процессов; если не задано и не задан executor, расчет ведется в текущем процессе.
+            При заданном executor - число его рабочих, определяющее число порций в очереди пула (по умолчанию
+            os.cpu_count())
+    :param executor: пул, в котором выполняется расчет, например ProcessPoolExecutor или ThreadPoolExecutor
+    :param chunk_size: число режимов, передаваемых в пул за один раз
+    :param keep_state: если True, в результат записываются значения во всех связях сети
+    :param cache: кэш режимов на диске, по умолчанию не используется
+    :param order: None - в заданном порядке, 'serpentine' - змейкой по сетке параметров, 'hilbert' - по кривой
+            Гильберта (см. point_orders); требует, чтобы все режимы имели одинаковый набор числовых параметров
+    :param warm_start: если True, расчет каждого режима начинается от решения для предыдущего режима порции
+    :param order_window: число режимов, упорядочиваемых совместно; по умолчанию вся последовательность
+    """
+    if order is not None:
+        indexed_points = _iter_ordered(points, point_orders[order], order_window)
+    else:
+        indexed_points = ((index, params, None) for index, params in enumerate(points))
+    return iter_solve_indexed(spec, indexed_points, outputs, workers, executor, chunk_size, keep_state, cache,
+                              warm_start)
+
+
+def iter_solve_indexed(spec: NetworkSpec, points: typing.Iterable[typing.Tuple[int, dict, typing.List]],
+                       outputs: typing.List[str]=None, workers: int=None, executor: Executor=None, chunk_size=16,
+                       keep_state=False, cache: ResultCache=None,
+                       warm_start=False) -> typing.Iterator[PointResult]:
+    """Аналог iter_solve, в котором режимы задаются кортежами (номер, параметры, начальное состояние связей или
+    None). Используется для продолжения прерванных расчетов и расчета с начальным приближением. При warm_start
+    решение для предыдущего режима порции имеет приоритет перед заданным начальным состоянием."""
+    if outputs is None:
+        outputs = get_default_outputs(spec)
+    indexed_points = iter(points)
+    if executor is None and not workers:
+        while True:
+            chunk = list(itertools.islice(indexed_points, chunk_size))
+            if not chunk:
+                return
+            for res in _solve_chunk(spec, chunk, outputs, keep_state, cache, warm_start):
+                yield res
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(workers)
+    max_pending = 2 * (workers if workers else os.cpu_count() or 1)
+    pending = collections.deque()
+    try:
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(indexed_points, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_solve_chunk, spec, chunk, outputs, keep_state, cache, warm_start))
+            if not pending:
+                return
+            for res in pending.popleft().result():
+                yield res
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown()
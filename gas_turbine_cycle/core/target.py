@@ -0,0 +1,88 @@
+import typing
+
+from .spec import NetworkSpec
+from .sweep import PointResult, solve_point
+
+
+class TargetStep:
+    """Итерация поиска значения параметра"""
+    __slots__ = ('x', 'value', 'iter_number')
+
+    def __init__(self, x, value, iter_number: int):
+        self.x = x
+        "Значение искомого параметра"
+        self.value = value
+        "Значение выходного параметра"
+        self.iter_number = iter_number
+        "Число внешних итераций расчета сети"
+
+    def __repr__(self):
+        return 'TargetStep(%s, %s, iter_number=%s)' % (self.x, self.value, self.iter_number)
+
+
+def solve_target(spec: NetworkSpec, param: str, output: str, value, x0=None, x1=None, rel_tol=1e-4,
+                 max_iter_number=20, bounds: typing.Tuple=(None, None), outputs: typing.List[str]=None,
+                 steps: typing.List[TargetStep]=None) -> PointResult:
+    """Находит значение входного параметра сети (например, 'comb_chamber.T_gas' или 'compressor.pi_c'), при
+    котором выходной параметр (например, 'specific_power', 'air_flow' или 'heat_rate') равен заданному значению.
+    Используется метод секущих, расчет сети на каждой итерации начинается от предыдущего решения.
+
+    Погрешность выходного параметра определяется точностью решателя сети, поэтому rel_tol не следует задавать
+    меньше нее.
+
+    :param spec: описание сети
+    :param param: искомый параметр - ключ вида 'имя_юнита.параметр' (см. NetworkSpec.replace)
+    :param output: выходной параметр (см. sweep.get_outputs)
+    :param value: требуемое значение выходного параметра
+    :param x0: начальное приближение, по умолчанию значение параметра в описании сети
+    :param x1: второе начальное приближение, по умолчанию отличается от x0 на 2 %
+    :param rel_tol: допустимая относительная невязка выходного параметра
+    :param max_iter_number: максимальное число расчетов сети
+    :param bounds: границы искомого параметра, None - без ограничения
+    :param outputs: дополнительные выходные параметры результата
+    :param steps: если задан список, в него записываются итерации (TargetStep)
+    :return: результат для найденного режима; params содержит найденное значение параметра, iter_number -
+            суммарное число внешних итераций всех расчетов сети
+    """
+    outputs = [output] + [key for key in (outputs or []) if key != output]
+    if steps is None:
+        steps = []
+    if x0 is None:
+        x0 = spec.get_param(param)
+    if x1 is None:
+        x1 = x0 * 1.02 if x0 != 0 else 0.01
+    lower, upper = bounds
+
+    def clip(x):
+        if lower is not None:
+            x = max(lower, x)
+        if upper is not None:
+            x = min(upper, x)
+        return x
+
+    iter_number = 0
+    state = None
+    res = None
+    x_prev, f_prev = None, None
+    x = clip(x0)
+    for i in range(max_iter_number):
+        res = solve_point(spec, {param: x}, outputs, keep_state=True, init_state=state)
+        iter_number += res.iter_number
+        if not res.converged:
+            raise RuntimeError('Convergence is not obtained for %s = %s' % (param, x))
+        state = res.state
+        steps.append(TargetStep(x, res.outputs[output], res.iter_number))
+        f = res.outputs[output] - value
+        if abs(f) <= rel_tol * abs(value):
+            return PointResult(0, {param: x}, res.outputs, True, iter_number, res.residual, res.state)
+        if x_prev is None:
+            x_new = x1
+        elif f == f_prev:
+            raise RuntimeError('Output %s does not depend on %s' % (output, param))
+        else:
+            x_new = x - f * (x - x_prev) / (f - f_prev)
+        x_prev, f_prev = x, f
+        x = clip(x_new)
+        if x == x_prev:
+            raise RuntimeError('Target value of %s is not reachable within bounds of %s' % (output, param))
+    raise RuntimeError('Target value of %s is not reached in %s iterations' % (output, max_iter_number))
@@ -0,0 +1,156 @@
+import typing
+
+from .network_lib import Unit, Connection, ConnectionSet, PortType
+
+
+def get_writing_unit(connection: Connection) -> Unit:
+    """Возвращает юнит, порт которого задает значение в связи"""
+    if connection.upstream_port.port_type == PortType.Output:
+        return connection.upstream_unit
+    return connection.downstream_unit
+
+
+def get_reading_unit(connection: Connection) -> Unit:
+    """Возвращает юнит, порт которого читает значение из связи"""
+    if connection.upstream_port.port_type == PortType.Output:
+        return connection.downstream_unit
+    return connection.upstream_unit
+
+
+def get_dependency_graph(unit_arr: typing.List[Unit],
+                         connection_arr: typing.List[ConnectionSet]) -> typing.Dict[Unit, typing.Dict[Unit, int]]:
+    """Возвращает граф зависимостей юнитов: для каждого юнита - словарь юнитов, читающих заданные им значения,
+    с числом связей между ними. Связи, читаемые юнитами без прямой передачи (Unit.direct_feedthrough = False),
+    в граф не входят: выходные значения таких юнитов от них не зависят."""
+    graph = {unit: {} for unit in unit_arr}
+    for conn_set in connection_arr:
+        for connection in conn_set.connections:
+            writer = get_writing_unit(connection)
+            reader = get_reading_unit(connection)
+            if writer in graph and reader in graph and reader.direct_feedthrough:
+                graph[writer][reader] = graph[writer].get(reader, 0) + 1
+    return graph
+
+
+def get_strongly_connected_components(graph: typing.Dict[Unit, typing.Dict[Unit, int]]) -> \
+        typing.List[typing.List[Unit]]:
+    """Разбивает граф зависимостей на сильно связные компоненты алгоритмом Тарьяна. Компоненты возвращаются
+    в обратном топологическом порядке: юниты компоненты задают значения только юнитам предшествующих ей
+    в списке компонент и самой компоненты."""
+    index = {}
+    low_link = {}
+    stack = []
+    on_stack = set()
+    res = []
+
+    def visit(unit: Unit):
+        index[unit] = low_link[unit] = len(index)
+        stack.append(unit)
+        on_stack.add(unit)
+        for successor in graph[unit]:
+            if successor not in index:
+                visit(successor)
+                low_link[unit] = min(low_link[unit], low_link[successor])
+            elif successor in on_stack:
+                low_link[unit] = min(low_link[unit], index[successor])
+        if low_link[unit] == index[unit]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member is unit:
+                    break
+            res.append(component)
+
+    for unit in graph:
+        if unit not in index:
+            visit(unit)
+    return res
+
+
+class NetworkComponent:
+    """Сильно связная компонента графа зависимостей юнитов. Юниты ациклической компоненты рассчитываются
+    один раз, юниты компоненты с контуром - итерационно до схождения значений в связях компоненты."""
+    def __init__(self, units: typing.List[Unit], cyclic: bool, connections: typing.List[Connection]):
+        self.units = units
+        "Юниты в порядке обновления"
+        self.cyclic = cyclic
+        "True, если компонента содержит контур"
+        self.connection_set = ConnectionSet(connections)
+        "Связи, значения в которых задают юниты компоненты"
+        self.iter_number = 0
+        "Число итераций при последнем расчете"
+        self.residual = None
+        "Максимальная невязка на последней итерации"
+
+    def __repr__(self):
+        return 'NetworkComponent([%s], cyclic=%s)' % (', '.join(str(unit) for unit in self.units), self.cyclic)
+
+
+def _get_component_order(units: typing.List[Unit], graph: typing.Dict[Unit, typing.Dict[Unit, int]],
+                         inflow: typing.Dict[Unit, int], position: typing.Dict[Unit, int]) -> typing.List[Unit]:
+    """Упорядочивает юниты компоненты с контуром обходом в глубину от юнита, получающего больше всего значений
+    извне компоненты, по связям в порядке убывания их числа. Значения, передаваемые по направлению обхода
+    (по течению рабочего тела), за проход обновляются, разрываются только связи, замыкающие контуры."""
+    members = set(units)
+    visited = set()
+    postorder = []
+
+    def visit(unit: Unit):
+        visited.add(unit)
+        for successor in sorted(graph[unit], key=lambda item: (-graph[unit][item], position[item])):
+            if successor in members and successor not in visited:
+                visit(successor)
+        postorder.append(unit)
+
+    visit(max(units, key=lambda unit: (inflow[unit], -position[unit])))
+    return postorder[::-1]
+
+
+def get_components(unit_arr: typing.List[Unit], connection_arr: typing.List[ConnectionSet]) -> \
+        typing.List[NetworkComponent]:
+    """Разбивает сеть на сильно связные компоненты графа зависимостей и возвращает их в топологическом
+    порядке. Из готовых к расчету компонент первой берется та, которая стала готовой последней, поэтому
+    юниты следуют по течению рабочего тела, а нагрузки - непосредственно перед приводящими их турбинами.
+    Типы портов юнитов должны быть заданы."""
+    graph = get_dependency_graph(unit_arr, connection_arr)
+    position = {unit: n for n, unit in enumerate(unit_arr)}
+    unit_sets = get_strongly_connected_components(graph)
+    component_number = {unit: n for n, unit_set in enumerate(unit_sets) for unit in unit_set}
+    weights = [{} for _ in unit_sets]
+    inflow = {unit: 0 for unit in unit_arr}
+    for unit, successors in graph.items():
+        for successor, weight in successors.items():
+            n, m = component_number[unit], component_number[successor]
+            if n != m:
+                weights[n][m] = weights[n].get(m, 0) + weight
+                inflow[successor] += weight
+    in_degree = [0 for _ in unit_sets]
+    for successors in weights:
+        for m in successors:
+            in_degree[m] += 1
+    first_position = [min(position[unit] for unit in unit_set) for unit_set in unit_sets]
+    ready = sorted([n for n in range(len(unit_sets)) if in_degree[n] == 0], key=lambda n: -first_position[n])
+    order = []
+    while ready:
+        n = ready.pop()
+        order.append(n)
+        for m in sorted(weights[n], key=lambda item: (weights[n][item], -first_position[item])):
+            in_degree[m] -= 1
+            if in_degree[m] == 0:
+                ready.append(m)
+    assert len(order) == len(unit_sets)
+    connections = {n: [] for n in range(len(unit_sets))}
+    for conn_set in connection_arr:
+        for connection in conn_set.connections:
+            writer = get_writing_unit(connection)
+            if writer in component_number:
+                connections[component_number[writer]].append(connection)
+    res = []
+    for n in order:
+        unit_set = unit_sets[n]
+        cyclic = len(unit_set) > 1 or unit_set[0] in graph[unit_set[0]]
+        units = _get_component_order(unit_set, graph, inflow, position) if cyclic else unit_set
+        res.append(NetworkComponent(units, cyclic, connections[n]))
+    return res
@@ -1,23 +1,36 @@
 import logging
+import typing
+import warnings
 import numpy as np
 
 from ..tools.gas_dynamics import GasDynamicFunctions as gd
 from .network_lib import *
+from .instrumentation import get_active_instrumentation, EventCategory
 from ..gases import *
+from ..gases import _to_value
 from ..fuels import Fuel, NaturalGas
 from ..tools import functions as func
 
-logging.basicConfig(format='%(levelname)s: %(message)s', filemode='w', filename='cycle.log', level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 
 class Compressor(GasDynamicUnit, MechEnergyConsumingUnit):
-    def __init__(self, pi_c, work_fluid: IdealGas=Air(), eta_stag_p=0.89, precision=0.01):
+    def __init__(self, pi_c, work_fluid: IdealGas=None, eta_stag_p=0.89, precision=None):
+        """
+        :param pi_c: степень повышения давления
+        :param work_fluid: рабочее тело
+        :param eta_stag_p: политропический КПД
+        :param precision: устарел и не используется, выходные параметры рассчитываются без итераций
+        """
         GasDynamicUnit.__init__(self)
         MechEnergyConsumingUnit.__init__(self)
         self.eta_stag_p = eta_stag_p
         self.pi_c = pi_c
-        self.work_fluid = work_fluid
+        self.work_fluid = work_fluid if work_fluid is not None else Air()
+        if precision is not None:
+            warnings.warn('Compressor precision is not used and will be removed', DeprecationWarning, stacklevel=2)
         self.precision = precision
+        "Устарел и не используется"
         self._k = None
         self._k_res = 1
         self._k_old = None
@@ -62,30 +75,33 @@ class Compressor(GasDynamicUnit, MechEnergyConsumingUnit):
         self.make_port_output(self.g_work_fluid_outlet_port)
 
     def update(self, relax_coef=1):
+        """Температура на выходе находится обращением функции энтропии рабочего тела: для политропического
+        сжатия phi(T_stag_out) = phi(T_stag_in) + R * ln(pi_c) / eta_stag_p. Расчет не содержит итераций
+        и не зависит от предыдущих вызовов."""
+        self._inner_iter_number = 0
         if self.check_input():
-            self.work_fluid.__init__()
-            self._k = self.work_fluid.k_av_int
+            table = get_entropy_table(self.work_fluid)
+            self.T_stag_out = table.get_temp_by_entropy(
+                table.entropy(self.T_stag_in, self.alpha_in) + self.work_fluid.R * np.log(self.pi_c) /
+                self.eta_stag_p, self.alpha_in
+            )
             self.work_fluid.T1 = self.T_stag_in
-            while self._k_res >= self.precision:
-                self._eta_stag = func.eta_comp_stag(self.pi_c, self._k, self.eta_stag_p)
-                self.work_fluid.T2 = self.T_stag_in * (1 + (self.pi_c ** ((self._k - 1) / self._k) - 1) /
-                                                       self._eta_stag)
-                self.T_stag_out = self.work_fluid.T2
-                self._k_old = self._k
-                self._k = self.work_fluid.k_av_int
-                self._k_res = abs(self._k - self._k_old) / self._k_old
-            self.consumable_labour = self.work_fluid.c_p_av_int_func(
-                self.T_stag_in, self.T_stag_out) * (self.T_stag_out - self.T_stag_in)
+            self.work_fluid.T2 = self.T_stag_out
+            self._k = self.work_fluid.k_av_int
+            self._k_old = self._k
+            self._k_res = 0
+            self._eta_stag = func.eta_comp_stag(self.pi_c, self._k, self.eta_stag_p)
+            self.consumable_labour = self.work_fluid.c_p_av_int * (self.T_stag_out - self.T_stag_in)
             self.p_stag_out = self.p_stag_in * self.pi_c
             self.g_out = self.g_in
             self.alpha_out = self.alpha_in
             self.g_fuel_out = self.g_fuel_in
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class Turbine(GasDynamicUnit, MechEnergyGeneratingUnit):
-    def __init__(self, work_fluid: IdealGas=KeroseneCombustionProducts(), eta_stag_p=0.91, eta_m=0.99, precision=0.01,
+    def __init__(self, work_fluid: IdealGas=None, eta_stag_p=0.91, eta_m=0.99, precision=0.01,
                  eta_r=0.99, **kwargs):
         """
         :param work_fluid: рабочее тело турбины
@@ -100,7 +116,7 @@ class Turbine(GasDynamicUnit, MechEnergyGeneratingUnit):
         MechEnergyGeneratingUnit.__init__(self)
         self.eta_stag_p = eta_stag_p
         self.precision = precision
-        self.work_fluid = work_fluid
+        self.work_fluid = work_fluid if work_fluid is not None else KeroseneCombustionProducts()
         self.eta_m = eta_m
         self.eta_r = eta_r
         self._k = None
@@ -209,28 +225,66 @@ class Turbine(GasDynamicUnit, MechEnergyGeneratingUnit):
             self.make_port_input(self.pres_inlet_port)
             self.make_port_input(self.pres_outlet_port)
 
-    def _compute_compressor_turbine(self):
-        self._k_res = 1
-        self._pi_t_res = 1
-        self.work_fluid.__init__()
-        self._k = self.work_fluid.k_av_int
-        self.work_fluid.alpha = self.alpha_in
+    def _compute_expansion(self, labour=None, pi_t=None):
+        """Совместно находит температуру на выходе и степень понижения давления методом Ньютона по двум
+        переменным (T_stag_out, ln(pi_t)). Уравнения:
+        h(T_stag_in) - h(T_stag_out) = labour (турбина компрессора) или ln(pi_t) = ln(p_stag_in / p_stag_out)
+        (силовая турбина); phi(T_stag_in) - phi(T_stag_out) = eta_stag_p * R * ln(pi_t) - политропическое
+        расширение, phi - функция энтропии.
+
+        :param labour: удельная работа турбины, если задана
+        :param pi_t: степень понижения давления, если задана
+        """
+        precision = self.precision
+        alpha = self.alpha_in
+        R = self.work_fluid.R
+        c_p_in = self.work_fluid.c_p_real_func(self.T_stag_in, alpha=alpha)
+        if labour is not None:
+            T_out = self.T_stag_in - labour / c_p_in
+            ln_pi_t = c_p_in * np.log(self.T_stag_in / T_out) / (self.eta_stag_p * R)
+        else:
+            ln_pi_t = np.log(pi_t)
+            T_out = self.T_stag_in * np.exp(-self.eta_stag_p * R * ln_pi_t / c_p_in)
+        h_in, h_out = None, None
+        instr = get_active_instrumentation()
+        if instr is not None:
+            instr.begin(EventCategory.Loop, 'Turbine.newton')
+        active = True
+        while np.any(active):
+            if self._inner_iter_number >= self.max_inner_iter_number:
+                raise RuntimeError('Convergence is not obtained in the turbine expansion loop')
+            self._inner_iter_number += 1
+            h_in, h_out_new, c_p_out, phi_diff = self.work_fluid.get_enthalpy_and_entropy_difference(
+                self.T_stag_in, T_out, alpha=alpha
+            )
+            f2 = -phi_diff - self.eta_stag_p * R * ln_pi_t
+            j21 = -c_p_out / T_out
+            j22 = -self.eta_stag_p * R
+            if labour is not None:
+                d_T = (h_in - h_out_new - labour) / c_p_out
+                d_ln_pi_t = -(f2 + j21 * d_T) / j22
+            else:
+                d_ln_pi_t = np.log(pi_t) - ln_pi_t
+                d_T = -(f2 + j22 * d_ln_pi_t) / j21
+            h_out = func.masked(active, h_out_new + c_p_out * d_T, h_out)
+            T_out = func.masked(active, T_out + d_T, T_out)
+            ln_pi_t = func.masked(active, ln_pi_t + d_ln_pi_t, ln_pi_t)
+            active = func.masked(active, np.logical_not((abs(d_T) / T_out < precision) & (abs(d_ln_pi_t) < precision)),
+                                  active)
+        if instr is not None:
+            instr.end(EventCategory.Loop, 'Turbine.newton', iter_number=self._inner_iter_number)
+        self.T_stag_out = T_out
+        self._pi_t = np.exp(ln_pi_t)
+        self._pi_t_old = self._pi_t
+        self._pi_t_res = 0
         self.work_fluid.T1 = self.T_stag_in
-        self.total_labour = (self.gen_labour1 + self.gen_labour2) / (self.g_in * self.eta_m)
-        while self._k_res >= self.precision:
-            self.T_stag_out = self.T_stag_in - self.total_labour / self.work_fluid.c_p_av_int
-            self.work_fluid.T2 = self.T_stag_out
-            self._k_old = self._k
-            self._k = self.work_fluid.k_av_int
-            self._k_res = abs(self._k - self._k_old) / self._k_old
-        self._pi_t = (1 - self.total_labour / (self.T_stag_in * self.work_fluid.c_p_av_int * self.eta_stag_p)) ** \
-                     (self._k / (1 - self._k))
-        while self._pi_t_res >= self.precision:
-            self._eta_stag = func.eta_turb_stag(self._pi_t, self._k, self.eta_stag_p)
-            self._pi_t_old = self._pi_t
-            self._pi_t = (1 - self.total_labour / (self.T_stag_in * self.work_fluid.c_p_av_int * self._eta_stag)) ** \
-                         (self._k / (1 - self._k))
-            self._pi_t_res = abs(self._pi_t - self._pi_t_old) / self._pi_t_old
+        self.work_fluid.T2 = T_out
+        self.work_fluid.alpha = alpha
+        self._k = self.work_fluid.k_av_int
+        self._k_old = self._k
+        self._k_res = 0
+        self._eta_stag = func.eta_turb_stag(self._pi_t, self._k, self.eta_stag_p)
+        return h_in - h_out
 
     def update(self):
         if self.check_power_turbine_behaviour():
@@ -239,54 +293,74 @@ class Turbine(GasDynamicUnit, MechEnergyGeneratingUnit):
         if self.check_downstream_compressor_turbine_behaviour():
             assert self._p_stag_out_init is not None, 'For downstream compressor turbine computing the initial ' \
                                                       'approximation of outlet stagnation pressure must must be set'
+        self._inner_iter_number = 0
         if self.check_input():
             self.alpha_out = self.alpha_in
             self.g_out = self.g_in
             self.g_fuel_out = self.g_fuel_in
             if self.check_power_turbine_behaviour():
-                self._k_res = 1
-                self.work_fluid.__init__()
-                self._k = self.work_fluid.k_av_int
-                self.work_fluid.alpha = self.alpha_in
-                self.work_fluid.T1 = self.T_stag_in
-                self._pi_t = self.p_stag_in / self.p_stag_out
-                while self._k_res >= self.precision:
-                    self._eta_stag = func.eta_turb_stag(self._pi_t, self._k, self.eta_stag_p)
-                    self.work_fluid.T2 = self.T_stag_in * (1 - (1 - self._pi_t **
-                                                                ((1 - self._k) / self._k)) * self._eta_stag)
-                    self.T_stag_out = self.work_fluid.T2
-                    self._k_old = self._k
-                    self._k = self.work_fluid.k_av_int
-                    self._k_res = abs(self._k - self._k_old) / self._k_old
-                self.total_labour = self.work_fluid.c_p_av_int * (self.T_stag_in - self.T_stag_out)
+                self.total_labour = self._compute_expansion(pi_t=self.p_stag_in / self.p_stag_out)
                 if self.labour_generating_port2.port_type == PortType.Output:
                     self.gen_labour2 = self.eta_r * (self.total_labour * self.eta_m * self.g_in - self.gen_labour1)
                 elif self.labour_generating_port1.port_type == PortType.Output:
                     self.gen_labour1 = self.eta_r * (self.total_labour * self.eta_m * self.g_in - self.gen_labour2)
 
             elif self.check_upstream_compressor_turbine_behaviour():
-                self._compute_compressor_turbine()
+                self.total_labour = (self.gen_labour1 + self.gen_labour2) / (self.g_in * self.eta_m)
+                self._compute_expansion(labour=self.total_labour)
                 self.p_stag_out = self.p_stag_in / self._pi_t
 
             elif self.check_downstream_compressor_turbine_behaviour():
-                self._compute_compressor_turbine()
+                self.total_labour = (self.gen_labour1 + self.gen_labour2) / (self.g_in * self.eta_m)
+                self._compute_expansion(labour=self.total_labour)
                 self.p_stag_in = self.p_stag_out * self._pi_t
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class Source(GasDynamicUnit):
     """Моделирует возврат в проточную часть части воздуха, отобранного для охлаждения."""
-    def __init__(self, work_fluid: IdealGas=KeroseneCombustionProducts(), g_return=0.01, return_fluid: IdealGas=Air(),
-                 T_return=700):
+    def __init__(self, work_fluid: IdealGas=None, g_return=0.01, return_fluid: IdealGas=None,
+                 T_return=700, return_points: typing.Sequence[typing.Tuple[float, float]]=()):
         """
         :param g_return: относительный расход возвращаемого воздуха (по отношению к расходу на входе в компрессор)
+        :param T_return: температура возвращаемого воздуха
+        :param return_points: дополнительные точки возврата - пары (относительный расход, температура); все
+                потоки смешиваются за один расчет. Массивы в g_return и T_return задают пакетный расчет, а не
+                несколько точек возврата
         """
         GasDynamicUnit.__init__(self)
-        self.work_fluid = work_fluid
+        self.work_fluid = work_fluid if work_fluid is not None else KeroseneCombustionProducts()
         self.g_return = g_return
-        self.return_fluid = return_fluid
+        self.return_fluid = return_fluid if return_fluid is not None else Air()
         self.T_return = T_return
+        self.return_points = [tuple(point) for point in return_points]
+        "Дополнительные точки возврата: пары (относительный расход, температура)"
+        self.T_mix_new = None
+        self.temp_mix_res = None
+
+    @property
+    def g_return_sum(self):
+        """Суммарный относительный расход возвращаемого воздуха"""
+        return self.g_return + sum(g for g, _ in self.return_points)
+
+    @property
+    def c_p_comb_products_av(self):
+        """Средняя теплоемкость газа на входе"""
+        return self.work_fluid.c_p_av_func(self.T_stag_in, alpha=self.alpha_in)
+
+    @property
+    def c_p_air_av(self):
+        """Средняя теплоемкость возвращаемого воздуха"""
+        return self.return_fluid.c_p_av_func(np.asarray(self.T_return, dtype=float), alpha=1)
+
+    @property
+    def mixture(self) -> IdealGas:
+        """Рабочее тело смеси на выходе; создается при обращении"""
+        res = type(self.work_fluid)()
+        res.alpha = self.alpha_out
+        res.T = self.T_stag_out
+        return res
 
     def check_upstream_behaviour(self) -> bool:
         """Возвращает True, если источник должен передавать давление по потоку, т.е. если он находится по
@@ -341,26 +415,32 @@ class Source(GasDynamicUnit):
             self.make_port_input(self.pres_outlet_port)
 
     def _compute(self):
-        self.work_fluid.__init__()
-        self.work_fluid.alpha = self.alpha_in
-        self.alpha_out = 1 / (self.work_fluid.l0 * (self.g_fuel_in / (self.g_in + self.g_return - self.g_fuel_in)))
-        self.g_out = self.g_in + self.g_return
-
-        (self.T_mix_new, self.mixture, self.c_p_comb_products_av,
-         self.c_p_air_av, self._T_mix, self.temp_mix_res) = func.get_mixture_temp(
-            comb_products=self.work_fluid,
-            air=self.return_fluid,
-            temp_comb_products=self.T_stag_in,
-            temp_air=self.T_return,
-            g_comb_products=self.g_in,
-            g_air=self.g_return,
-            alpha_mixture=self.alpha_out
+        g_return_list = [self.g_return] + [g for g, _ in self.return_points]
+        T_return_list = [self.T_return] + [T for _, T in self.return_points]
+        self.alpha_out = 1 / (self.work_fluid.l0 * (self.g_fuel_in / (self.g_in + self.g_return_sum - self.g_fuel_in)))
+        self.g_out = self.g_in + self.g_return_sum
+
+        instr = get_active_instrumentation()
+        if instr is not None:
+            instr.begin(EventCategory.Loop, 'Source.mixture')
+        self.T_mix_new, _, _, self.temp_mix_res, iter_number = func.get_streams_mixture_temp(
+            mixture=self.work_fluid,
+            alpha_mixture=self.alpha_out,
+            gases=[self.work_fluid] + [self.return_fluid] * len(g_return_list),
+            T_list=[self.T_stag_in] + T_return_list,
+            g_list=[self.g_in] + g_return_list,
+            alpha_list=[self.alpha_in] + [1] * len(g_return_list),
+            max_iter_number=self.max_inner_iter_number
         )
+        self._inner_iter_number += iter_number
+        if instr is not None:
+            instr.end(EventCategory.Loop, 'Source.mixture', iter_number=iter_number)
 
         self.g_fuel_out = self.g_fuel_in
-        self.T_stag_out = self._T_mix
+        self.T_stag_out = self.T_mix_new
 
     def update(self):
+        self._inner_iter_number = 0
         if self.check_input():
             self._compute()
             if self.check_upstream_behaviour():
@@ -370,7 +450,7 @@ class Source(GasDynamicUnit):
         elif self.check_input_partially():
             self._compute()
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class Sink(GasDynamicUnit):
@@ -413,13 +493,13 @@ class Sink(GasDynamicUnit):
             self.p_stag_out = self.p_stag_in
             self.g_out = self.g_in - self.g_cooling - self.g_outflow
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class CombustionChamber(GasDynamicUnit):
     def __init__(self, T_gas, precision=0.01, eta_burn=0.99, sigma_comb=0.98,
-                 work_fluid_in: IdealGas=Air(), work_fluid_out: IdealGas=NaturalGasCombustionProducts(),
-                 fuel: Fuel=NaturalGas(), T_fuel=288, delta_p_fuel=5e5, **kwargs):
+                 work_fluid_in: IdealGas=None, work_fluid_out: IdealGas=None,
+                 fuel: Fuel=None, T_fuel=288, delta_p_fuel=5e5, **kwargs):
         """
         :param T_gas: температура газа после камеры сгорания
         :param precision:  точноссть расчета камеры
@@ -436,17 +516,19 @@ class CombustionChamber(GasDynamicUnit):
         """
         GasDynamicUnit.__init__(self)
         self._T_gas = T_gas
-        self.work_fluid_in = work_fluid_in
-        self.work_fluid_out = work_fluid_out
+        self.work_fluid_in = work_fluid_in if work_fluid_in is not None else Air()
+        self.work_fluid_out = work_fluid_out if work_fluid_out is not None else NaturalGasCombustionProducts()
         self.precision = precision
         self.eta_burn = eta_burn
         self.sigma_comb = sigma_comb
-        self.fuel = fuel
+        self.fuel = fuel if fuel is not None else NaturalGas()
         self.T_fuel = T_fuel
         self.delta_p_fuel = delta_p_fuel
         self._alpha_res = 1
         self._alpha_out_old = None
         self._g_fuel_prime = 0
+        self._fuel_enthalpy = None
+        self._fuel_enthalpy_key = None
         self.i_in_stag = None
         self.i_out_stag = None
         self.i_fuel = None
@@ -537,10 +619,73 @@ class CombustionChamber(GasDynamicUnit):
     def alpha_out_old(self):
         return self._alpha_out_old
 
+    def _get_fuel_enthalpy(self):
+        """Возвращает энтальпию топлива. Энтальпия пересчитывается, только если изменились топливо, его
+        температура или давление."""
+        key = (self.fuel, np.copy(self.T_fuel), np.copy(self.p_fuel))
+        cached_key = self._fuel_enthalpy_key
+        if cached_key is None or cached_key[0] is not key[0] or not all(
+                np.array_equal(value, cached_value) for value, cached_value in zip(key[1:], cached_key[1:])):
+            self._fuel_enthalpy = self.fuel.get_specific_enthalpy(self.T_fuel, p=self.p_fuel)
+            self._fuel_enthalpy_key = key
+        return self._fuel_enthalpy
+
+    def _get_alpha(self, g_fuel_prime):
+        return (self.g_in - self.g_fuel_in) / (self.l0 * (g_fuel_prime * self.g_in + self.g_fuel_in))
+
+    def _solve_enthalpy_balance(self, precision):
+        """Решает уравнение баланса энтальпий относительно относительного расхода топлива g_fuel_prime:
+
+        g_fuel_prime * (Q_n * eta_burn + i_fuel - i_out(alpha)) - (i_out(alpha) - i_in) = 0,
+
+        где коэффициент избытка воздуха на выходе alpha зависит от g_fuel_prime. Используется метод Ньютона с
+        производной dh/dalpha из модели рабочего тела; корень заключен между нулевым расходом топлива и
+        стехиометрическим (alpha = 1), шаг, выходящий за текущие границы, заменяется делением отрезка пополам.
+        Начальное приближение - коэффициент избытка воздуха на выходе с предыдущего расчета, если размер пакета
+        не изменился."""
+        heat = self.Q_n * self.eta_burn + self.i_fuel
+        shape = np.broadcast(self.i_in_stag, self.i_fuel, self.T_stag_out, self.g_in, self.g_fuel_in).shape
+        g_fuel_lower = np.zeros(shape)
+        g_fuel_upper = ((self.g_in - self.g_fuel_in) / self.l0 - self.g_fuel_in) / self.g_in + g_fuel_lower
+        alpha = self.alpha_out if np.shape(self.alpha_out) in ((), shape) else self._alpha_out_init
+        g_fuel_prime = np.clip(((self.g_in - self.g_fuel_in) / (self.l0 * alpha) - self.g_fuel_in) /
+                               self.g_in, g_fuel_lower, g_fuel_upper)
+        alpha = self._get_alpha(g_fuel_prime)
+
+        instr = get_active_instrumentation()
+        if instr is not None:
+            instr.begin(EventCategory.Loop, 'CombustionChamber.alpha')
+        active = np.full(shape, True)
+        while np.any(active):
+            if self._inner_iter_number >= self.max_inner_iter_number:
+                raise RuntimeError('Convergence is not obtained in the combustion chamber fuel flow loop')
+            self._inner_iter_number += 1
+            i_out, di_dalpha = self.work_fluid_out.get_enthalpy_and_alpha_derivative(self.T_stag_out, alpha)
+            res = g_fuel_prime * (heat - i_out) - (i_out - self.i_in_stag)
+            dalpha_dg = -alpha * self.g_in / (g_fuel_prime * self.g_in + self.g_fuel_in)
+            res_der = heat - i_out - (1 + g_fuel_prime) * di_dalpha * dalpha_dg
+            g_fuel_lower = func.masked(active & (res < 0), g_fuel_prime, g_fuel_lower)
+            g_fuel_upper = func.masked(active & (res >= 0), g_fuel_prime, g_fuel_upper)
+            g_fuel_new = g_fuel_prime - res / res_der
+            g_fuel_new = np.where((g_fuel_new >= g_fuel_lower) & (g_fuel_new <= g_fuel_upper), g_fuel_new,
+                                  0.5 * (g_fuel_lower + g_fuel_upper))
+            alpha_new = self._get_alpha(g_fuel_new)
+            self._alpha_res = func.masked(active, abs(alpha_new - alpha) / alpha_new, self._alpha_res)
+            self._alpha_out_old = func.masked(active, alpha, self._alpha_out_old)
+            self.i_out_stag = func.masked(active, i_out, self.i_out_stag)
+            g_fuel_prime = func.masked(active, g_fuel_new, g_fuel_prime)
+            alpha = func.masked(active, alpha_new, alpha)
+            active = np.logical_not(self._alpha_res < precision)
+        if instr is not None:
+            instr.end(EventCategory.Loop, 'CombustionChamber.alpha', iter_number=self._inner_iter_number)
+        self._g_fuel_prime = _to_value(g_fuel_prime)
+        self.alpha_out = _to_value(alpha)
+
     def update(self):
         if self.check_downstream_behaviour():
             assert self._p_stag_out_init is not None, 'For downstream combustion chamber computing the initial ' \
                                                       'approximation of outlet stagnation pressure must be set'
+        self._inner_iter_number = 0
         if self.check_input():
             if self.check_upstream_behaviour():
                 self.p_stag_out = self.p_stag_in * self.sigma_comb
@@ -549,31 +694,13 @@ class CombustionChamber(GasDynamicUnit):
 
             self._alpha_res = 1
             self.T_stag_out = self._T_gas
-            self.work_fluid_in.__init__()
-            self.work_fluid_out.__init__()
-
-            self.work_fluid_in.alpha = self.alpha_in
-            self.work_fluid_out.alpha = self.alpha_out
+            self.i_in_stag = self.work_fluid_in.get_specific_enthalpy(self.T_stag_in, alpha=self.alpha_in)
+            self.p_fuel = self.p_stag_in + self.delta_p_fuel
+            self.i_fuel = self._get_fuel_enthalpy()
+            self._solve_enthalpy_balance(self.precision)
 
-            self.work_fluid_in.T = self.T_stag_in
-            self.work_fluid_out.T = self.T_stag_out
-
-            while self._alpha_res >= self.precision:
-                self.i_in_stag = self.work_fluid_in.get_specific_enthalpy(self.T_stag_in, alpha=self.alpha_in)
-                self.i_out_stag = self.work_fluid_out.get_specific_enthalpy(self.T_stag_out,
-                                                                            alpha=self.work_fluid_out.alpha)
-                self.p_fuel = self.p_stag_in + self.delta_p_fuel
-                self.i_fuel = self.fuel.get_specific_enthalpy(self.T_fuel, p=self.p_fuel)
-                self._g_fuel_prime = (self.i_out_stag - self.i_in_stag) / (
-                        self.Q_n * self.eta_burn + self.i_fuel - self.i_out_stag
-                )
-                self.g_out = self.g_in * (1 + self._g_fuel_prime)
-                self._alpha_out_old = self.work_fluid_out.alpha
-                self.alpha_out = 1 / (self.l0 * (self.g_fuel_prime * self.g_in + self.g_fuel_in) / (self.g_in -
-                                                                                                    self.g_fuel_in))
-                self.g_fuel_out = self.g_fuel_in + self._g_fuel_prime * self.g_in
-                self.work_fluid_out.alpha = self.alpha_out
-                self._alpha_res = abs(self._alpha_out_old - self.alpha_out) / self.alpha_out
+            self.g_out = self.g_in * (1 + self._g_fuel_prime)
+            self.g_fuel_out = self.g_fuel_in + self._g_fuel_prime * self.g_in
 
         elif self.check_input_partially():
             if self.check_upstream_behaviour():
@@ -581,14 +708,14 @@ class CombustionChamber(GasDynamicUnit):
             else:
                 self.p_stag_in = self.p_stag_out / self.sigma_comb
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class Inlet(GasDynamicUnit):
-    def __init__(self, sigma=0.99, work_fluid=Air()):
+    def __init__(self, sigma=0.99, work_fluid: IdealGas=None):
         GasDynamicUnit.__init__(self)
         self.sigma = sigma
-        self.work_fluid = work_fluid
+        self.work_fluid = work_fluid if work_fluid is not None else Air()
 
     def check_input(self) -> bool:
         cond1 = self.T_stag_in is not None
@@ -620,11 +747,11 @@ class Inlet(GasDynamicUnit):
             self.g_out = self.g_in
             self.g_out = self.g_in
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class Outlet(GasDynamicUnitStaticOutlet):
-    def __init__(self, sigma=0.99, c_out=100, work_fluid=KeroseneCombustionProducts()):
+    def __init__(self, sigma=0.99, c_out=100, work_fluid: IdealGas=None):
         """
         :param sigma: Коэффициент сохранения полного давления.
         :param c_out: Скорость на выходе из выходного устройства.
@@ -635,7 +762,7 @@ class Outlet(GasDynamicUnitStaticOutlet):
         self.c_out = c_out
         self.a_cr_out = None
         self.lam_out = None
-        self.work_fluid = work_fluid
+        self.work_fluid = work_fluid if work_fluid is not None else KeroseneCombustionProducts()
 
     def check_input(self) -> bool:
         cond1 = self.T_stag_in is not None
@@ -682,12 +809,14 @@ class Outlet(GasDynamicUnitStaticOutlet):
             self.p_stag_out = self.p_out / gd.pi_lam(self.lam_out, self.work_fluid.k)
             self.p_stag_in = self.p_stag_out / self.sigma
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class Atmosphere(GasDynamicUnitStaticInlet):
-    def __init__(self, p0=1e5, T0=288, work_fluid_in: IdealGas=KeroseneCombustionProducts(),
-                 work_fluid_out: IdealGas=Air(), **kwargs):
+    direct_feedthrough = False
+
+    def __init__(self, p0=1e5, T0=288, work_fluid_in: IdealGas=None,
+                 work_fluid_out: IdealGas=None, **kwargs):
         """
         :param p0: атмосферное давление
         :param T0: темперактура атмосферы
@@ -698,8 +827,8 @@ class Atmosphere(GasDynamicUnitStaticInlet):
         GasDynamicUnitStaticInlet.__init__(self)
         self.p0 = p0
         self.T0 = T0
-        self.work_fluid_in = work_fluid_in
-        self.work_fluid_out = work_fluid_out
+        self.work_fluid_in = work_fluid_in if work_fluid_in is not None else KeroseneCombustionProducts()
+        self.work_fluid_out = work_fluid_out if work_fluid_out is not None else Air()
         if 'T_stag_in_init' in kwargs:
             self._T_stag_in_init = kwargs['T_stag_in_init']
             self.temp_inlet_port.value = self._T_stag_in_init
@@ -739,19 +868,25 @@ class Atmosphere(GasDynamicUnitStaticInlet):
             self.work_fluid_in.T = self.T_stag_in
             self.p_in = self.p0
         else:
-            logging.info('Some of input parameters are not specified.')
+            logger.info('Some of input parameters are not specified.')
 
 
 class FullExtensionNozzle(GasDynamicUnitStaticOutlet):
-    def __init__(self, phi=0.99, work_fluid: IdealGas=KeroseneCombustionProducts(), precision=0.01):
+    def __init__(self, phi=0.99, work_fluid: IdealGas=None, precision=None):
+        """
+        :param phi: коэффициент скорости
+        :param work_fluid: рабочее тело
+        :param precision: устарел и не используется, расширение рассчитывается по таблице энтальпии и функции
+                энтропии без итераций
+        """
         GasDynamicUnitStaticOutlet.__init__(self)
         self.phi = phi
-        self.work_fluid = work_fluid
+        self.work_fluid = work_fluid if work_fluid is not None else KeroseneCombustionProducts()
+        if precision is not None:
+            warnings.warn('FullExtensionNozzle precision is not used and will be removed', DeprecationWarning,
+                          stacklevel=2)
         self.precision = precision
-        self._k = self.work_fluid.k_av_int
-        self._c_p = self.work_fluid.c_p_av_int
-        self._k_res = 1.
-        self._k_old = None
+        "Устарел и не используется"
         self.pi_n = None
         self.c_out = None
         self.H_n = None
@@ -781,29 +916,34 @@ class FullExtensionNozzle(GasDynamicUnitStaticOutlet):
         self.make_port_input(self.stat_pres_outlet_port)
         self.make_port_output(self.stat_temp_outlet_port)
 
+    def get_expansion(self, T_stag_in, p_stag_in, p_out, alpha):
+        """Рассчитывает расширение в сопле по таблице энтальпии и функции энтропии рабочего тела. Поэлементно
+        обрабатывает массивы параметров, поэтому может использоваться для пакетного расчета сопла вне сети.
+
+        :return: изоэнтропический теплоперепад, скорость на выходе, статическая температура на выходе, полное
+                давление на выходе
+        """
+        table = get_entropy_table(self.work_fluid)
+        R = self.work_fluid.R
+        enthalpy_in = table.enthalpy(T_stag_in, alpha)
+        phi_in = table.entropy(T_stag_in, alpha)
+        T_out_ad = table.get_temp_by_entropy(phi_in - R * np.log(p_stag_in / p_out), alpha)
+        H_n = enthalpy_in - table.enthalpy(T_out_ad, alpha)
+        c_out = self.phi * (2 * H_n) ** 0.5
+        T_out = table.get_temp_by_enthalpy(enthalpy_in - c_out ** 2 / 2, alpha)
+        p_stag_out = p_out * np.exp((phi_in - table.entropy(T_out, alpha)) / R)
+        return H_n, c_out, T_out, p_stag_out
+
     def update(self):
+        self._inner_iter_number = 0
         if self.check_input():
             self.pi_n = self.p_stag_in / self.p_out
-            self.work_fluid.alpha = self.alpha_in
-            self.work_fluid.T1 = self.T_stag_in
             self.T_stag_out = self.T_stag_in
             self.alpha_out = self.alpha_in
             self.g_out = self.g_in
             self.g_fuel_out = self.g_fuel_in
-
-            while self._k_res >= self.precision:
-                self._k_old = self._k
-                self.H_n = self._c_p * self.T_stag_in * (1 - self.pi_n ** ((1 - self._k) / self._k))
-                self.T_out = self.T_stag_in - self.phi * self.H_n / self._c_p
-                self.c_out = self.phi * (self.H_n * 2) ** 0.5
-                self.work_fluid.T2 = self.T_out
-                self._k = self.work_fluid.k_av_int
-                self._c_p = self.work_fluid.c_p_av_int
-                self._k_res = abs(self._k_res - self._k_old) / self._k_res
-
-            self.p_stag_out = self.p_out / gd.pi_lam(
-                self.c_out / gd.a_cr(self.T_stag_out, self._k, self.work_fluid.R), self._k
-            )
+            self.H_n, self.c_out, self.T_out, self.p_stag_out = self.get_expansion(self.T_stag_in, self.p_stag_in,
+                                                                                   self.p_out, self.alpha_in)
 
 
 class Load(MechEnergyConsumingUnit):
@@ -827,182 +967,194 @@ class Load(MechEnergyConsumingUnit):
             pass
 
 
-# class Regenerator(Unit):
-#     def __init__(self, regeneration_rate, sigma_hot=0.99, sigma_cold=0.99, work_fluid_cold=Air(),
-#                  work_fluid_hot=KeroseneCombustionProducts()):
-#         self.regeneration_rate = regeneration_rate
-#         self.sigma_hot = sigma_hot
-#         self.sigma_cold = sigma_cold
-#         self.hot_gd_inlet_port = GasDynamicPort()
-#         self.hot_gd_outlet_port = GasDynamicPort()
-#         self.cold_gd_inlet_port = GasDynamicPort()
-#         self.cold_gd_outlet_port = GasDynamicPort()
-#         self.work_fluid_hot = work_fluid_hot
-#         self.work_fluid_cold = work_fluid_cold
-#
-#     @property
-#     def T_stag_hot_in(self):
-#         return self.hot_gd_inlet_port.linked_connection.T_stag
-#
-#     @T_stag_hot_in.setter
-#     def T_stag_hot_in(self, value):
-#         self.hot_gd_inlet_port.linked_connection.T_stag = value
-#
-#     @property
-#     def p_stag_hot_in(self):
-#         return self.hot_gd_inlet_port.linked_connection.p_stag
-#
-#     @p_stag_hot_in.setter
-#     def p_stag_hot_in(self, value):
-#         self.hot_gd_inlet_port.linked_connection.p_stag = value
-#
-#     @property
-#     def T_stag_hot_out(self):
-#         return self.hot_gd_outlet_port.linked_connection.T_stag
-#
-#     @T_stag_hot_out.setter
-#     def T_stag_hot_out(self, value):
-#         self.hot_gd_outlet_port.linked_connection.T_stag = value
-#
-#     @property
-#     def p_stag_hot_out(self):
-#         return self.hot_gd_outlet_port.linked_connection.p_stag
-#
-#     @p_stag_hot_out.setter
-#     def p_stag_hot_out(self, value):
-#         self.hot_gd_outlet_port.linked_connection.p_stag = value
-#
-#     @property
-#     def T_stag_cold_in(self):
-#         return self.cold_gd_inlet_port.linked_connection.T_stag
-#
-#     @T_stag_cold_in.setter
-#     def T_stag_cold_in(self, value):
-#         self.cold_gd_inlet_port.linked_connection.T_stag = value
-#
-#     @property
-#     def p_stag_cold_in(self):
-#         return self.cold_gd_inlet_port.linked_connection.p_stag
-#
-#     @p_stag_cold_in.setter
-#     def p_stag_cold_in(self, value):
-#         self.cold_gd_inlet_port.linked_connection.p_stag = value
-#
-#     @property
-#     def T_stag_cold_out(self):
-#         return self.cold_gd_outlet_port.linked_connection.T_stag
-#
-#     @T_stag_cold_out.setter
-#     def T_stag_cold_out(self, value):
-#         self.cold_gd_outlet_port.linked_connection.T_stag = value
-#
-#     @property
-#     def p_stag_cold_out(self):
-#         return self.cold_gd_outlet_port.linked_connection.p_stag
-#
-#     @p_stag_cold_out.setter
-#     def p_stag_cold_out(self, value):
-#         self.cold_gd_outlet_port.linked_connection.p_stag = value
-#
-#     @property
-#     def g_hot(self):
-#         return self.hot_gd_inlet_port.linked_connection.g
-#
-#     @g_hot.setter
-#     def g_hot(self, value):
-#         self.hot_gd_inlet_port.linked_connection.g = value
-#
-#     @property
-#     def g_cold(self):
-#         return self.cold_gd_inlet_port.linked_connection.g
-#
-#     @g_cold.setter
-#     def g_cold(self, value):
-#         self.cold_gd_inlet_port.linked_connection.g = value
-#
-#     @property
-#     def alpha_hot(self):
-#         return self.hot_gd_inlet_port.linked_connection.alpha
-#
-#     @alpha_hot.setter
-#     def alpha_hot(self, value):
-#         self.hot_gd_inlet_port.linked_connection.alpha = value
-#
-#     @property
-#     def alpha_cold(self):
-#         return self.cold_gd_inlet_port.linked_connection.alpha
-#
-#     @alpha_cold.setter
-#     def alpha_cold(self, value):
-#         self.cold_gd_inlet_port.linked_connection.alpha = value
-#
-#     def _check1(self):
-#         return self.p_stag_cold_in is not None and self.g_hot is not None and self.g_cold is not None\
-#                and self.T_stag_cold_in is not None and self.T_stag_hot_in is not None\
-#                and self.T_stag_hot_out is not None
-#
-#     def _check2(self):
-#         return self.p_stag_hot_out is not None
-#
-#     def _compute_output(self):
-#         self.T_stag_cold_out = self.regeneration_rate * (self.T_stag_hot_in - self.T_stag_cold_in) + \
-#                                self.T_stag_cold_in
-#         self.p_stag_cold_out = self.p_stag_cold_in * self.sigma_cold
-#         self.hot_gd_outlet_port.linked_connection.alpha = self.alpha_hot
-#         self.cold_gd_outlet_port.linked_connection.alpha = self.alpha_cold
-#         self.hot_gd_outlet_port.linked_connection.g_fuel = self.hot_gd_inlet_port.linked_connection.g_fuel
-#         self.cold_gd_outlet_port.linked_connection.g_fuel = self.cold_gd_inlet_port.linked_connection.g_fuel
-#         self.hot_gd_outlet_port.linked_connection.g = self.g_hot
-#         self.cold_gd_outlet_port.linked_connection.g = self.g_cold
-#         self.T_stag_hot_out = self._get_T_stag_hot_out(self.T_stag_cold_in, self.T_stag_cold_out,
-#                                                        self.T_stag_hot_in, self.T_stag_hot_out)
-#
-#     def update(self):
-#         if self._check1():
-#             self._compute_output()
-#         if self._check1() and self._check2():
-#             self._compute_output()
-#             self.p_stag_hot_in = self.p_stag_hot_out / self.sigma_hot
-#
-#     def update_connection_current_state(self, relax_coef=1):
-#         if self._check1() and self._check2():
-#             self.cold_gd_outlet_port.linked_connection.update_current_state(relax_coef)
-#             logging.debug('New state of cold_gd_outlet_port connection')
-#             self.cold_gd_outlet_port.linked_connection.log_state()
-#             self.hot_gd_outlet_port.linked_connection.update_current_state(relax_coef)
-#             logging.info('New state of hot_gd_outlet_port connection')
-#             self.hot_gd_outlet_port.linked_connection.log_state()
-#             self.hot_gd_inlet_port.linked_connection.update_current_state(relax_coef)
-#             logging.info('New state of hot_gd_inlet_port connection')
-#             self.hot_gd_inlet_port.linked_connection.log_state()
-#
-#     def _get_T_stag_hot_out(self, T_stag_cold_in, T_stag_cold_out, T_stag_hot_in, T_stag_hot_out):
-#         self.work_fluid_cold.__init__()
-#         self.work_fluid_hot.__init__()
-#         self.work_fluid_hot.alpha = self.alpha_hot
-#         self.work_fluid_cold.T1 = T_stag_cold_in
-#         self.work_fluid_cold.T2 = T_stag_cold_out
-#         self.work_fluid_hot.T1 = T_stag_hot_in
-#         self.work_fluid_hot.T2 = T_stag_hot_out
-#         c_p_av_ratio = self.work_fluid_cold.c_p_av_int / self.work_fluid_hot.c_p_av_int
-#         g_rel_ratio = self.g_cold / self.g_hot
-#         return self.T_stag_hot_in - g_rel_ratio * c_p_av_ratio * (T_stag_cold_out - T_stag_cold_in)
-#
-
-if __name__ == '__main__':
-    pass
+class Regenerator(GasDynamicUnit):
+    """Холодная сторона регенератора: подогрев воздуха за компрессором газом за турбинами. Включается в газовый
+    тракт между компрессором и камерой сгорания. Горячая сторона (RegeneratorHotSide) включается в тракт за
+    турбинами и связывается с холодной методом NetworkSolver.create_heat_exchange_connection: холодная сторона
+    получает температуру газа на входе в горячую и передает ей теплоту, полученную воздухом."""
+    def __init__(self, regeneration_rate=0.7, sigma_cold=0.98, work_fluid: IdealGas=None, T_stag_hot_in_init=800):
+        """
+        :param regeneration_rate: степень регенерации - отношение подогрева воздуха к разности температур газа
+                на входе в горячую сторону и воздуха на входе в холодную
+        :param sigma_cold: коэффициент сохранения полного давления холодной стороны
+        :param work_fluid: рабочее тело холодной стороны
+        :param T_stag_hot_in_init: начальное приближение для температуры газа на входе в горячую сторону
+        """
+        GasDynamicUnit.__init__(self)
+        self.regeneration_rate = regeneration_rate
+        self.sigma_cold = sigma_cold
+        self.work_fluid = work_fluid if work_fluid is not None else Air()
+        self._hot_temp_inlet_port = InletPort(self)
+        self._heat_outlet_port = OutletPort(self)
+        self._T_stag_hot_in_init = T_stag_hot_in_init
+        self.hot_temp_inlet_port.value = T_stag_hot_in_init
+
+    @property
+    def hot_temp_inlet_port(self) -> InletPort:
+        """Возвращает порт приема температуры газа на входе в горячую сторону"""
+        return self._hot_temp_inlet_port
+
+    @property
+    def heat_outlet_port(self) -> OutletPort:
+        """Возвращает порт передачи теплоты горячей стороне"""
+        return self._heat_outlet_port
+
+    @property
+    def T_stag_hot_in(self):
+        """Температура газа на входе в горячую сторону"""
+        return self._hot_temp_inlet_port.get()
+
+    @property
+    def heat(self):
+        """Теплота, полученная воздухом, отнесенная к расходу на входе в компрессор"""
+        return self._heat_outlet_port.get()
+
+    @heat.setter
+    def heat(self, value):
+        self._heat_outlet_port.set(value)
+
+    def check_input(self):
+        cond1 = self.T_stag_in is not None
+        cond2 = self.p_stag_in is not None
+        cond3 = self.alpha_in is not None
+        cond4 = self.g_in is not None
+        cond5 = self.g_fuel_in is not None
+        return cond1 and cond2 and cond3 and cond4 and cond5
+
+    def set_behaviour(self):
+        self.make_port_input(self.temp_inlet_port)
+        self.make_port_input(self.pres_inlet_port)
+        self.make_port_input(self.alpha_inlet_port)
+        self.make_port_input(self.g_work_fluid_inlet_port)
+        self.make_port_input(self.g_fuel_inlet_port)
+        self.make_port_input(self.hot_temp_inlet_port)
+
+        self.make_port_output(self.temp_outlet_port)
+        self.make_port_output(self.pres_outlet_port)
+        self.make_port_output(self.alpha_outlet_port)
+        self.make_port_output(self.g_work_fluid_outlet_port)
+        self.make_port_output(self.g_fuel_outlet_port)
+        self.make_port_output(self.heat_outlet_port)
 
+    def update(self):
+        if self.check_input():
+            self.p_stag_out = self.p_stag_in * self.sigma_cold
+            self.alpha_out = self.alpha_in
+            self.g_out = self.g_in
+            self.g_fuel_out = self.g_fuel_in
+            if self.T_stag_hot_in is None:
+                self.T_stag_out = self.T_stag_in
+                self.heat = 0
+            else:
+                table = get_entropy_table(self.work_fluid)
+                self.T_stag_out = self.T_stag_in + self.regeneration_rate * (self.T_stag_hot_in - self.T_stag_in)
+                self.heat = self.g_in * (table.enthalpy(self.T_stag_out, self.alpha_in) -
+                                         table.enthalpy(self.T_stag_in, self.alpha_in))
+        else:
+            logger.info('Some of input parameters are not specified.')
 
 
+class RegeneratorHotSide(GasDynamicUnit):
+    """Горячая сторона регенератора: охлаждение газа за турбинами теплотой, переданной холодной стороне
+    (Regenerator). Температура газа на выходе находится из баланса энтальпий."""
+    def __init__(self, sigma_hot=0.97, work_fluid: IdealGas=None):
+        """
+        :param sigma_hot: коэффициент сохранения полного давления горячей стороны
+        :param work_fluid: рабочее тело горячей стороны
+        """
+        GasDynamicUnit.__init__(self)
+        self.sigma_hot = sigma_hot
+        self.work_fluid = work_fluid if work_fluid is not None else KeroseneCombustionProducts()
+        self._hot_temp_outlet_port = OutletPort(self)
+        self._heat_inlet_port = InletPort(self)
 
+    @property
+    def hot_temp_outlet_port(self) -> OutletPort:
+        """Возвращает порт передачи температуры газа на входе холодной стороне"""
+        return self._hot_temp_outlet_port
 
+    @property
+    def heat_inlet_port(self) -> InletPort:
+        """Возвращает порт приема теплоты, полученной холодной стороной"""
+        return self._heat_inlet_port
 
+    @property
+    def heat(self):
+        """Теплота, отданная газом, отнесенная к расходу на входе в компрессор"""
+        return self._heat_inlet_port.get()
 
+    def check_upstream_behaviour(self) -> bool:
+        """Возвращает True, если горячая сторона должна передавать давление по потоку, т.е. если она находится
+        по газовому тракту до силовой турбины или до сопла"""
+        cond1 = self.pres_inlet_port.port_type == PortType.Input
+        cond2 = self.pres_outlet_port.port_type == PortType.Output
+        return cond1 or cond2
 
+    def check_downstream_behaviour(self) -> bool:
+        """Возвращает True, если горячая сторона должна передавать давление против потока, т.е. если она
+        находится по газовому тракту после силовой турбины"""
+        cond1 = self.pres_inlet_port.port_type == PortType.Output
+        cond2 = self.pres_outlet_port.port_type == PortType.Input
+        return cond1 or cond2
 
+    def check_input(self):
+        cond1 = self.check_input_partially()
+        cond2 = False
+        if self.check_upstream_behaviour():
+            cond2 = self.p_stag_in is not None
+        elif self.check_downstream_behaviour():
+            cond2 = self.p_stag_out is not None
+        return cond1 and cond2
 
+    def check_input_partially(self):
+        """Проверка наличия входных данных для осуществления части расчета юнита"""
+        cond1 = self.T_stag_in is not None
+        cond2 = self.alpha_in is not None
+        cond3 = self.g_in is not None
+        cond4 = self.g_fuel_in is not None
+        return cond1 and cond2 and cond3 and cond4
 
+    def set_behaviour(self):
+        self.make_port_input(self.temp_inlet_port)
+        self.make_port_input(self.alpha_inlet_port)
+        self.make_port_input(self.g_work_fluid_inlet_port)
+        self.make_port_input(self.g_fuel_inlet_port)
+        self.make_port_input(self.heat_inlet_port)
 
+        self.make_port_output(self.temp_outlet_port)
+        self.make_port_output(self.alpha_outlet_port)
+        self.make_port_output(self.g_work_fluid_outlet_port)
+        self.make_port_output(self.g_fuel_outlet_port)
+        self.make_port_output(self.hot_temp_outlet_port)
 
+        if self.check_upstream_behaviour():
+            self.make_port_input(self.pres_inlet_port)
+            self.make_port_output(self.pres_outlet_port)
+        elif self.check_downstream_behaviour():
+            self.make_port_output(self.pres_inlet_port)
+            self.make_port_input(self.pres_outlet_port)
 
+    def _compute(self):
+        self._hot_temp_outlet_port.set(self.T_stag_in)
+        self.alpha_out = self.alpha_in
+        self.g_out = self.g_in
+        self.g_fuel_out = self.g_fuel_in
+        if self.heat is None:
+            self.T_stag_out = self.T_stag_in
+        else:
+            table = get_entropy_table(self.work_fluid)
+            self.T_stag_out = table.get_temp_by_enthalpy(
+                table.enthalpy(self.T_stag_in, self.alpha_in) - self.heat / self.g_in, self.alpha_in
+            )
 
+    def update(self):
+        if self.check_input():
+            self._compute()
+            if self.check_upstream_behaviour():
+                self.p_stag_out = self.p_stag_in * self.sigma_hot
+            elif self.check_downstream_behaviour():
+                self.p_stag_in = self.p_stag_out / self.sigma_hot
+        elif self.check_input_partially():
+            self._compute()
+        else:
+            logger.info('Some of input parameters are not specified.')
@@ -1,5 +1,6 @@
-from scipy.integrate import quad
 from abc import ABCMeta, abstractmethod
+import numpy as np
+from .gases import _gauss_nodes, _gauss_weights, _to_value
 
 
 class Fuel(metaclass=ABCMeta):
@@ -11,8 +12,15 @@ class Fuel(metaclass=ABCMeta):
         pass
 
     def get_c_p_av(self, T, **kwargs):
-        res = quad(lambda x: self.get_c_p_real(x, **kwargs), self.T0, T)[0] / (T - self.T0)
-        return res
+        """Средняя теплоемкость в интервале температур от T0 до T. Интеграл истинной теплоемкости берется
+        квадратурой Гаусса за один вызов get_c_p_real. Поэлементно обрабатывает массивы температур и параметров."""
+        keys = list(kwargs.keys())
+        args = np.broadcast_arrays(np.asarray(T, dtype=float), *[kwargs[key] for key in keys])
+        T = args[0]
+        shape = (-1,) + (1,) * T.ndim
+        T_nodes = 0.5 * (T + self.T0) + 0.5 * (T - self.T0) * _gauss_nodes.reshape(shape)
+        c_p_arr = self.get_c_p_real(T_nodes, **dict(zip(keys, args[1:])))
+        return _to_value(0.5 * np.sum(_gauss_weights.reshape(shape) * c_p_arr, axis=0))
 
     def get_specific_enthalpy(self, T, **kwargs):
         return self.get_c_p_av(T, **kwargs) * (T - self.T0)
@@ -1,7 +1,185 @@
 from abc import ABCMeta, abstractproperty, abstractstaticmethod, abstractmethod
-from scipy.interpolate import interp2d, interp1d
+import warnings
 import numpy as np
-from scipy.integrate import quad
+
+
+def _to_value(value):
+    """Для скалярного аргумента возвращает float, для массива - массив"""
+    if np.ndim(value) == 0:
+        return float(value)
+    return value
+
+
+def _check_range(name, value, lower, upper):
+    """Выдает RuntimeWarning, если значения аргумента выходят за пределы таблицы"""
+    if np.any((np.asarray(value) < lower) | (np.asarray(value) > upper)):
+        warnings.warn('%s is out of the table range [%s, %s], boundary values are used' % (name, lower, upper),
+                      RuntimeWarning, stacklevel=4)
+
+
+class LinearInterp:
+    """Линейная интерполяция по возрастающей сетке. За пределами сетки значения линейно экстраполируются
+    по крайним отрезкам (так же ведет себя interp1d(fill_value='extrapolate')). Поэлементно обрабатывает
+    массивы аргументов."""
+    def __init__(self, x, y):
+        """
+        :param x: узлы
+        :param y: значения в узлах
+        """
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+
+    def __call__(self, x):
+        i = np.clip(np.searchsorted(self.x, x, side='right') - 1, 0, len(self.x) - 2)
+        t = (x - self.x[i]) / (self.x[i + 1] - self.x[i])
+        return self.y[i] * (1 - t) + self.y[i + 1] * t
+
+
+class BilinearInterp:
+    """Билинейная интерполяция по прямоугольной сетке. За пределами сетки значения берутся с ее границы
+    (так же ведет себя interp2d(kind='linear')), при этом выдается RuntimeWarning. Поэлементно обрабатывает
+    массивы аргументов."""
+    def __init__(self, x, y, z):
+        """
+        :param x: узлы по первому аргументу
+        :param y: узлы по второму аргументу
+        :param z: значения в узлах, массив размера (len(y), len(x))
+        """
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+        self.z = np.array(z, dtype=float)
+
+    def __call__(self, x, y):
+        _check_range('First argument', x, self.x[0], self.x[-1])
+        _check_range('Second argument', y, self.y[0], self.y[-1])
+        x = np.clip(x, self.x[0], self.x[-1])
+        y = np.clip(y, self.y[0], self.y[-1])
+        i = np.clip(np.searchsorted(self.x, x, side='right') - 1, 0, len(self.x) - 2)
+        j = np.clip(np.searchsorted(self.y, y, side='right') - 1, 0, len(self.y) - 2)
+        t_x = (x - self.x[i]) / (self.x[i + 1] - self.x[i])
+        t_y = (y - self.y[j]) / (self.y[j + 1] - self.y[j])
+        return (self.z[j, i] * (1 - t_x) * (1 - t_y) + self.z[j, i + 1] * t_x * (1 - t_y) +
+                self.z[j + 1, i] * (1 - t_x) * t_y + self.z[j + 1, i + 1] * t_x * t_y)
+
+
+_gauss_nodes, _gauss_weights = np.polynomial.legendre.leggauss(8)
+"Узлы и веса квадратуры Гаусса-Лежандра на отрезке [-1, 1]"
+_enthalpy_diff_step = 0.1
+"Шаг по температуре для вычисления производной энтальпии, К"
+_alpha_diff_rel_step = 1e-5
+"Относительный шаг по коэффициенту избытка воздуха для вычисления производной энтальпии"
+
+
+class EntropyTable:
+    """Табулированные энтальпия и функция энтропии рабочего тела в зависимости от температуры и коэффициента
+    избытка воздуха. Узлы по коэффициенту избытка воздуха равномерны по 1 / alpha, между узлами значения
+    интерполируются линейно; при alpha > alpha_max берутся значения для alpha_max, при alpha < 1 - для
+    стехиометрической смеси. Температура по энтальпии или функции энтропии находится по той же таблице без
+    итераций: в двух соседних по alpha строках - поиском отрезка и линейной интерполяцией, затем уточняется одним
+    шагом метода Ньютона по интерполированной функции. Поэлементно обрабатывает массивы аргументов, стоимость
+    вычисления не зависит от значений аргументов. При температуре за пределами таблицы берутся значения на ее
+    границе и выдается RuntimeWarning. Функция энтропии phi(T) = int(dh / T); для политропического
+    процесса сжатия с КПД eta_p: phi(T2) - phi(T1) = R * ln(pi) / eta_p."""
+    T_min = 150
+    "Нижняя граница таблицы по температуре"
+    T_max = 2700
+    "Верхняя граница таблицы по температуре"
+    T_step = 1
+    "Шаг таблицы по температуре"
+    alpha_max = 100
+    "Наибольший табулированный коэффициент избытка воздуха"
+    alpha_number = 41
+    "Число узлов по коэффициенту избытка воздуха"
+
+    def __init__(self, gas: 'IdealGas'):
+        self.T_arr = np.arange(self.T_min, self.T_max + self.T_step, self.T_step, dtype=float)
+        "Узлы таблицы по температуре"
+        self.alpha_inv_arr = np.linspace(1 / self.alpha_max, 1, self.alpha_number)
+        "Узлы таблицы по 1 / alpha"
+        T_grid, alpha_grid = np.broadcast_arrays(self.T_arr[np.newaxis, :], 1 / self.alpha_inv_arr[:, np.newaxis])
+        # диапазон таблицы шире диапазона табулированных теплоемкостей некоторых рабочих тел, за его пределами
+        # теплоемкости берутся на границе без предупреждений
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.enthalpy_arr = gas.get_specific_enthalpy(T_grid, alpha=alpha_grid)
+        "Удельная энтальпия в узлах, массив размера (alpha_number, число узлов по температуре)"
+        d_phi = np.diff(self.enthalpy_arr, axis=1) * np.log(self.T_arr[1:] / self.T_arr[:-1]) / np.diff(self.T_arr)
+        self.phi_arr = np.concatenate([np.zeros((self.alpha_number, 1)), np.cumsum(d_phi, axis=1)], axis=1)
+        "Функция энтропии в узлах, отсчитывается от T_min"
+        self._enthalpy_search_arr = self._get_search_arr(self.enthalpy_arr)
+        self._phi_search_arr = self._get_search_arr(self.phi_arr)
+
+    @classmethod
+    def _get_search_arr(cls, value_arr):
+        """Строки таблицы, сдвинутые так, что они образуют один возрастающий массив, и величина сдвига строк"""
+        offset = (value_arr.max() - value_arr.min() + 1) * np.arange(value_arr.shape[0])
+        return (value_arr + offset[:, np.newaxis]).ravel(), offset
+
+    def _get_alpha_pos(self, alpha):
+        """Номер нижней строки по коэффициенту избытка воздуха и вес верхней строки"""
+        alpha_inv = np.minimum(np.maximum(1 / np.asarray(alpha, dtype=float), self.alpha_inv_arr[0]), 1)
+        pos = (alpha_inv - self.alpha_inv_arr[0]) / (self.alpha_inv_arr[1] - self.alpha_inv_arr[0])
+        i = np.minimum(pos.astype(int), self.alpha_number - 2)
+        return i, pos - i
+
+    def _interp(self, value_arr, T, alpha_pos):
+        """Значение и производная по температуре табулированной величины"""
+        _check_range('Temperature', T, self.T_min, self.T_max)
+        i, t = alpha_pos
+        pos = (np.minimum(np.maximum(T, self.T_arr[0]), self.T_arr[-1]) - self.T_arr[0]) / self.T_step
+        j = np.minimum(pos.astype(int), len(self.T_arr) - 2)
+        s = pos - j
+        lower = value_arr[i, j] * (1 - t) + value_arr[i + 1, j] * t
+        upper = value_arr[i, j + 1] * (1 - t) + value_arr[i + 1, j + 1] * t
+        return lower + (upper - lower) * s, (upper - lower) / self.T_step
+
+    def _invert_row(self, value_arr, search, row, value):
+        """Температура, при которой табулированная величина в строке row равна value"""
+        search_arr, offset = search
+        j = np.searchsorted(search_arr, value + offset[row]) - 1 - row * len(self.T_arr)
+        j = np.minimum(np.maximum(j, 0), len(self.T_arr) - 2)
+        lower = value_arr[row, j]
+        return self.T_arr[j] + (value - lower) / (value_arr[row, j + 1] - lower) * self.T_step
+
+    def _invert(self, value_arr, search, value, alpha):
+        alpha_pos = self._get_alpha_pos(alpha)
+        i, t = alpha_pos
+        T = self._invert_row(value_arr, search, i, value) * (1 - t) + self._invert_row(value_arr, search, i + 1,
+                                                                                        value) * t
+        # уточнение выполняется в пределах таблицы, выход за них проверяется по найденной температуре
+        value_new, der = self._interp(value_arr, np.minimum(np.maximum(T, self.T_arr[0]), self.T_arr[-1]),
+                                      alpha_pos)
+        T = T + (value - value_new) / der
+        _check_range('Temperature', T, self.T_min, self.T_max)
+        return _to_value(np.minimum(np.maximum(T, self.T_arr[0]), self.T_arr[-1]))
+
+    def enthalpy(self, T, alpha):
+        """Удельная энтальпия"""
+        return _to_value(self._interp(self.enthalpy_arr, T, self._get_alpha_pos(alpha))[0])
+
+    def entropy(self, T, alpha):
+        """Функция энтропии"""
+        return _to_value(self._interp(self.phi_arr, T, self._get_alpha_pos(alpha))[0])
+
+    def get_temp_by_enthalpy(self, enthalpy, alpha):
+        """Температура, при которой удельная энтальпия равна enthalpy"""
+        return self._invert(self.enthalpy_arr, self._enthalpy_search_arr, enthalpy, alpha)
+
+    def get_temp_by_entropy(self, phi, alpha):
+        """Температура, при которой функция энтропии равна phi"""
+        return self._invert(self.phi_arr, self._phi_search_arr, phi, alpha)
+
+
+_entropy_tables = {}
+
+
+def get_entropy_table(gas: 'IdealGas') -> EntropyTable:
+    """Возвращает таблицу энтальпии и функции энтропии для класса рабочего тела. Таблицы создаются при первом
+    обращении и используются всеми объектами рабочих тел."""
+    res = _entropy_tables.get(type(gas))
+    if res is None:
+        res = _entropy_tables.setdefault(type(gas), EntropyTable(gas))
+    return res
 
 
 class IdealGas(metaclass=ABCMeta):
@@ -62,6 +240,39 @@ class IdealGas(metaclass=ABCMeta):
     def get_specific_enthalpy(self, T, **kwargs):
         return self.c_p_av_func(T, **kwargs) * (T - self.T0)
 
+    def get_enthalpy_and_entropy_difference(self, T1, T2, **kwargs):
+        """Возвращает удельные энтальпии h(T1), h(T2), производную dh/dT при T2 и разность функций энтропии
+        phi(T2) - phi(T1) = int(dh / T). Интеграл берется по частям, int(dh / T) = h / T + int(h / T^2 dT),
+        оставшийся интеграл - квадратурой Гаусса. Энтальпия во всех точках вычисляется за один вызов.
+        Поэлементно обрабатывает массивы температур и коэффициентов избытка воздуха."""
+        T1 = np.asarray(T1, dtype=float)
+        T2 = np.asarray(T2, dtype=float)
+        T_mid = 0.5 * (T1 + T2)
+        T_half = 0.5 * (T2 - T1)
+        shape = (-1,) + (1,) * np.ndim(T_mid)
+        T_nodes = T_mid + T_half * _gauss_nodes.reshape(shape)
+        T_ends = np.stack(np.broadcast_arrays(T1, T2, T2 + _enthalpy_diff_step))
+        T_arr = np.concatenate([T_ends, T_nodes])
+        enthalpy_arr = self.get_specific_enthalpy(T_arr, **kwargs)
+        h1, h2 = enthalpy_arr[0], enthalpy_arr[1]
+        c_p2 = (enthalpy_arr[2] - h2) / _enthalpy_diff_step
+        integral = T_half * np.sum(_gauss_weights.reshape(shape) * enthalpy_arr[3:] / T_nodes ** 2, axis=0)
+        return _to_value(h1), _to_value(h2), _to_value(c_p2), _to_value(h2 / T2 - h1 / T1 + integral)
+
+    def get_enthalpy_and_alpha_derivative(self, T, alpha):
+        """Возвращает удельную энтальпию при температуре T и коэффициенте избытка воздуха alpha и ее производную
+        dh/dalpha. Производная вычисляется конечной разностью, энтальпия в обеих точках - за один вызов.
+        Поэлементно обрабатывает массивы температур и коэффициентов избытка воздуха."""
+        T, alpha = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(alpha, dtype=float))
+        d_alpha = _alpha_diff_rel_step * alpha
+        enthalpy_arr = self.get_specific_enthalpy(np.stack([T, T]), alpha=np.stack([alpha, alpha + d_alpha]))
+        h = enthalpy_arr[0]
+        return _to_value(h), _to_value((enthalpy_arr[1] - h) / d_alpha)
+
+    def get_entropy_difference(self, T1, T2, **kwargs):
+        """Разность функций энтропии phi(T2) - phi(T1) = int(dh / T) от T1 до T2"""
+        return self.get_enthalpy_and_entropy_difference(T1, T2, **kwargs)[3]
+
     def get_ad_temp(self, T1, p1, p2, precision=0.001, **kwargs):
         k_res = 1
         T2 = 600
@@ -189,8 +400,8 @@ class Air(IdealGas):
                                      1.0907, 1.0999, 1.1082, 1.1166, 1.1242, 1.1313, 1.1380, 1.1443, 1.1501, 1.1560,
                                      1.1610, 1.1664, 1.1710]) * 1e3
         self._T_arr = np.linspace(0, 2200, 23) + 273
-        self._c_p_real_interp = interp1d(self._T_arr, self._c_p_real_arr, bounds_error=False, fill_value='extrapolate')
-        self._c_p_av_interp = interp1d(self._T_arr, self._c_p_av_arr, bounds_error=False, fill_value='extrapolate')
+        self._c_p_real_interp = LinearInterp(self._T_arr, self._c_p_real_arr)
+        self._c_p_av_interp = LinearInterp(self._T_arr, self._c_p_av_arr)
         self._c_p = self.c_p_real_func(self._T)
         self._c_p_av = self.c_p_av_func(self._T)
         self._c_p_av_int = self.c_p_av_int_func(self._T1, self._T2)
@@ -238,11 +449,11 @@ class Air(IdealGas):
 
     def c_p_real_func(self, T, **kwargs):
         """Истинная удельная теплоемкость воздуха"""
-        return self._c_p_real_interp(T).__float__()
+        return _to_value(self._c_p_real_interp(T))
 
     def c_p_av_func(self, T, **kwargs):
         """Средняя удельная теплоемкость воздуха"""
-        return self._c_p_av_interp(T).__float__()
+        return _to_value(self._c_p_av_interp(T))
 
     def c_p_av_int_func(self, T1, T2, **kwargs):
         """Средняя теплоемкость воздуха в интервале температур"""
@@ -414,8 +625,8 @@ class NaturalGasCombustionProducts(IdealGas):
                                      self._c_p_av_21]) * 1000
         self._temp_arr = np.array(np.linspace(0, 2000, 21)) + 273
         self._alpha_arr = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-        self._c_p_real_interp = interp2d(self._alpha_arr, self._temp_arr, self._c_p_real_arr)
-        self._c_p_av_interp = interp2d(self._alpha_arr, self._temp_arr, self._c_p_av_arr)
+        self._c_p_real_interp = BilinearInterp(self._alpha_arr, self._temp_arr, self._c_p_real_arr)
+        self._c_p_av_interp = BilinearInterp(self._alpha_arr, self._temp_arr, self._c_p_av_arr)
 
         self._c_p = self.c_p_real_func(self._T, alpha=self._alpha)
         self._c_p_av = self.c_p_av_func(self._T, alpha=self._alpha)
@@ -479,12 +690,12 @@ class NaturalGasCombustionProducts(IdealGas):
     def c_p_real_func(self, T, **kwargs):
         """Истинная удельная теплоемкость продуктов сгорания природного газа"""
         alpha = kwargs['alpha']
-        return self._c_p_real_interp(alpha, T).__float__()
+        return _to_value(self._c_p_real_interp(alpha, T))
 
     def c_p_av_func(self, T, **kwargs):
         """Средняя удельная теплоемкость продуктов сгорания природного газа"""
         alpha = kwargs['alpha']
-        return self._c_p_av_interp(alpha, T).__float__()
+        return _to_value(self._c_p_av_interp(alpha, T))
 
     def c_p_av_int_func(self, T1, T2, **kwargs):
         """Средняя удельная теплоемкость продуктов сгорания природного газа в интервале температур"""
@@ -0,0 +1,333 @@
+"""Типовые схемы ГТУ (1B, 2N, 2NIH, 2V, 2VIH, 2NR): сети из юнитов и их спецификации. Используются в тестах
+и замерах производительности."""
+from .core.solver import NetworkSolver
+from .core.spec import NetworkSpec
+from .core.turbine_lib import Compressor, Turbine, Source, Sink, CombustionChamber, Inlet, Outlet, Atmosphere, \
+    Load, Regenerator, RegeneratorHotSide
+from .gases import KeroseneCombustionProducts, NaturalGasCombustionProducts, Air
+
+
+class Schemes:
+    """Юниты и сети типовых схем. Сети строятся методами get_<схема>_solver из юнитов, созданных последним
+    вызовом create_units, спецификации - методами get_<схема>_spec."""
+    def __init__(self):
+        self.create_units()
+
+    def create_units(self):
+        """Создает новые юниты схем"""
+        self.atmosphere = Atmosphere()
+        self.inlet = Inlet()
+        self.compressor1 = Compressor(6)
+        self.compressor2 = Compressor(10)
+        self.sink = Sink()
+        self.comb_chamber = CombustionChamber(1400, alpha_out_init=2.7, precision=0.001)
+        self.comb_chamber_inter_up = CombustionChamber(1300, alpha_out_init=2.7, precision=0.001)
+        self.comb_chamber_inter_down = CombustionChamber(1300, alpha_out_init=2.7, precision=0.001,
+                                                         p_stag_out_init=4e5)
+        self.source1 = Source(work_fluid=KeroseneCombustionProducts(), g_return=0.03)
+        self.source2 = Source(work_fluid=KeroseneCombustionProducts(), g_return=0.03)
+        self.turbine_low_pres_power = Turbine(p_stag_out_init=1e5)
+        self.turbine_comp_up = Turbine()
+        self.turbine_high_pres_power = Turbine(p_stag_out_init=4e5, precision=0.001)
+        self.turbine_comp_down = Turbine(p_stag_out_init=1e5, precision=0.001)
+        self.outlet = Outlet()
+        self.load = Load(2e6)
+        self.zero_load1 = Load(0)
+        self.zero_load2 = Load(0)
+        self.regenerator = Regenerator(0.7)
+        self.regenerator_hot = RegeneratorHotSide()
+
+    def get_1B_solver(self) -> NetworkSolver:
+        solver = NetworkSolver([self.atmosphere, self.outlet, self.sink, self.source1, self.turbine_low_pres_power,
+                                self.inlet, self.comb_chamber, self.compressor1, self.load], cold_work_fluid=Air(),
+                               hot_work_fluid=NaturalGasCombustionProducts())
+        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
+        solver.create_gas_dynamic_connection(self.inlet, self.compressor1)
+        solver.create_gas_dynamic_connection(self.compressor1, self.sink)
+        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
+        solver.create_gas_dynamic_connection(self.source1, self.turbine_low_pres_power)
+        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.outlet)
+        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
+        solver.create_mechanical_connection(self.turbine_low_pres_power, self.compressor1, self.load)
+        return solver
+
+    def get_2N_solver(self) -> NetworkSolver:
+        solver = NetworkSolver([self.atmosphere, self.outlet, self.turbine_comp_up, self.sink, self.source1,
+                                self.turbine_low_pres_power, self.inlet, self.comb_chamber, self.compressor2,
+                                self.load, self.zero_load1, self.zero_load2], cold_work_fluid=Air(),
+                               hot_work_fluid=NaturalGasCombustionProducts())
+        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
+        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
+        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
+        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
+        solver.create_gas_dynamic_connection(self.source1, self.turbine_comp_up)
+        solver.create_gas_dynamic_connection(self.turbine_comp_up, self.turbine_low_pres_power)
+        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.outlet)
+        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
+        solver.create_mechanical_connection(self.turbine_low_pres_power, self.load, self.zero_load1)
+        solver.create_mechanical_connection(self.turbine_comp_up, self.compressor2, self.zero_load2)
+        return solver
+
+    def get_2NIH_solver(self) -> NetworkSolver:
+        solver = NetworkSolver([self.atmosphere, self.outlet, self.turbine_comp_up, self.sink, self.source1,
+                                self.turbine_low_pres_power, self.inlet, self.comb_chamber, self.compressor2,
+                                self.load, self.zero_load1, self.zero_load2, self.comb_chamber_inter_up, self.source2],
+                               precision=0.001, cold_work_fluid=Air(),
+                               hot_work_fluid=NaturalGasCombustionProducts())
+        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
+        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
+        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
+        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
+        solver.create_gas_dynamic_connection(self.source1, self.turbine_comp_up)
+        solver.create_gas_dynamic_connection(self.turbine_comp_up, self.comb_chamber_inter_up)
+        solver.create_gas_dynamic_connection(self.comb_chamber_inter_up, self.source2)
+        solver.create_gas_dynamic_connection(self.source2, self.turbine_low_pres_power)
+        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.outlet)
+        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
+        solver.create_mechanical_connection(self.turbine_low_pres_power, self.load, self.zero_load1)
+        solver.create_mechanical_connection(self.turbine_comp_up, self.compressor2, self.zero_load2)
+        return solver
+
+    def get_2V_solver(self) -> NetworkSolver:
+        solver = NetworkSolver([self.load, self.zero_load1, self.zero_load2, self.atmosphere, self.outlet, self.inlet,
+                                self.turbine_comp_down, self.compressor2, self.turbine_high_pres_power,
+                                self.comb_chamber, self.sink, self.source1, self.source2], precision=0.0005,
+                               cold_work_fluid=Air(),
+                               hot_work_fluid=NaturalGasCombustionProducts())
+        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
+        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
+        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
+        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
+        solver.create_gas_dynamic_connection(self.source1, self.turbine_high_pres_power)
+        solver.create_gas_dynamic_connection(self.turbine_high_pres_power, self.source2)
+        solver.create_gas_dynamic_connection(self.source2, self.turbine_comp_down)
+        solver.create_gas_dynamic_connection(self.turbine_comp_down, self.outlet)
+        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
+        solver.create_mechanical_connection(self.turbine_high_pres_power, self.load, self.zero_load1)
+        solver.create_mechanical_connection(self.turbine_comp_down, self.compressor2, self.zero_load2)
+        return solver
+
+    def get_2VIH_solver(self) -> NetworkSolver:
+        solver = NetworkSolver([self.load, self.zero_load1, self.zero_load2, self.atmosphere, self.outlet, self.inlet,
+                                self.turbine_comp_down, self.compressor2, self.turbine_high_pres_power,
+                                self.comb_chamber, self.sink, self.source1, self.source2,
+                                self.comb_chamber_inter_down], precision=0.0005, cold_work_fluid=Air(),
+                               hot_work_fluid=NaturalGasCombustionProducts())
+        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
+        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
+        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
+        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
+        solver.create_gas_dynamic_connection(self.source1, self.turbine_high_pres_power)
+        solver.create_gas_dynamic_connection(self.turbine_high_pres_power, self.comb_chamber_inter_down)
+        solver.create_gas_dynamic_connection(self.comb_chamber_inter_down, self.source2)
+        solver.create_gas_dynamic_connection(self.source2, self.turbine_comp_down)
+        solver.create_gas_dynamic_connection(self.turbine_comp_down, self.outlet)
+        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
+        solver.create_mechanical_connection(self.turbine_high_pres_power, self.load, self.zero_load1)
+        solver.create_mechanical_connection(self.turbine_comp_down, self.compressor2, self.zero_load2)
+        return solver
+
+    def get_2NR_solver(self) -> NetworkSolver:
+        solver = NetworkSolver([self.atmosphere, self.outlet, self.turbine_comp_up, self.sink, self.source1,
+                                self.turbine_low_pres_power, self.inlet, self.comb_chamber, self.compressor1,
+                                self.load, self.zero_load1, self.zero_load2, self.regenerator, self.regenerator_hot],
+                               precision=0.001, cold_work_fluid=Air(), hot_work_fluid=NaturalGasCombustionProducts())
+        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
+        solver.create_gas_dynamic_connection(self.inlet, self.compressor1)
+        solver.create_gas_dynamic_connection(self.compressor1, self.sink)
+        solver.create_gas_dynamic_connection(self.sink, self.regenerator)
+        solver.create_gas_dynamic_connection(self.regenerator, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
+        solver.create_gas_dynamic_connection(self.source1, self.turbine_comp_up)
+        solver.create_gas_dynamic_connection(self.turbine_comp_up, self.turbine_low_pres_power)
+        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.regenerator_hot)
+        solver.create_gas_dynamic_connection(self.regenerator_hot, self.outlet)
+        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
+        solver.create_mechanical_connection(self.turbine_low_pres_power, self.load, self.zero_load1)
+        solver.create_mechanical_connection(self.turbine_comp_up, self.compressor1, self.zero_load2)
+        solver.create_heat_exchange_connection(self.regenerator, self.regenerator_hot)
+        return solver
+
+    @classmethod
+    def get_1B_spec(cls) -> NetworkSpec:
+        spec = NetworkSpec(cold_work_fluid='Air', hot_work_fluid='NaturalGasCombustionProducts')
+        spec.add_unit('atmosphere', 'Atmosphere')
+        spec.add_unit('inlet', 'Inlet')
+        spec.add_unit('compressor', 'Compressor', pi_c=6)
+        spec.add_unit('sink', 'Sink')
+        spec.add_unit('comb_chamber', 'CombustionChamber', T_gas=1400, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source', 'Source', g_return=0.03)
+        spec.add_unit('power_turbine', 'Turbine', p_stag_out_init=1e5)
+        spec.add_unit('outlet', 'Outlet')
+        spec.add_unit('load', 'Load', power=2e6)
+        spec.connect_gas_dynamic('atmosphere', 'inlet')
+        spec.connect_gas_dynamic('inlet', 'compressor')
+        spec.connect_gas_dynamic('compressor', 'sink')
+        spec.connect_gas_dynamic('sink', 'comb_chamber')
+        spec.connect_gas_dynamic('comb_chamber', 'source')
+        spec.connect_gas_dynamic('source', 'power_turbine')
+        spec.connect_gas_dynamic('power_turbine', 'outlet')
+        spec.connect_static_gas_dynamic('outlet', 'atmosphere')
+        spec.connect_mechanical('power_turbine', 'compressor', 'load')
+        return spec
+
+    @classmethod
+    def get_2N_spec(cls) -> NetworkSpec:
+        spec = NetworkSpec(cold_work_fluid='Air', hot_work_fluid='NaturalGasCombustionProducts')
+        spec.add_unit('atmosphere', 'Atmosphere')
+        spec.add_unit('inlet', 'Inlet')
+        spec.add_unit('compressor', 'Compressor', pi_c=10)
+        spec.add_unit('sink', 'Sink')
+        spec.add_unit('comb_chamber', 'CombustionChamber', T_gas=1400, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source', 'Source', g_return=0.03)
+        spec.add_unit('comp_turbine', 'Turbine')
+        spec.add_unit('power_turbine', 'Turbine', p_stag_out_init=1e5)
+        spec.add_unit('outlet', 'Outlet')
+        spec.add_unit('load', 'Load', power=2e6)
+        spec.add_unit('zero_load1', 'Load', power=0)
+        spec.add_unit('zero_load2', 'Load', power=0)
+        spec.connect_gas_dynamic('atmosphere', 'inlet')
+        spec.connect_gas_dynamic('inlet', 'compressor')
+        spec.connect_gas_dynamic('compressor', 'sink')
+        spec.connect_gas_dynamic('sink', 'comb_chamber')
+        spec.connect_gas_dynamic('comb_chamber', 'source')
+        spec.connect_gas_dynamic('source', 'comp_turbine')
+        spec.connect_gas_dynamic('comp_turbine', 'power_turbine')
+        spec.connect_gas_dynamic('power_turbine', 'outlet')
+        spec.connect_static_gas_dynamic('outlet', 'atmosphere')
+        spec.connect_mechanical('power_turbine', 'load', 'zero_load1')
+        spec.connect_mechanical('comp_turbine', 'compressor', 'zero_load2')
+        return spec
+
+    @classmethod
+    def get_2NIH_spec(cls) -> NetworkSpec:
+        spec = NetworkSpec(precision=0.001, cold_work_fluid='Air', hot_work_fluid='NaturalGasCombustionProducts')
+        spec.add_unit('atmosphere', 'Atmosphere')
+        spec.add_unit('inlet', 'Inlet')
+        spec.add_unit('compressor', 'Compressor', pi_c=10)
+        spec.add_unit('sink', 'Sink')
+        spec.add_unit('comb_chamber', 'CombustionChamber', T_gas=1400, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source1', 'Source', g_return=0.03)
+        spec.add_unit('comp_turbine', 'Turbine')
+        spec.add_unit('comb_chamber_inter', 'CombustionChamber', T_gas=1300, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source2', 'Source', g_return=0.03)
+        spec.add_unit('power_turbine', 'Turbine', p_stag_out_init=1e5)
+        spec.add_unit('outlet', 'Outlet')
+        spec.add_unit('load', 'Load', power=2e6)
+        spec.add_unit('zero_load1', 'Load', power=0)
+        spec.add_unit('zero_load2', 'Load', power=0)
+        spec.connect_gas_dynamic('atmosphere', 'inlet')
+        spec.connect_gas_dynamic('inlet', 'compressor')
+        spec.connect_gas_dynamic('compressor', 'sink')
+        spec.connect_gas_dynamic('sink', 'comb_chamber')
+        spec.connect_gas_dynamic('comb_chamber', 'source1')
+        spec.connect_gas_dynamic('source1', 'comp_turbine')
+        spec.connect_gas_dynamic('comp_turbine', 'comb_chamber_inter')
+        spec.connect_gas_dynamic('comb_chamber_inter', 'source2')
+        spec.connect_gas_dynamic('source2', 'power_turbine')
+        spec.connect_gas_dynamic('power_turbine', 'outlet')
+        spec.connect_static_gas_dynamic('outlet', 'atmosphere')
+        spec.connect_mechanical('power_turbine', 'load', 'zero_load1')
+        spec.connect_mechanical('comp_turbine', 'compressor', 'zero_load2')
+        return spec
+
+    @classmethod
+    def get_2NR_spec(cls) -> NetworkSpec:
+        spec = NetworkSpec(precision=0.001, cold_work_fluid='Air', hot_work_fluid='NaturalGasCombustionProducts')
+        spec.add_unit('atmosphere', 'Atmosphere')
+        spec.add_unit('inlet', 'Inlet')
+        spec.add_unit('compressor', 'Compressor', pi_c=6)
+        spec.add_unit('sink', 'Sink')
+        spec.add_unit('regenerator', 'Regenerator', regeneration_rate=0.7)
+        spec.add_unit('comb_chamber', 'CombustionChamber', T_gas=1400, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source', 'Source', g_return=0.03)
+        spec.add_unit('comp_turbine', 'Turbine')
+        spec.add_unit('power_turbine', 'Turbine', p_stag_out_init=1e5)
+        spec.add_unit('regenerator_hot', 'RegeneratorHotSide')
+        spec.add_unit('outlet', 'Outlet')
+        spec.add_unit('load', 'Load', power=2e6)
+        spec.add_unit('zero_load1', 'Load', power=0)
+        spec.add_unit('zero_load2', 'Load', power=0)
+        spec.connect_gas_dynamic('atmosphere', 'inlet')
+        spec.connect_gas_dynamic('inlet', 'compressor')
+        spec.connect_gas_dynamic('compressor', 'sink')
+        spec.connect_gas_dynamic('sink', 'regenerator')
+        spec.connect_gas_dynamic('regenerator', 'comb_chamber')
+        spec.connect_gas_dynamic('comb_chamber', 'source')
+        spec.connect_gas_dynamic('source', 'comp_turbine')
+        spec.connect_gas_dynamic('comp_turbine', 'power_turbine')
+        spec.connect_gas_dynamic('power_turbine', 'regenerator_hot')
+        spec.connect_gas_dynamic('regenerator_hot', 'outlet')
+        spec.connect_static_gas_dynamic('outlet', 'atmosphere')
+        spec.connect_mechanical('power_turbine', 'load', 'zero_load1')
+        spec.connect_mechanical('comp_turbine', 'compressor', 'zero_load2')
+        spec.connect_heat_exchange('regenerator', 'regenerator_hot')
+        return spec
+
+    @classmethod
+    def get_2V_spec(cls) -> NetworkSpec:
+        spec = NetworkSpec(precision=0.0005, cold_work_fluid='Air', hot_work_fluid='NaturalGasCombustionProducts')
+        spec.add_unit('atmosphere', 'Atmosphere')
+        spec.add_unit('inlet', 'Inlet')
+        spec.add_unit('compressor', 'Compressor', pi_c=10)
+        spec.add_unit('sink', 'Sink')
+        spec.add_unit('comb_chamber', 'CombustionChamber', T_gas=1400, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source1', 'Source', g_return=0.03)
+        spec.add_unit('power_turbine', 'Turbine', p_stag_out_init=4e5, precision=0.001)
+        spec.add_unit('source2', 'Source', g_return=0.03)
+        spec.add_unit('comp_turbine', 'Turbine', p_stag_out_init=1e5, precision=0.001)
+        spec.add_unit('outlet', 'Outlet')
+        spec.add_unit('load', 'Load', power=2e6)
+        spec.add_unit('zero_load1', 'Load', power=0)
+        spec.add_unit('zero_load2', 'Load', power=0)
+        spec.connect_gas_dynamic('atmosphere', 'inlet')
+        spec.connect_gas_dynamic('inlet', 'compressor')
+        spec.connect_gas_dynamic('compressor', 'sink')
+        spec.connect_gas_dynamic('sink', 'comb_chamber')
+        spec.connect_gas_dynamic('comb_chamber', 'source1')
+        spec.connect_gas_dynamic('source1', 'power_turbine')
+        spec.connect_gas_dynamic('power_turbine', 'source2')
+        spec.connect_gas_dynamic('source2', 'comp_turbine')
+        spec.connect_gas_dynamic('comp_turbine', 'outlet')
+        spec.connect_static_gas_dynamic('outlet', 'atmosphere')
+        spec.connect_mechanical('power_turbine', 'load', 'zero_load1')
+        spec.connect_mechanical('comp_turbine', 'compressor', 'zero_load2')
+        return spec
+
+    @classmethod
+    def get_2VIH_spec(cls) -> NetworkSpec:
+        spec = NetworkSpec(precision=0.0005, cold_work_fluid='Air', hot_work_fluid='NaturalGasCombustionProducts')
+        spec.add_unit('atmosphere', 'Atmosphere')
+        spec.add_unit('inlet', 'Inlet')
+        spec.add_unit('compressor', 'Compressor', pi_c=10)
+        spec.add_unit('sink', 'Sink')
+        spec.add_unit('comb_chamber', 'CombustionChamber', T_gas=1400, alpha_out_init=2.7, precision=0.001)
+        spec.add_unit('source1', 'Source', g_return=0.03)
+        spec.add_unit('power_turbine', 'Turbine', p_stag_out_init=4e5, precision=0.001)
+        spec.add_unit('comb_chamber_inter', 'CombustionChamber', T_gas=1300, alpha_out_init=2.7, precision=0.001,
+                      p_stag_out_init=4e5)
+        spec.add_unit('source2', 'Source', g_return=0.03)
+        spec.add_unit('comp_turbine', 'Turbine', p_stag_out_init=1e5, precision=0.001)
+        spec.add_unit('outlet', 'Outlet')
+        spec.add_unit('load', 'Load', power=2e6)
+        spec.add_unit('zero_load1', 'Load', power=0)
+        spec.add_unit('zero_load2', 'Load', power=0)
+        spec.connect_gas_dynamic('atmosphere', 'inlet')
+        spec.connect_gas_dynamic('inlet', 'compressor')
+        spec.connect_gas_dynamic('compressor', 'sink')
+        spec.connect_gas_dynamic('sink', 'comb_chamber')
+        spec.connect_gas_dynamic('comb_chamber', 'source1')
+        spec.connect_gas_dynamic('source1', 'power_turbine')
+        spec.connect_gas_dynamic('power_turbine', 'comb_chamber_inter')
+        spec.connect_gas_dynamic('comb_chamber_inter', 'source2')
+        spec.connect_gas_dynamic('source2', 'comp_turbine')
+        spec.connect_gas_dynamic('comp_turbine', 'outlet')
+        spec.connect_static_gas_dynamic('outlet', 'atmosphere')
+        spec.connect_mechanical('power_turbine', 'load', 'zero_load1')
+        spec.connect_mechanical('comp_turbine', 'compressor', 'zero_load2')
+        return spec
@@ -13,7 +13,7 @@ class TemplateTester(unittest.TestCase):
     def setUp(self):
         self.atmosphere = Atmosphere()
         self.inlet = Inlet()
-        self.compressor = Compressor(17, precision=0.001)
+        self.compressor = Compressor(17)
         self.sink = Sink(g_cooling=0.05, g_outflow=0.01)
         self.comb_chamber = CombustionChamber(1450, alpha_out_init=2.7, precision=0.001)
         self.comb_chamber_inter_up = CombustionChamber(1300, alpha_out_init=2.7, precision=0.001)
@@ -1,7 +1,10 @@
-from .gases import NaturalGasCombustionProducts, KeroseneCombustionProducts, Air, IdealGas
+from .gases import NaturalGasCombustionProducts, KeroseneCombustionProducts, Air, IdealGas, get_entropy_table, \
+    LinearInterp
 import unittest
+import warnings
 import numpy as np
-from .tools.functions import get_mixture_temp
+from .tools.functions import get_mixture_temp, get_streams_mixture_temp
+from .fuels import NaturalGas
 
 
 def get_partition(fluid: IdealGas, T1=300, T2=1000, num_pnt=10, alpha=2.):
@@ -114,6 +117,73 @@ class TestAdiabaticTemp(unittest.TestCase):
         self.assertAlmostEqual(enthalpy_res, 0, places=3)
 
 
+class TestLinearInterp(unittest.TestCase):
+    def test_extrapolation(self):
+        interp = LinearInterp([300, 400, 600], [1, 2, 6])
+        self.assertAlmostEqual(interp(350), 1.5)
+        self.assertAlmostEqual(interp(600), 6)
+        self.assertAlmostEqual(interp(200), 0)
+        self.assertAlmostEqual(interp(700), 8)
+        self.assertTrue(np.allclose(interp(np.array([[300, 500], [650, 250]])), [[1, 4], [7, 0.5]]))
+
+
+class TestEntropyTable(unittest.TestCase):
+    def setUp(self):
+        self.T_arr = np.array([300, 750.5, 1444.4])
+        self.alpha_arr = np.array([1.2, 2.5, np.inf])
+
+    def test_inversion(self):
+        for fluid in [Air(), KeroseneCombustionProducts(), NaturalGasCombustionProducts()]:
+            table = get_entropy_table(fluid)
+            enthalpy = table.enthalpy(self.T_arr, self.alpha_arr)
+            phi = table.entropy(self.T_arr, self.alpha_arr)
+            self.assertTrue(np.allclose(table.get_temp_by_enthalpy(enthalpy, self.alpha_arr), self.T_arr))
+            self.assertTrue(np.allclose(table.get_temp_by_entropy(phi, self.alpha_arr), self.T_arr))
+            self.assertAlmostEqual(table.get_temp_by_entropy(phi[1], self.alpha_arr[1]), self.T_arr[1])
+
+    def test_polytropic_process(self):
+        ker = KeroseneCombustionProducts()
+        table = get_entropy_table(ker)
+        T_arr = np.linspace(self.T_arr[0], self.T_arr[2], 2001)
+        enthalpy_arr = ker.get_specific_enthalpy(T_arr, alpha=2.5)
+        phi = (np.diff(enthalpy_arr) / (0.5 * (T_arr[1:] + T_arr[:-1]))).sum()
+        phi_diff = table.entropy(self.T_arr[2], 2.5) - table.entropy(self.T_arr[0], 2.5)
+        self.assertAlmostEqual(phi_diff / phi, 1, places=4)
+        self.assertAlmostEqual(table.enthalpy(self.T_arr[1], 2.5) /
+                               ker.get_specific_enthalpy(self.T_arr[1], alpha=2.5), 1, places=5)
+
+    def test_out_of_range(self):
+        table = get_entropy_table(Air())
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            enthalpy = table.enthalpy(self.T_arr, self.alpha_arr)
+            table.get_temp_by_enthalpy(enthalpy, self.alpha_arr)
+        with self.assertWarnsRegex(RuntimeWarning, 'Temperature is out of the table range'):
+            table.entropy(np.array([300, 3000]), 2.5)
+        with self.assertWarnsRegex(RuntimeWarning, 'Temperature is out of the table range'):
+            table.get_temp_by_enthalpy(2 * table.enthalpy_arr.max(), 2.5)
+        with self.assertWarnsRegex(RuntimeWarning, 'out of the table range'):
+            NaturalGasCombustionProducts().c_p_real_func(3000, alpha=2.5)
+
+    def test_sharing(self):
+        self.assertIs(get_entropy_table(Air()), get_entropy_table(Air()))
+        self.assertIsNot(get_entropy_table(Air()), get_entropy_table(KeroseneCombustionProducts()))
+
+
+class TestEnthalpyAlphaDerivative(unittest.TestCase):
+    def test_derivative(self):
+        T_arr = np.array([900, 1200, 1500])
+        alpha_arr = np.array([1.5, 2.5, 4.3])
+        for fluid in [KeroseneCombustionProducts(), NaturalGasCombustionProducts()]:
+            h, dh_dalpha = fluid.get_enthalpy_and_alpha_derivative(T_arr, alpha_arr)
+            self.assertTrue(np.allclose(h, fluid.get_specific_enthalpy(T_arr, alpha=alpha_arr)))
+            dh_dalpha_central = (fluid.get_specific_enthalpy(T_arr, alpha=alpha_arr + 1e-3) -
+                                 fluid.get_specific_enthalpy(T_arr, alpha=alpha_arr - 1e-3)) / 2e-3
+            self.assertTrue(np.allclose(dh_dalpha, dh_dalpha_central, rtol=1e-3))
+            self.assertTrue(np.all(dh_dalpha < 0))
+        self.assertEqual(Air().get_enthalpy_and_alpha_derivative(900, 2.5)[1], 0)
+
+
 class TestAveragingSpecoficHeat(unittest.TestCase):
     def setUp(self):
         self.air = Air()
@@ -148,6 +218,23 @@ class TestAveragingSpecoficHeat(unittest.TestCase):
             self.assertAlmostEqual(heat_res, 0, places=4)
 
 
+class TestFuelHeatCapacity(unittest.TestCase):
+    def test_quadrature(self):
+        from scipy.integrate import quad
+        fuel = NaturalGas()
+        T_arr = np.array([200., 288., 500., 900.])
+        p_arr = np.array([[1e5], [2e6], [5e6]])
+        c_p_av_arr = fuel.get_c_p_av(T_arr, p=p_arr)
+        self.assertEqual(c_p_av_arr.shape, (3, 4))
+        for i in range(3):
+            for j in range(4):
+                T, p = T_arr[j], p_arr[i, 0]
+                c_p_av = quad(lambda x: fuel.get_c_p_real(x, p=p), fuel.T0, T)[0] / (T - fuel.T0)
+                self.assertAlmostEqual(c_p_av_arr[i, j] / c_p_av, 1, places=6)
+                self.assertAlmostEqual(fuel.get_c_p_av(T, p=p) / c_p_av_arr[i, j], 1, places=12)
+        self.assertAlmostEqual(fuel.get_c_p_av(fuel.T0, p=1e5), fuel.get_c_p_real(fuel.T0, p=1e5))
+
+
 class TestMixture(unittest.TestCase):
     def setUp(self):
         self.precision = 0.0001
@@ -183,4 +270,48 @@ class TestMixture(unittest.TestCase):
                     enthalpy_air = self.air.c_p_av * (self.T_air - self.air.T0) * g_air
                     enthalpy_comb_prod = self.ker.c_p_av * (self.T_comb_products - self.ker.T0) * g_comb_products
                     enthalpy_res = abs(enthalpy_comb_prod + enthalpy_air - enthalpy_mixtute) / enthalpy_mixtute
-                    self.assertAlmostEqual(enthalpy_res, 0, places=3)
\ No newline at end of file
+                    self.assertAlmostEqual(enthalpy_res, 0, places=3)
+
+    def test_streams_mixture(self):
+        for g_comb_products in self.g_comb_products_arr:
+            for g_air in self.g_air_arr:
+                for g_fuel in self.g_fuel_arr:
+                    fuel_content_comp_prod = g_fuel / (g_comb_products - g_fuel)
+                    fuel_content_mixture = g_fuel / (g_comb_products + g_air - g_fuel)
+                    alpha = 1 / (self.ker.l0 * fuel_content_comp_prod)
+                    alpha_mixture = 1 / (self.ker.l0 * fuel_content_mixture)
+                    mix_temp, enthalpy_mixture, enthalpy_list, temp_mix_res, iter_number = get_streams_mixture_temp(
+                        self.ker, alpha_mixture, [self.ker, self.air], [self.T_comb_products, self.T_air],
+                        [g_comb_products, g_air], [alpha, 1], self.precision
+                    )
+                    self.assertLess(temp_mix_res, self.precision)
+                    self.assertGreater(iter_number, 0)
+                    self.assertLess(self.T_air, mix_temp)
+                    self.assertLess(mix_temp, self.T_comb_products)
+
+                    enthalpy_mixtute = self.ker.get_specific_enthalpy(mix_temp, alpha=alpha_mixture) * \
+                        (g_air + g_comb_products)
+                    enthalpy_air = self.air.get_specific_enthalpy(self.T_air) * g_air
+                    enthalpy_comb_prod = self.ker.get_specific_enthalpy(self.T_comb_products, alpha=alpha) * \
+                        g_comb_products
+                    enthalpy_res = abs(enthalpy_comb_prod + enthalpy_air - enthalpy_mixtute) / enthalpy_mixtute
+                    self.assertAlmostEqual(enthalpy_res, 0, places=5)
+
+    def test_batch_mixture(self):
+        T_arr = np.linspace(1100, 1500, 5)
+        alpha_arr = np.linspace(2.5, 3.5, 5)
+        T_air_list = [500, 600, 700]
+        g_air_list = [0.02, 0.01, 0.03]
+        alpha_mixture = 3.8
+        gases = [self.ngas] + [self.air] * 3
+        mix_temp_arr = get_streams_mixture_temp(self.ngas, alpha_mixture, gases, [T_arr] + T_air_list,
+                                                [1] + g_air_list, [alpha_arr, 1, 1, 1])[0]
+        for T, alpha, mix_temp in zip(T_arr, alpha_arr, mix_temp_arr):
+            mix_temp_single = get_streams_mixture_temp(self.ngas, alpha_mixture, gases, [T] + T_air_list,
+                                                       [1] + g_air_list, [alpha, 1, 1, 1])[0]
+            self.assertAlmostEqual(mix_temp, mix_temp_single, places=6)
+
+    def test_nan_stream(self):
+        with self.assertRaises(RuntimeError):
+            get_streams_mixture_temp(self.ker, 3, [self.ker, self.air], [np.array([1400, np.nan]), 700], [1, 0.05],
+                                     [2.5, 1])
@@ -1,6 +1,7 @@
+import typing
 import numpy as np
-import logging.config
-from ..gases import IdealGas
+import logging
+from ..gases import IdealGas, _to_value
 
 
 def create_logger(name=__name__, loggerlevel=logging.INFO, add_file_handler=True,
@@ -27,6 +28,17 @@ def create_logger(name=__name__, loggerlevel=logging.INFO, add_file_handler=True
     return logger
 
 
+def masked(mask, new_value, old_value):
+    """Возвращает new_value в элементах, где mask истинна, и old_value в остальных. Используется во внутренних
+    итерационных циклах юнитов при пакетном расчете, чтобы сошедшиеся элементы не изменялись. Для скалярной
+    маски просто выбирает одно из значений."""
+    if np.ndim(mask) == 0:
+        return new_value if mask else old_value
+    if old_value is None:
+        return new_value
+    return np.where(mask, new_value, old_value)
+
+
 def eta_comp_stag(pi_comp_stag, k, eta_comp_stag_p):
     """Адиабатический КПД компрессора в зависимости от политропического"""
     return (pi_comp_stag ** ((k - 1) / k) - 1) / (pi_comp_stag ** ((k - 1) / (k * eta_comp_stag_p)) - 1)
@@ -54,32 +66,68 @@ def eta_turb_stag_p(pi_turb_stag, k, eta_turb_stag):
     return k * log / (1 - k)
 
 
+def get_streams_mixture_temp(mixture: IdealGas, alpha_mixture, gases: typing.Sequence[IdealGas],
+                             T_list: typing.Sequence, g_list: typing.Sequence, alpha_list: typing.Sequence,
+                             precision=1e-6, max_iter_number=100):
+    """Возвращает температуру смеси нескольких потоков, удельную энтальпию смеси, список удельных энтальпий
+    потоков, относительную величину последней поправки к температуре смеси и число итераций.
+
+    Энтальпии потоков с общим объектом рабочего тела вычисляются за один вызов. Температура смеси находится
+    обращением энтальпии смеси методом Ньютона от средней по расходу температуры потоков, производная энтальпии
+    по температуре - истинная теплоемкость рабочего тела смеси. Новые объекты рабочих тел не создаются, их
+    состояние не изменяется. Поэлементно обрабатывает массивы параметров потоков.
+
+    :param mixture: рабочее тело смеси
+    :param alpha_mixture: коэффициент избытка воздуха смеси
+    :param gases: рабочие тела потоков
+    :param T_list: температуры потоков
+    :param g_list: относительные расходы потоков
+    :param alpha_list: коэффициенты избытка воздуха потоков
+    :param precision: допустимая относительная поправка к температуре смеси
+    :param max_iter_number: наибольшее число итераций; при его превышении (например, из-за значений nan в
+            параметрах потоков) возбуждается RuntimeError
+    """
+    assert len(gases) == len(T_list) == len(g_list) == len(alpha_list), 'Stream parameters must have equal lengths'
+    enthalpy_list = [None] * len(gases)
+    for gas in {id(gas): gas for gas in gases}.values():
+        indexes = [n for n in range(len(gases)) if gases[n] is gas]
+        args = np.broadcast_arrays(*[T_list[n] for n in indexes], *[alpha_list[n] for n in indexes])
+        enthalpy_arr = gas.get_specific_enthalpy(np.stack(args[:len(indexes)]), alpha=np.stack(args[len(indexes):]))
+        for n, enthalpy in zip(indexes, enthalpy_arr):
+            enthalpy_list[n] = enthalpy
+    g_sum = sum(g_list)
+    enthalpy_mixture = sum(g * enthalpy for g, enthalpy in zip(g_list, enthalpy_list)) / g_sum
+    T_mixture, alpha_mixture = np.broadcast_arrays(sum(g * T for g, T in zip(g_list, T_list)) / g_sum,
+                                                   np.asarray(alpha_mixture, dtype=float), enthalpy_mixture)[:2]
+    T_mixture = np.array(T_mixture, dtype=float)
+    T_res = np.ones(T_mixture.shape)
+    active = T_res >= precision
+    iter_number = 0
+    while np.any(active):
+        if iter_number >= max_iter_number:
+            raise RuntimeError('Convergence is not obtained in the mixture temperature loop')
+        iter_number += 1
+        enthalpy = mixture.get_specific_enthalpy(T_mixture, alpha=alpha_mixture)
+        d_T = (enthalpy_mixture - enthalpy) / mixture.c_p_real_func(T_mixture, alpha=alpha_mixture)
+        T_mixture = masked(active, T_mixture + d_T, T_mixture)
+        T_res = masked(active, np.abs(d_T) / T_mixture, T_res)
+        active = np.logical_not(T_res < precision)
+    return _to_value(T_mixture), _to_value(enthalpy_mixture), [_to_value(enthalpy) for enthalpy in enthalpy_list], \
+        _to_value(T_res), iter_number
+
+
 def get_mixture_temp(comb_products: IdealGas, air: IdealGas, temp_comb_products, temp_air,
                      g_comb_products, g_air, alpha_mixture, precision=0.001):
-    """Возвращает значение температуры смеси рабочего и охлаждающего тела, а также истинные теплоемкости газа и
-    воздуха при температурах смешения."""
+    """Возвращает значение температуры смеси рабочего и охлаждающего тела, рабочее тело смеси, а также средние
+    теплоемкости газа и воздуха при их температурах. Коэффициент избытка воздуха газа берется из comb_products.
+    Температура смеси рассчитывается функцией get_streams_mixture_temp."""
+    mix_temp, _, _, temp_mix_res, _ = get_streams_mixture_temp(
+        comb_products, alpha_mixture, [comb_products, air], [temp_comb_products, temp_air],
+        [g_comb_products, g_air], [comb_products.alpha, 1], precision
+    )
     mixture = type(comb_products)()
-    air.__init__()
     mixture.alpha = alpha_mixture
-
-    mix_temp = None
-    mixture.T = temp_comb_products
-    mix_temp_new = temp_comb_products
-    temp_mix_res = 1.
-
-    comb_products.T = temp_comb_products
-    air.T = temp_air
-    c_p_comb_products_av = comb_products.c_p_av
-    c_p_air_av = air.c_p_av
-
-    while temp_mix_res >= precision:
-        mix_temp = mix_temp_new
-        mixture.T = mix_temp_new
-        enthalpy_comb_products = c_p_comb_products_av * (temp_comb_products - comb_products.T0) * g_comb_products
-        enthalpy_air = c_p_air_av * (temp_air - air.T0) * g_air
-        mix_temp_new = (
-                (enthalpy_air + enthalpy_comb_products) / (mixture.c_p_av * (g_air + g_comb_products)) + mixture.T0
-        )
-        temp_mix_res = abs(mix_temp_new - mix_temp) / mix_temp
-
-    return mix_temp_new, mixture, c_p_comb_products_av, c_p_air_av, mix_temp, temp_mix_res
+    mixture.T = mix_temp
+    c_p_comb_products_av = comb_products.c_p_av_func(temp_comb_products, alpha=comb_products.alpha)
+    c_p_air_av = air.c_p_av_func(temp_air, alpha=1)
+    return mix_temp, mixture, c_p_comb_products_av, c_p_air_av, mix_temp, temp_mix_res
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.optimize import fsolve
 
 
 class GasDynamicFunctions:
@@ -40,6 +39,7 @@ class GasDynamicFunctions:
         if 'pi' in kwargs:
             return np.sqrt((k + 1) / (k - 1) * (1 - kwargs['pi']**((k - 1) / k)))
         if 'q' in kwargs:
+            from scipy.optimize import fsolve
             q = kwargs['q']
             return fsolve(lambda x: [cls.q(x[0], k) - q], np.array([0.5]))[0]
 
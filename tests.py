@@ -1,13 +1,37 @@
+import json
 import logging
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
 import unittest
+import warnings
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
 from gas_turbine_cycle.core.network_lib import *
 from gas_turbine_cycle.core.solver import NetworkSolver
+from gas_turbine_cycle.core.spec import NetworkSpec
+from gas_turbine_cycle.core.cache import ResultCache, get_spec_key
+from gas_turbine_cycle.core.continuation import solve_continuation
+from gas_turbine_cycle.core.target import solve_target
+from gas_turbine_cycle.core.sensitivity import sensitivities, get_rel_step, get_param_bounds
+from gas_turbine_cycle.core.precision import explore_precision, get_setting_params
+from gas_turbine_cycle.core.results import ResultStore, run_sweep
+from gas_turbine_cycle.core.sweep import iter_solve, solve_point, get_default_outputs, get_serpentine_order, \
+    get_hilbert_order
+from gas_turbine_cycle.core.instrumentation import Instrumentation, ListSink, ChromeTraceSink, EventCategory, \
+    EventPhase
 from gas_turbine_cycle.core.turbine_lib import Compressor, Turbine, Source, Sink, CombustionChamber, Inlet, Outlet, \
-    Atmosphere, Load, FullExtensionNozzle
-from gas_turbine_cycle.gases import KeroseneCombustionProducts, NaturalGasCombustionProducts, Air
+    Atmosphere, Load, FullExtensionNozzle, Regenerator, RegeneratorHotSide
+from gas_turbine_cycle.core.acceleration import get_tear_connections
+from gas_turbine_cycle.core.topology import get_strongly_connected_components
+from gas_turbine_cycle.gases import IdealGas, KeroseneCombustionProducts, NaturalGasCombustionProducts, Air
+from gas_turbine_cycle.fuels import Fuel, NaturalGas
+from gas_turbine_cycle.schemes import Schemes
 
 logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.DEBUG)
 
@@ -236,6 +260,47 @@ class UnitsTests(unittest.TestCase):
         self.assertEqual(self.compressor.g_out, self.downstream_gd_unit.g_in)
         self.assertEqual(self.compressor.g_fuel_out, self.downstream_gd_unit.g_fuel_in)
 
+    def test_compressor_call_history(self):
+        """Результат расчета компрессора не зависит от предыдущих вызовов update()"""
+        solver = NetworkSolver([self.upstream_gd_unit, self.compressor, self.downstream_gd_unit,
+                                self.consume_unit1, self.gen_unit])
+        solver.create_gas_dynamic_connection(self.upstream_gd_unit, self.compressor)
+        solver.create_gas_dynamic_connection(self.compressor, self.downstream_gd_unit)
+        solver.create_mechanical_connection(self.gen_unit, self.compressor, self.consume_unit1)
+        self.compressor.set_behaviour()
+        self.upstream_gd_unit.T_stag_out = 300
+        self.upstream_gd_unit.p_stag_out = 1e5
+        self.upstream_gd_unit.alpha_out = np.inf
+        self.upstream_gd_unit.g_fuel_out = 0
+        self.upstream_gd_unit.g_out = 1
+        self.compressor.update()
+        T_stag_out = self.compressor.T_stag_out
+        labour = self.compressor.consumable_labour
+        self.upstream_gd_unit.T_stag_out = 320
+        self.compressor.update()
+        self.assertGreater(self.compressor.T_stag_out, T_stag_out)
+        self.upstream_gd_unit.T_stag_out = 300
+        self.compressor.update()
+        self.assertEqual(self.compressor.T_stag_out, T_stag_out)
+        self.assertEqual(self.compressor.consumable_labour, labour)
+        self.assertEqual(self.compressor.inner_iter_number, 0)
+
+    def test_compressor_precision_deprecation(self):
+        """Задание неиспользуемой точности компрессора вызывает предупреждение"""
+        with self.assertWarns(DeprecationWarning):
+            Compressor(5, precision=0.001)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            Compressor(5)
+
+    def test_nozzle_precision_deprecation(self):
+        """Задание неиспользуемой точности сопла вызывает предупреждение"""
+        with self.assertWarns(DeprecationWarning):
+            FullExtensionNozzle(precision=0.001)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            FullExtensionNozzle()
+
     def set_turbine_connections(self):
         solver = NetworkSolver([self.upstream_gd_unit, self.turbine, self.downstream_gd_unit,
                                 self.consume_unit1, self.gen_unit, self.consume_unit2])
@@ -445,6 +510,38 @@ class UnitsTests(unittest.TestCase):
         self.assertAlmostEqual(self.turbine.total_labour * self.turbine.g_in * self.turbine.eta_m,
                                self.consume_unit1.consumable_labour + self.consume_unit2.consumable_labour, places=2)
 
+    def test_turbine_expansion(self):
+        """Выходные параметры турбины компрессора удовлетворяют балансу энтальпий и уравнению политропического
+        расширения, в том числе при пакетном расчете"""
+        self.set_turbine_connections()
+        self.upstream_gd_unit.pres_outlet_port.make_output()
+        self.consume_unit1.labour_consume_port.make_output()
+        self.consume_unit2.labour_consume_port.make_output()
+        self.turbine.set_behaviour()
+        self.turbine.precision = 1e-6
+        self.consume_unit1.consumable_labour = np.array([150e3, 200e3, 300e3])
+        self.consume_unit2.consumable_labour = 0
+        self.upstream_gd_unit.T_stag_out = np.array([1300, 1400, 1500])
+        self.upstream_gd_unit.p_stag_out = 10e5
+        self.upstream_gd_unit.g_fuel_out = 0.05
+        self.upstream_gd_unit.g_out = 1.04
+        self.upstream_gd_unit.alpha_out = np.array([3, 2.5, 2.2])
+        self.turbine.update()
+        work_fluid = self.turbine.work_fluid
+        h_in, h_out, _, phi_diff = work_fluid.get_enthalpy_and_entropy_difference(
+            self.turbine.T_stag_in, self.turbine.T_stag_out, alpha=self.turbine.alpha_in
+        )
+        self.assertTrue(np.allclose(h_in - h_out, self.turbine.total_labour, rtol=1e-6))
+        self.assertTrue(np.allclose(-phi_diff, self.turbine.eta_stag_p * work_fluid.R * np.log(self.turbine.pi_t),
+                                    rtol=1e-6))
+        T_stag_out = self.turbine.T_stag_out
+        self.upstream_gd_unit.T_stag_out = 1400
+        self.upstream_gd_unit.alpha_out = 2.5
+        self.consume_unit1.consumable_labour = 200e3
+        self.turbine.update()
+        self.assertAlmostEqual(self.turbine.T_stag_out, T_stag_out[1], places=6)
+        self.assertLessEqual(self.turbine.inner_iter_number, 4)
+
     def test_upstream_source(self):
         solver = NetworkSolver([self.upstream_gd_unit, self.source, self.downstream_gd_unit])
         solver.create_gas_dynamic_connection(self.upstream_gd_unit, self.source)
@@ -512,6 +609,41 @@ class UnitsTests(unittest.TestCase):
         self.assertNotEqual(self.source.T_stag_out, None)
         self.assertEqual(self.source.g_out, self.source.g_in + self.source.g_return)
 
+    def test_multiple_return_source(self):
+        """Возврат воздуха в нескольких точках рассчитывается одним смешением всех потоков"""
+        solver = NetworkSolver([self.upstream_gd_unit, self.source, self.downstream_gd_unit])
+        solver.create_gas_dynamic_connection(self.upstream_gd_unit, self.source)
+        solver.create_gas_dynamic_connection(self.source, self.downstream_gd_unit)
+        self.upstream_gd_unit.pres_outlet_port.make_output()
+        self.source.set_behaviour()
+        self.upstream_gd_unit.T_stag_out = 1200
+        self.upstream_gd_unit.p_stag_out = 2.5e5
+        self.upstream_gd_unit.g_out = 1.04
+        self.upstream_gd_unit.g_fuel_out = 0.04
+        self.upstream_gd_unit.alpha_out = 1 / (self.source.work_fluid.l0 * (0.04 / (1.04 - 0.04)))
+
+        self.source.update()
+        T_stag_out = self.source.T_stag_out
+        self.source.g_return = 0.02
+        self.source.return_points = [(0.03, 700)]
+        self.source.update()
+        self.assertAlmostEqual(self.source.T_stag_out, T_stag_out, places=6)
+        self.assertEqual(self.source.g_out, self.source.g_in + 0.05)
+
+        self.source.T_return = 600
+        self.source.return_points = [(0.03, 800)]
+        self.source.update()
+        work_fluid = self.source.work_fluid
+        enthalpy_in = work_fluid.get_specific_enthalpy(self.source.T_stag_in, alpha=self.source.alpha_in) * \
+            self.source.g_in
+        enthalpy_return = sum(self.source.return_fluid.get_specific_enthalpy(T) * g
+                              for g, T in [(0.02, 600), (0.03, 800)])
+        enthalpy_out = work_fluid.get_specific_enthalpy(self.source.T_stag_out, alpha=self.source.alpha_out) * \
+            self.source.g_out
+        self.assertAlmostEqual((enthalpy_in + enthalpy_return - enthalpy_out) / enthalpy_out, 0, places=6)
+        self.assertAlmostEqual(self.source.mixture.c_p_av * (self.source.T_stag_out - work_fluid.T0) *
+                               self.source.g_out / enthalpy_out, 1, places=6)
+
     def test_sink(self):
         solver = NetworkSolver([self.upstream_gd_unit, self.sink, self.downstream_gd_unit])
         solver.create_gas_dynamic_connection(self.upstream_gd_unit, self.sink)
@@ -648,6 +780,43 @@ class UnitsTests(unittest.TestCase):
         self.assertNotEqual(self.comb_chamber.g_fuel_out, None)
         self.assertEqual(self.comb_chamber.g_out, self.comb_chamber.g_in * (1 + self.comb_chamber.g_fuel_prime))
 
+    def test_combustion_chamber_enthalpy_balance(self):
+        """Расход топлива удовлетворяет балансу энтальпий, в том числе при пакетном расчете; энтальпия топлива
+        при неизменном давлении не пересчитывается"""
+        solver = NetworkSolver([self.upstream_gd_unit, self.comb_chamber, self.downstream_gd_unit])
+        solver.create_gas_dynamic_connection(self.upstream_gd_unit, self.comb_chamber)
+        solver.create_gas_dynamic_connection(self.comb_chamber, self.downstream_gd_unit)
+        self.upstream_gd_unit.pres_outlet_port.make_output()
+        self.comb_chamber.set_behaviour()
+        self.comb_chamber.precision = 1e-8
+        self.upstream_gd_unit.T_stag_out = np.array([600, 700, 800])
+        self.upstream_gd_unit.p_stag_out = 10e5
+        self.upstream_gd_unit.alpha_out = np.inf
+        self.upstream_gd_unit.g_fuel_out = 0
+        self.upstream_gd_unit.g_out = 0.95
+        self.comb_chamber.update()
+
+        comb_chamber = self.comb_chamber
+        i_out = comb_chamber.work_fluid_out.get_specific_enthalpy(comb_chamber.T_stag_out, alpha=comb_chamber.alpha_out)
+        res = comb_chamber.g_fuel_prime * (comb_chamber.Q_n * comb_chamber.eta_burn + comb_chamber.i_fuel - i_out) - \
+            (i_out - comb_chamber.i_in_stag)
+        self.assertTrue(np.all(np.abs(res) < 1e-6 * comb_chamber.i_in_stag))
+        self.assertTrue(np.allclose(comb_chamber.alpha_out, 1 / (comb_chamber.l0 * comb_chamber.g_fuel_prime)))
+        g_fuel_prime = comb_chamber.g_fuel_prime
+
+        self.upstream_gd_unit.T_stag_out = 700
+        calls = []
+        get_specific_enthalpy = comb_chamber.fuel.get_specific_enthalpy
+        comb_chamber.fuel.get_specific_enthalpy = lambda *args, **kwargs: calls.append(args) or \
+            get_specific_enthalpy(*args, **kwargs)
+        comb_chamber.update()
+        self.assertAlmostEqual(comb_chamber.g_fuel_prime, g_fuel_prime[1], places=8)
+        self.assertLessEqual(comb_chamber.inner_iter_number, 5)
+        self.assertEqual(calls, [])
+        self.upstream_gd_unit.p_stag_out = 12e5
+        comb_chamber.update()
+        self.assertEqual(len(calls), 1)
+
     def test_inlet(self):
         solver = NetworkSolver([self.upstream_gd_unit, self.inlet, self.downstream_gd_unit])
         solver.create_gas_dynamic_connection(self.upstream_gd_unit, self.inlet)
@@ -768,6 +937,27 @@ class UnitsTests(unittest.TestCase):
         self.assertNotEqual(self.nozzle.g_out, None)
         self.assertNotEqual(self.nozzle.g_fuel_out, None)
 
+    def test_nozzle_expansion(self):
+        """Скорость истечения соответствует изоэнтропическому теплоперепаду, расчет массивов совпадает с расчетом
+        отдельных режимов"""
+        T_stag_in = np.array([800, 1000, 1200])
+        p_stag_in = np.array([1.5e5, 2.5e5, 4e5])
+        alpha = np.array([4, 2.5, np.inf])
+        H_n, c_out, T_out, p_stag_out = self.nozzle.get_expansion(T_stag_in, p_stag_in, 1e5, alpha)
+        work_fluid = self.nozzle.work_fluid
+        for n in range(3):
+            alpha_n = min(alpha[n], 100)
+            T_out_ad = work_fluid.get_ad_temp(T_stag_in[n], p_stag_in[n], 1e5, precision=1e-8, alpha=alpha_n)[0]
+            H_n_ad = work_fluid.get_specific_enthalpy(T_stag_in[n], alpha=alpha_n) - \
+                work_fluid.get_specific_enthalpy(T_out_ad, alpha=alpha_n)
+            self.assertAlmostEqual(H_n[n] / H_n_ad, 1, places=2)
+            self.assertEqual(self.nozzle.get_expansion(T_stag_in[n], p_stag_in[n], 1e5, alpha[n])[1], c_out[n])
+        enthalpy_drop = work_fluid.get_specific_enthalpy(T_stag_in, alpha=np.minimum(alpha, 100)) - \
+            work_fluid.get_specific_enthalpy(T_out, alpha=np.minimum(alpha, 100))
+        self.assertTrue(np.allclose(enthalpy_drop, c_out ** 2 / 2, rtol=1e-4))
+        self.assertTrue(np.all(p_stag_out < p_stag_in))
+        self.assertTrue(np.all(p_stag_out > 1e5))
+
     def test_atmosphere(self):
         solver = NetworkSolver([self.upstream_static_gd_unit, self.atmosphere, self.downstream_gd_unit])
         solver.create_static_gas_dynamic_connection(self.upstream_static_gd_unit, self.atmosphere)
@@ -816,123 +1006,13 @@ class UnitsTests(unittest.TestCase):
         self.assertFalse(self.atmosphere.has_undefined_ports())
 
 
-class SolverTests(unittest.TestCase):
+class SchemesTestCase(unittest.TestCase, Schemes):
+    """Базовый класс тестов, использующих типовые схемы ГТУ"""
     def setUp(self):
-        self.atmosphere = Atmosphere()
-        self.inlet = Inlet()
-        self.compressor1 = Compressor(6)
-        self.compressor2 = Compressor(10, precision=0.001)
-        self.sink = Sink()
-        self.comb_chamber = CombustionChamber(1400, alpha_out_init=2.7, precision=0.001)
-        self.comb_chamber_inter_up = CombustionChamber(1300, alpha_out_init=2.7, precision=0.001)
-        self.comb_chamber_inter_down = CombustionChamber(1300, alpha_out_init=2.7, precision=0.001,
-                                                         p_stag_out_init=4e5)
-        self.source1 = Source(work_fluid=KeroseneCombustionProducts(), g_return=0.03)
-        self.source2 = Source(work_fluid=KeroseneCombustionProducts(), g_return=0.03)
-        self.turbine_low_pres_power = Turbine(p_stag_out_init=1e5)
-        self.turbine_comp_up = Turbine()
-        self.turbine_high_pres_power = Turbine(p_stag_out_init=4e5, precision=0.001)
-        self.turbine_comp_down = Turbine(p_stag_out_init=1e5, precision=0.001)
-        self.outlet = Outlet()
-        self.load = Load(2e6)
-        self.zero_load1 = Load(0)
-        self.zero_load2 = Load(0)
-
-    def get_1B_solver(self) -> NetworkSolver:
-        solver = NetworkSolver([self.atmosphere, self.outlet, self.sink, self.source1, self.turbine_low_pres_power,
-                                self.inlet, self.comb_chamber, self.compressor1, self.load], cold_work_fluid=Air(),
-                               hot_work_fluid=NaturalGasCombustionProducts())
-        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
-        solver.create_gas_dynamic_connection(self.inlet, self.compressor1)
-        solver.create_gas_dynamic_connection(self.compressor1, self.sink)
-        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
-        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
-        solver.create_gas_dynamic_connection(self.source1, self.turbine_low_pres_power)
-        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.outlet)
-        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
-        solver.create_mechanical_connection(self.turbine_low_pres_power, self.compressor1, self.load)
-        return solver
-
-    def get_2N_solver(self) -> NetworkSolver:
-        solver = NetworkSolver([self.atmosphere, self.outlet, self.turbine_comp_up, self.sink, self.source1,
-                                self.turbine_low_pres_power, self.inlet, self.comb_chamber, self.compressor2,
-                                self.load, self.zero_load1, self.zero_load2], cold_work_fluid=Air(),
-                               hot_work_fluid=NaturalGasCombustionProducts())
-        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
-        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
-        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
-        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
-        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
-        solver.create_gas_dynamic_connection(self.source1, self.turbine_comp_up)
-        solver.create_gas_dynamic_connection(self.turbine_comp_up, self.turbine_low_pres_power)
-        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.outlet)
-        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
-        solver.create_mechanical_connection(self.turbine_low_pres_power, self.load, self.zero_load1)
-        solver.create_mechanical_connection(self.turbine_comp_up, self.compressor2, self.zero_load2)
-        return solver
-
-    def get_2NIH_solver(self) -> NetworkSolver:
-        solver = NetworkSolver([self.atmosphere, self.outlet, self.turbine_comp_up, self.sink, self.source1,
-                                self.turbine_low_pres_power, self.inlet, self.comb_chamber, self.compressor2,
-                                self.load, self.zero_load1, self.zero_load2, self.comb_chamber_inter_up, self.source2],
-                               precision=0.001, cold_work_fluid=Air(),
-                               hot_work_fluid=NaturalGasCombustionProducts())
-        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
-        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
-        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
-        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
-        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
-        solver.create_gas_dynamic_connection(self.source1, self.turbine_comp_up)
-        solver.create_gas_dynamic_connection(self.turbine_comp_up, self.comb_chamber_inter_up)
-        solver.create_gas_dynamic_connection(self.comb_chamber_inter_up, self.source2)
-        solver.create_gas_dynamic_connection(self.source2, self.turbine_low_pres_power)
-        solver.create_gas_dynamic_connection(self.turbine_low_pres_power, self.outlet)
-        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
-        solver.create_mechanical_connection(self.turbine_low_pres_power, self.load, self.zero_load1)
-        solver.create_mechanical_connection(self.turbine_comp_up, self.compressor2, self.zero_load2)
-        return solver
-
-    def get_2V_solver(self) -> NetworkSolver:
-        solver = NetworkSolver([self.load, self.zero_load1, self.zero_load2, self.atmosphere, self.outlet, self.inlet,
-                                self.turbine_comp_down, self.compressor2, self.turbine_high_pres_power,
-                                self.comb_chamber, self.sink, self.source1, self.source2], precision=0.0005,
-                               cold_work_fluid=Air(),
-                               hot_work_fluid=NaturalGasCombustionProducts())
-        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
-        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
-        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
-        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
-        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
-        solver.create_gas_dynamic_connection(self.source1, self.turbine_high_pres_power)
-        solver.create_gas_dynamic_connection(self.turbine_high_pres_power, self.source2)
-        solver.create_gas_dynamic_connection(self.source2, self.turbine_comp_down)
-        solver.create_gas_dynamic_connection(self.turbine_comp_down, self.outlet)
-        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
-        solver.create_mechanical_connection(self.turbine_high_pres_power, self.load, self.zero_load1)
-        solver.create_mechanical_connection(self.turbine_comp_down, self.compressor2, self.zero_load2)
-        return solver
-
-    def get_2VIH_solver(self) -> NetworkSolver:
-        solver = NetworkSolver([self.load, self.zero_load1, self.zero_load2, self.atmosphere, self.outlet, self.inlet,
-                                self.turbine_comp_down, self.compressor2, self.turbine_high_pres_power,
-                                self.comb_chamber, self.sink, self.source1, self.source2,
-                                self.comb_chamber_inter_down], precision=0.0005, cold_work_fluid=Air(),
-                               hot_work_fluid=NaturalGasCombustionProducts())
-        solver.create_gas_dynamic_connection(self.atmosphere, self.inlet)
-        solver.create_gas_dynamic_connection(self.inlet, self.compressor2)
-        solver.create_gas_dynamic_connection(self.compressor2, self.sink)
-        solver.create_gas_dynamic_connection(self.sink, self.comb_chamber)
-        solver.create_gas_dynamic_connection(self.comb_chamber, self.source1)
-        solver.create_gas_dynamic_connection(self.source1, self.turbine_high_pres_power)
-        solver.create_gas_dynamic_connection(self.turbine_high_pres_power, self.comb_chamber_inter_down)
-        solver.create_gas_dynamic_connection(self.comb_chamber_inter_down, self.source2)
-        solver.create_gas_dynamic_connection(self.source2, self.turbine_comp_down)
-        solver.create_gas_dynamic_connection(self.turbine_comp_down, self.outlet)
-        solver.create_static_gas_dynamic_connection(self.outlet, self.atmosphere)
-        solver.create_mechanical_connection(self.turbine_high_pres_power, self.load, self.zero_load1)
-        solver.create_mechanical_connection(self.turbine_comp_down, self.compressor2, self.zero_load2)
-        return solver
+        self.create_units()
+
 
+class SolverTests(SchemesTestCase):
     def test_1B_behaviour_setting(self):
         solver = self.get_1B_solver()
         self.assertTrue(self.atmosphere.has_undefined_ports())
@@ -965,14 +1045,15 @@ class SolverTests(unittest.TestCase):
     def test_1B_sorting_units(self):
         solver = self.get_1B_solver()
         sorted_list = solver.get_sorted_unit_list()
-        self.assertEqual(sorted_list[0], self.atmosphere)
-        self.assertEqual(sorted_list[1], self.inlet)
-        self.assertEqual(sorted_list[2], self.compressor1)
-        self.assertEqual(sorted_list[3], self.sink)
-        self.assertEqual(sorted_list[4], self.comb_chamber)
-        self.assertEqual(sorted_list[5], self.source1)
-        self.assertEqual(sorted_list[6], self.turbine_low_pres_power)
-        self.assertEqual(sorted_list[7], self.outlet)
+        gas_units = [unit for unit in sorted_list if isinstance(unit, GasDynamicUnit)]
+        self.assertEqual(gas_units[0], self.atmosphere)
+        self.assertEqual(gas_units[1], self.inlet)
+        self.assertEqual(gas_units[2], self.compressor1)
+        self.assertEqual(gas_units[3], self.sink)
+        self.assertEqual(gas_units[4], self.comb_chamber)
+        self.assertEqual(gas_units[5], self.source1)
+        self.assertEqual(gas_units[6], self.turbine_low_pres_power)
+        self.assertEqual(gas_units[7], self.outlet)
 
     def test_1B_solving(self):
         solver = self.get_1B_solver()
@@ -1028,16 +1109,18 @@ class SolverTests(unittest.TestCase):
         solver = self.get_2N_solver()
 
         sorted_list = solver.get_sorted_unit_list()
-
-        self.assertEqual(sorted_list[0], self.atmosphere)
-        self.assertEqual(sorted_list[1], self.inlet)
-        self.assertEqual(sorted_list[2], self.compressor2)
-        self.assertEqual(sorted_list[3], self.sink)
-        self.assertEqual(sorted_list[4], self.comb_chamber)
-        self.assertEqual(sorted_list[5], self.source1)
-        self.assertEqual(sorted_list[6], self.turbine_comp_up)
-        self.assertEqual(sorted_list[7], self.turbine_low_pres_power)
-        self.assertEqual(sorted_list[8], self.outlet)
+        gas_units = [unit for unit in sorted_list if isinstance(unit, GasDynamicUnit)]
+
+        self.assertEqual(gas_units[0], self.atmosphere)
+        self.assertEqual(gas_units[1], self.inlet)
+        self.assertEqual(gas_units[2], self.compressor2)
+        self.assertEqual(gas_units[3], self.sink)
+        self.assertEqual(gas_units[4], self.comb_chamber)
+        self.assertEqual(gas_units[5], self.source1)
+        self.assertEqual(gas_units[6], self.turbine_comp_up)
+        self.assertEqual(gas_units[7], self.turbine_low_pres_power)
+        self.assertEqual(gas_units[8], self.outlet)
+        self.assertLess(sorted_list.index(self.zero_load1), sorted_list.index(self.turbine_low_pres_power))
 
     def test_2N_solving(self):
         solver = self.get_2N_solver()
@@ -1122,17 +1205,18 @@ class SolverTests(unittest.TestCase):
     def test_2V_sorting(self):
         solver = self.get_2V_solver()
         sorted_list = solver.get_sorted_unit_list()
-
-        self.assertEqual(sorted_list[0], self.atmosphere)
-        self.assertEqual(sorted_list[1], self.inlet)
-        self.assertEqual(sorted_list[2], self.compressor2)
-        self.assertEqual(sorted_list[3], self.sink)
-        self.assertEqual(sorted_list[4], self.comb_chamber)
-        self.assertEqual(sorted_list[5], self.source1)
-        self.assertEqual(sorted_list[6], self.turbine_high_pres_power)
-        self.assertEqual(sorted_list[7], self.source2)
-        self.assertEqual(sorted_list[8], self.turbine_comp_down)
-        self.assertEqual(sorted_list[9], self.outlet)
+        gas_units = [unit for unit in sorted_list if isinstance(unit, GasDynamicUnit)]
+
+        self.assertEqual(gas_units[0], self.atmosphere)
+        self.assertEqual(gas_units[1], self.inlet)
+        self.assertEqual(gas_units[2], self.compressor2)
+        self.assertEqual(gas_units[3], self.sink)
+        self.assertEqual(gas_units[4], self.comb_chamber)
+        self.assertEqual(gas_units[5], self.source1)
+        self.assertEqual(gas_units[6], self.turbine_high_pres_power)
+        self.assertEqual(gas_units[7], self.source2)
+        self.assertEqual(gas_units[8], self.turbine_comp_down)
+        self.assertEqual(gas_units[9], self.outlet)
 
     def test_2V_solving(self):
         solver = self.get_2V_solver()
@@ -1199,18 +1283,19 @@ class SolverTests(unittest.TestCase):
         solver = self.get_2NIH_solver()
 
         sorted_list = solver.get_sorted_unit_list()
-
-        self.assertEqual(sorted_list[0], self.atmosphere)
-        self.assertEqual(sorted_list[1], self.inlet)
-        self.assertEqual(sorted_list[2], self.compressor2)
-        self.assertEqual(sorted_list[3], self.sink)
-        self.assertEqual(sorted_list[4], self.comb_chamber)
-        self.assertEqual(sorted_list[5], self.source1)
-        self.assertEqual(sorted_list[6], self.turbine_comp_up)
-        self.assertEqual(sorted_list[7], self.comb_chamber_inter_up)
-        self.assertEqual(sorted_list[8], self.source2)
-        self.assertEqual(sorted_list[9], self.turbine_low_pres_power)
-        self.assertEqual(sorted_list[10], self.outlet)
+        gas_units = [unit for unit in sorted_list if isinstance(unit, GasDynamicUnit)]
+
+        self.assertEqual(gas_units[0], self.atmosphere)
+        self.assertEqual(gas_units[1], self.inlet)
+        self.assertEqual(gas_units[2], self.compressor2)
+        self.assertEqual(gas_units[3], self.sink)
+        self.assertEqual(gas_units[4], self.comb_chamber)
+        self.assertEqual(gas_units[5], self.source1)
+        self.assertEqual(gas_units[6], self.turbine_comp_up)
+        self.assertEqual(gas_units[7], self.comb_chamber_inter_up)
+        self.assertEqual(gas_units[8], self.source2)
+        self.assertEqual(gas_units[9], self.turbine_low_pres_power)
+        self.assertEqual(gas_units[10], self.outlet)
 
     def test_2NIH_solving(self):
         solver = self.get_2NIH_solver()
@@ -1281,18 +1366,19 @@ class SolverTests(unittest.TestCase):
     def test_2VIH_sorting(self):
         solver = self.get_2VIH_solver()
         sorted_list = solver.get_sorted_unit_list()
-
-        self.assertEqual(sorted_list[0], self.atmosphere)
-        self.assertEqual(sorted_list[1], self.inlet)
-        self.assertEqual(sorted_list[2], self.compressor2)
-        self.assertEqual(sorted_list[3], self.sink)
-        self.assertEqual(sorted_list[4], self.comb_chamber)
-        self.assertEqual(sorted_list[5], self.source1)
-        self.assertEqual(sorted_list[6], self.turbine_high_pres_power)
-        self.assertEqual(sorted_list[7], self.comb_chamber_inter_down)
-        self.assertEqual(sorted_list[8], self.source2)
-        self.assertEqual(sorted_list[9], self.turbine_comp_down)
-        self.assertEqual(sorted_list[10], self.outlet)
+        gas_units = [unit for unit in sorted_list if isinstance(unit, GasDynamicUnit)]
+
+        self.assertEqual(gas_units[0], self.atmosphere)
+        self.assertEqual(gas_units[1], self.inlet)
+        self.assertEqual(gas_units[2], self.compressor2)
+        self.assertEqual(gas_units[3], self.sink)
+        self.assertEqual(gas_units[4], self.comb_chamber)
+        self.assertEqual(gas_units[5], self.source1)
+        self.assertEqual(gas_units[6], self.turbine_high_pres_power)
+        self.assertEqual(gas_units[7], self.comb_chamber_inter_down)
+        self.assertEqual(gas_units[8], self.source2)
+        self.assertEqual(gas_units[9], self.turbine_comp_down)
+        self.assertEqual(gas_units[10], self.outlet)
 
     def test_2VIH_solving(self):
         solver = self.get_2VIH_solver()
@@ -1345,5 +1431,759 @@ class SolverTests(unittest.TestCase):
         self.assertEqual(type(self.source2.return_fluid), Air)
 
 
+class InnerLoopTests(SchemesTestCase):
+    def test_nan_input(self):
+        for params in [{'comb_chamber.T_gas': np.nan}, {'inlet.sigma': np.nan}]:
+            res = solve_point(self.get_2N_spec(), params, ['efficiency'])
+            self.assertFalse(res.converged)
+            self.assertTrue(res.error.startswith('RuntimeError'))
+
+    def test_iteration_cap(self):
+        with mock.patch.object(Unit, 'max_inner_iter_number', 1):
+            self.assertRaisesRegex(RuntimeError, 'loop', self.get_2N_solver().solve)
+
+
+class RegeneratorTests(SchemesTestCase):
+    def test_behaviour_setting(self):
+        solver = self.get_2NR_solver()
+        solver.set_units_behaviour()
+        self.assertFalse(self.regenerator.has_undefined_ports())
+        self.assertFalse(self.regenerator_hot.has_undefined_ports())
+        self.assertEqual(self.regenerator.hot_temp_inlet_port.port_type, PortType.Input)
+        self.assertEqual(self.regenerator.heat_outlet_port.port_type, PortType.Output)
+        self.assertEqual(self.regenerator.pres_outlet_port.port_type, PortType.Output)
+        self.assertTrue(self.regenerator_hot.check_downstream_behaviour())
+        self.assertEqual(self.regenerator_hot.pres_inlet_port.port_type, PortType.Output)
+
+    def test_tear_connections(self):
+        solver = self.get_2NR_solver()
+        solver.set_units_behaviour()
+        tear_connections = get_tear_connections(solver.get_sorted_unit_list(), solver._connection_arr)
+        self.assertIn(self.regenerator.hot_temp_inlet_port._linked_connection, tear_connections)
+        self.assertIn(self.turbine_low_pres_power.pres_outlet_port._linked_connection, tear_connections)
+        self.assertIn(self.regenerator_hot.pres_outlet_port._linked_connection, tear_connections)
+        self.assertNotIn(self.regenerator.heat_outlet_port._linked_connection, tear_connections)
+        self.assertNotIn(self.regenerator.temp_outlet_port._linked_connection, tear_connections)
+
+    def test_solving(self):
+        solver = self.get_2NR_solver()
+        solver.solve()
+        regenerator = self.regenerator
+        regenerator_hot = self.regenerator_hot
+        # степень регенерации и баланс теплоты
+        self.assertAlmostEqual((regenerator.T_stag_out - regenerator.T_stag_in) /
+                               (regenerator_hot.T_stag_in - regenerator.T_stag_in), 0.7, places=2)
+        hot_fluid = regenerator_hot.work_fluid
+        heat_hot = regenerator_hot.g_in * (
+            hot_fluid.get_specific_enthalpy(regenerator_hot.T_stag_in, alpha=regenerator_hot.alpha_in) -
+            hot_fluid.get_specific_enthalpy(regenerator_hot.T_stag_out, alpha=regenerator_hot.alpha_in)
+        )
+        self.assertAlmostEqual(heat_hot / regenerator.heat, 1, places=2)
+        self.assertLess(regenerator_hot.T_stag_out, regenerator_hot.T_stag_in)
+        self.assertEqual(self.comb_chamber.T_stag_in, regenerator.T_stag_out)
+        # проверка баланса давлений
+        self.assertAlmostEqual(abs(1 - self.atmosphere.p_stag_out * self.inlet.sigma * self.outlet.sigma *
+                                   regenerator.sigma_cold * regenerator_hot.sigma_hot *
+                                   self.comb_chamber.sigma_comb * self.compressor1.pi_c /
+                                   (self.atmosphere.p_stag_in * self.turbine_low_pres_power.pi_t *
+                                    self.turbine_comp_up.pi_t)), 0, places=3)
+        # контур рециркуляции сходится за число итераций, сравнимое со схемами без регенерации той же точности
+        self.assertLessEqual(solver.iter_number, 8)
+
+    def test_efficiency(self):
+        spec = self.get_2NR_spec()
+        res = solve_point(spec, {}, ['efficiency', 'regenerator.T_stag_out'])
+        simple_res = solve_point(spec.replace({'regenerator.regeneration_rate': 0}), {}, ['efficiency'])
+        self.assertTrue(res.converged)
+        self.assertGreater(res.outputs['efficiency'], simple_res.outputs['efficiency'] * 1.1)
+
+    def test_spec(self):
+        solver, units = self.get_2NR_spec().build()
+        solver.solve()
+        self.get_2NR_solver().solve()
+        self.assertAlmostEqual(units['regenerator'].T_stag_out, self.regenerator.T_stag_out, places=6)
+        self.assertAlmostEqual(units['regenerator_hot'].T_stag_out, self.regenerator_hot.T_stag_out, places=6)
+        spec = self.get_2NR_spec()
+        self.assertEqual(NetworkSpec.from_json(spec.to_json()).to_dict(), spec.to_dict())
+
+
+class TopologyTests(SchemesTestCase):
+    def test_strongly_connected_components(self):
+        graph = {'a': {'b': 1}, 'b': {'c': 1}, 'c': {'b': 1, 'd': 1}, 'd': {}, 'e': {'e': 1}}
+        components = get_strongly_connected_components(graph)
+        self.assertEqual([sorted(component) for component in components], [['d'], ['b', 'c'], ['a'], ['e']])
+
+    def test_components(self):
+        solver = self.get_2N_solver()
+        components = solver.get_components()
+        cyclic_components = [component for component in components if component.cyclic]
+        self.assertEqual(len(cyclic_components), 1)
+        self.assertEqual(cyclic_components[0].units, [self.turbine_low_pres_power, self.outlet])
+        self.assertIn(self.outlet.pres_inlet_port._linked_connection,
+                      cyclic_components[0].connection_set.connections)
+
+    def test_acyclic_units_updated_once(self):
+        solver = self.get_2NR_solver()
+        solver.solve(profile=True)
+        calls = {profile.unit: profile.calls for profile in solver.profile.get_table()}
+        for unit in [self.inlet, self.compressor1, self.sink]:
+            self.assertEqual(calls[unit], 1)
+        for unit in [self.regenerator, self.comb_chamber, self.regenerator_hot, self.outlet]:
+            self.assertEqual(calls[unit], solver.iter_number)
+        self.assertGreater(solver.iter_number, 1)
+
+
+class AccelerationTests(SchemesTestCase):
+    def test_2V(self):
+        solver = self.get_2V_solver()
+        solver.acceleration = False
+        solver.solve()
+        res = self.atmosphere.T_stag_in, self.comb_chamber.g_fuel_prime, self.load.consumable_labour
+        iter_number = solver.iter_number
+        self.setUp()
+        solver = self.get_2V_solver()
+        solver.solve()
+        accelerated_res = self.atmosphere.T_stag_in, self.comb_chamber.g_fuel_prime, self.load.consumable_labour
+        self.assertLess(solver.iter_number, iter_number)
+        for value, accelerated_value in zip(res, accelerated_res):
+            self.assertAlmostEqual(accelerated_value / value, 1, places=3)
+
+
+class ImportTests(unittest.TestCase):
+    def test_no_work_at_import(self):
+        code = '; '.join([
+            'import sys, logging',
+            'import gas_turbine_cycle.core.solver, gas_turbine_cycle.core.spec, gas_turbine_cycle.core.sweep',
+            'print(sorted(set(name.split(".")[0] for name in sys.modules if name.startswith(("scipy", '
+            '"multiprocessing")))))',
+            'print(len(logging.getLogger().handlers))'
+        ])
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.decode().split(), ['[]', '0'])
+
+
+class InstrumentationTests(SchemesTestCase):
+    def test_disabled_by_default(self):
+        solver = self.get_1B_solver()
+        self.assertFalse(solver.instrumentation.enabled)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as dirname:
+            os.chdir(dirname)
+            try:
+                # при выключенном инструментировании события не формируются
+                with mock.patch.object(Instrumentation, 'emit', side_effect=AssertionError('Event is emitted')):
+                    solver.solve()
+                self.assertEqual(os.listdir(dirname), [])
+            finally:
+                os.chdir(cwd)
+        self.assertFalse(os.path.exists(os.path.join(cwd, 'cycle.log')))
+
+    def test_events(self):
+        solver = self.get_2N_solver()
+        sink = ListSink()
+        solver.instrumentation = Instrumentation([sink])
+        solver.solve()
+        iter_events = sink.get_events(EventCategory.Iteration, EventPhase.End)
+        cyclic_components = [component for component in solver.components if component.cyclic]
+        self.assertEqual(len(iter_events), sum(component.iter_number for component in cyclic_components))
+        self.assertLess(iter_events[-1].data['residual'], solver.precision)
+        unit_events = sink.get_events(EventCategory.Unit, EventPhase.Begin)
+        # юниты без прямой передачи обновляются повторно после расчета всех компонент
+        boundary_units = [unit for unit in solver.get_sorted_unit_list() if not unit.direct_feedthrough]
+        self.assertEqual(len(unit_events), sum(component.iter_number * len(component.units)
+                                               for component in solver.components) + len(boundary_units))
+        solve_events = sink.get_events(EventCategory.Solve, EventPhase.End)
+        self.assertEqual(len(solve_events), 1)
+        self.assertTrue(solve_events[0].data['converged'])
+
+    def test_user_sink_is_not_closed(self):
+        solver = self.get_1B_solver()
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'trace.json')
+            sink = ChromeTraceSink(filename)
+            solver.instrumentation = Instrumentation([sink])
+            solver.solve()
+            solver.solve(trace=os.path.join(dirname, 'trace_solve.json'))
+            self.assertFalse(os.path.exists(filename))
+            self.assertTrue(os.path.exists(os.path.join(dirname, 'trace_solve.json')))
+            solver.instrumentation.close()
+            with open(filename) as file:
+                trace = json.load(file)
+        solve_events = [event for event in trace['traceEvents'] if event['cat'] == 'Solve' and event['ph'] == 'E']
+        self.assertEqual(len(solve_events), 2)
+
+
+class ProfilingTests(SchemesTestCase):
+    def test_profile_table(self):
+        solver = self.get_2N_solver()
+        self.assertIsNone(solver.profile)
+        solver.solve(profile=True)
+        self.assertFalse(solver.instrumentation.enabled)
+        table = solver.profile.get_table()
+        self.assertEqual([profile.unit for profile in table], solver.get_sorted_unit_list())
+        iter_numbers = {unit: component.iter_number for component in solver.components for unit in component.units}
+        for profile in table:
+            self.assertEqual(profile.calls, iter_numbers[profile.unit] + (0 if profile.unit.direct_feedthrough else 1))
+            self.assertGreater(profile.time, 0)
+        profiles = {profile.unit: profile for profile in table}
+        self.assertGreater(profiles[self.turbine_comp_up].inner_iter_number, 0)
+        self.assertGreater(profiles[self.comb_chamber].inner_iter_number, 0)
+        self.assertGreater(profiles[self.source1].inner_iter_number, 0)
+        self.assertEqual(profiles[self.compressor2].inner_iter_number, 0)
+        self.assertEqual(profiles[self.inlet].inner_iter_number, 0)
+        self.assertIn('Turbine[', str(solver.profile))
+
+
+class TraceTests(SchemesTestCase):
+    def test_chrome_trace(self):
+        solver = self.get_2VIH_solver()
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'trace.json')
+            solver.solve(trace=filename)
+            with open(filename) as file:
+                trace = json.load(file)
+        self.assertFalse(solver.instrumentation.enabled)
+        events = trace['traceEvents']
+        categories = set(event['cat'] for event in events)
+        for category in ['Solve', 'Iteration', 'Unit', 'Loop', 'Property']:
+            self.assertIn(category, categories)
+        depth = 0
+        for event in events:
+            if event['ph'] == 'B':
+                depth += 1
+            elif event['ph'] == 'E':
+                depth -= 1
+            self.assertGreaterEqual(depth, 0)
+        self.assertEqual(depth, 0)
+        self.assertNotIn('c_p_av_int_func', self.turbine_comp_down.work_fluid.__dict__)
+
+
+class BatchSolverTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.T_gas_arr = np.array([1250., 1400., 1550.])
+        self.T0_arr = np.array([258., 288., 308.])
+
+    def solve_point(self, scheme, T_gas, T0):
+        self.setUp()
+        self.atmosphere = Atmosphere(T0=T0)
+        self.comb_chamber = CombustionChamber(T_gas, alpha_out_init=2.7, precision=0.001)
+        getattr(self, 'get_%s_solver' % scheme)().solve()
+        return self.atmosphere.T_stag_in, self.comb_chamber.g_fuel_prime, self.load.consumable_labour
+
+    def check_scheme(self, scheme):
+        batch_res = self.solve_point(scheme, self.T_gas_arr, self.T0_arr)
+        for value in batch_res:
+            self.assertEqual(np.shape(value), self.T_gas_arr.shape)
+        for n in range(len(self.T_gas_arr)):
+            point_res = self.solve_point(scheme, self.T_gas_arr[n], self.T0_arr[n])
+            for batch_value, point_value in zip(batch_res, point_res):
+                self.assertAlmostEqual(abs(batch_value[n] - point_value) / point_value, 0, places=3)
+
+    def test_1B(self):
+        self.check_scheme('1B')
+
+    def test_2N(self):
+        self.check_scheme('2N')
+
+    def test_2VIH(self):
+        self.check_scheme('2VIH')
+
+    def test_2NR(self):
+        self.check_scheme('2NR')
+
+    def test_vectorized_fluids(self):
+        T_arr = np.linspace(300, 1800, 7)
+        for fluid in [Air(), KeroseneCombustionProducts(), NaturalGasCombustionProducts()]:
+            c_p_av_arr = fluid.c_p_av_func(T_arr, alpha=2.5)
+            for T, c_p_av in zip(T_arr, c_p_av_arr):
+                self.assertAlmostEqual(fluid.c_p_av_func(T, alpha=2.5), c_p_av, places=8)
+
+
+class ThreadSafetyTests(SchemesTestCase):
+    def test_default_fluids_are_not_shared(self):
+        self.assertIsNot(Compressor(6).work_fluid, Compressor(6).work_fluid)
+        self.assertIsNot(Turbine().work_fluid, Turbine().work_fluid)
+        self.assertIsNot(Inlet().work_fluid, Inlet().work_fluid)
+        self.assertIsNot(Outlet().work_fluid, Outlet().work_fluid)
+        self.assertIsNot(Source().return_fluid, Source().return_fluid)
+        self.assertIsNot(Atmosphere().work_fluid_out, Atmosphere().work_fluid_out)
+        self.assertIsNot(FullExtensionNozzle().work_fluid, FullExtensionNozzle().work_fluid)
+        self.assertIsNot(CombustionChamber(1400).fuel, CombustionChamber(1400).fuel)
+
+    def test_shared_fuel_copying(self):
+        solver = self.get_2NIH_solver()
+        self.comb_chamber_inter_up.fuel = self.comb_chamber.fuel
+        solver.solve()
+        self.assertIsNot(self.comb_chamber_inter_up.fuel, self.comb_chamber.fuel)
+
+    def test_shared_state_checking(self):
+        solver = self.get_2N_solver()
+        self.load.fluid = self.zero_load1.fluid = Air()
+        self.assertRaisesRegex(RuntimeError, 'shared', solver.solve)
+
+    def solve_2N(self, T_gas, fuel: Fuel, work_fluid: IdealGas):
+        case = SchemesTestCase()
+        case.setUp()
+        case.comb_chamber = CombustionChamber(T_gas, alpha_out_init=2.7, precision=0.001, fuel=fuel)
+        case.source1 = Source(work_fluid=work_fluid, g_return=0.03)
+        case.get_2N_solver().solve()
+        return case.atmosphere.T_stag_in, case.comb_chamber.g_fuel_prime, case.load.consumable_labour
+
+    def test_shared_instances_thread_pool_solving(self):
+        T_gas_arr = [1250, 1300, 1350, 1400, 1450, 1500]
+        fuel = NaturalGas()
+        work_fluid = KeroseneCombustionProducts()
+        serial_res = [self.solve_2N(T_gas, NaturalGas(), KeroseneCombustionProducts()) for T_gas in T_gas_arr]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel_res = list(executor.map(lambda T_gas: self.solve_2N(T_gas, fuel, work_fluid), T_gas_arr))
+        self.assertEqual(serial_res, parallel_res)
+
+    def solve_2VIH(self, T_gas):
+        case = SchemesTestCase()
+        case.setUp()
+        case.comb_chamber = CombustionChamber(T_gas, alpha_out_init=2.7, precision=0.001)
+        case.get_2VIH_solver().solve()
+        return case.atmosphere.T_stag_in, case.comb_chamber.g_fuel_prime, case.load.consumable_labour
+
+    def test_thread_pool_solving(self):
+        T_gas_arr = [1250, 1300, 1350, 1400, 1450, 1500]
+        serial_res = [self.solve_2VIH(T_gas) for T_gas in T_gas_arr]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel_res = list(executor.map(self.solve_2VIH, T_gas_arr))
+        self.assertEqual(serial_res, parallel_res)
+
+
+class NetworkSpecTests(SchemesTestCase):
+    def test_build(self):
+        solver, units = self.get_2N_spec().build()
+        solver.solve()
+        self.get_2N_solver().solve()
+        self.assertAlmostEqual(units['atmosphere'].T_stag_in, self.atmosphere.T_stag_in, places=6)
+        self.assertAlmostEqual(units['comb_chamber'].g_fuel_prime, self.comb_chamber.g_fuel_prime, places=8)
+        self.assertAlmostEqual(units['load'].consumable_labour, self.load.consumable_labour, places=3)
+        self.assertIsInstance(units['comb_chamber'].work_fluid_out, NaturalGasCombustionProducts)
+
+    def test_scheme_specs(self):
+        for scheme in ['1B', '2N', '2NIH', '2V', '2VIH', '2NR']:
+            self.create_units()
+            solver, units = getattr(self, 'get_%s_spec' % scheme)().build()
+            solver.solve()
+            getattr(self, 'get_%s_solver' % scheme)().solve()
+            self.assertEqual(len(units), len(solver.get_sorted_unit_list()))
+            self.assertAlmostEqual(units['atmosphere'].T_stag_in, self.atmosphere.T_stag_in, places=2)
+            self.assertAlmostEqual(units['comb_chamber'].g_fuel_prime, self.comb_chamber.g_fuel_prime, places=5)
+            self.assertAlmostEqual(units['load'].consumable_labour / self.load.consumable_labour, 1, places=4)
+
+    def test_serialization(self):
+        spec = self.get_2N_spec()
+        spec_json = NetworkSpec.from_json(spec.to_json())
+        self.assertEqual(spec_json.to_dict(), spec.to_dict())
+        spec_pickle = pickle.loads(pickle.dumps(spec))
+        self.assertEqual(spec_pickle.to_dict(), spec.to_dict())
+        self.assertLess(len(pickle.dumps(spec)), 4096)
+
+    def test_return_points(self):
+        """Точки возврата воздуха сохраняются при сериализации и не превращаются в пакетный расчет"""
+        spec = self.get_2N_spec().replace({'source.g_return': 0.01, 'source.return_points': [(0.02, 650)]})
+        self.source1.g_return = 0.01
+        self.source1.return_points = [(0.02, 650)]
+        self.get_2N_solver().solve()
+        for spec_copy in [spec, NetworkSpec.from_json(spec.to_json()), pickle.loads(pickle.dumps(spec))]:
+            solver, units = spec_copy.build()
+            solver.solve()
+            self.assertEqual(units['source'].return_points, [(0.02, 650)])
+            self.assertEqual(np.ndim(units['source'].T_stag_out), 0)
+            self.assertAlmostEqual(units['source'].g_return_sum, 0.03)
+            self.assertAlmostEqual(units['source'].T_stag_out, self.source1.T_stag_out, places=6)
+            self.assertAlmostEqual(units['comb_chamber'].g_fuel_prime, self.comb_chamber.g_fuel_prime, places=8)
+
+    def test_replace(self):
+        spec = self.get_1B_spec()
+        new_spec = spec.replace({'comb_chamber.T_gas': 1500, 'precision': 0.001})
+        self.assertEqual(new_spec.get_param('comb_chamber.T_gas'), 1500)
+        self.assertEqual(new_spec.precision, 0.001)
+        self.assertEqual(spec.get_param('comb_chamber.T_gas'), 1400)
+        self.assertRaises(KeyError, spec.replace, {'turbine.eta_stag_p': 0.9})
+
+
+class SweepTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.spec = self.get_2N_spec()
+        self.points = [{'comb_chamber.T_gas': T_gas} for T_gas in [1300, 1400, 1500, 1600]]
+
+    def test_default_outputs(self):
+        outputs = get_default_outputs(self.spec)
+        self.assertIn('compressor.T_stag_out', outputs)
+        self.assertIn('load.consumable_labour', outputs)
+        self.assertIn('comb_chamber.g_fuel_prime', outputs)
+        self.assertIn('efficiency', outputs)
+        self.assertNotIn('zero_load1.consumable_labour', outputs)
+
+    def test_serial(self):
+        res = list(iter_solve(self.spec, iter(self.points)))
+        self.assertEqual([point_res.index for point_res in res], [0, 1, 2, 3])
+        self.assertTrue(all(point_res.converged for point_res in res))
+        self.get_2N_solver().solve()
+        self.assertAlmostEqual(res[1].outputs['comb_chamber.g_fuel_prime'], self.comb_chamber.g_fuel_prime, places=8)
+        efficiency = [point_res.outputs['efficiency'] for point_res in res]
+        self.assertEqual(efficiency, sorted(efficiency))
+
+    def test_pool(self):
+        serial_res = list(iter_solve(self.spec, self.points, outputs=['efficiency']))
+        with ThreadPoolExecutor(2) as executor:
+            thread_res = list(iter_solve(self.spec, self.points, outputs=['efficiency'], executor=executor,
+                                         chunk_size=1))
+        process_res = list(iter_solve(self.spec, self.points, outputs=['efficiency'], workers=2, chunk_size=3))
+        for res in [thread_res, process_res]:
+            self.assertEqual([point_res.index for point_res in res], [0, 1, 2, 3])
+            for point_res, serial_point_res in zip(res, serial_res):
+                self.assertAlmostEqual(point_res.outputs['efficiency'], serial_point_res.outputs['efficiency'],
+                                       places=12)
+
+    def test_not_converged(self):
+        res = solve_point(self.spec, {'max_iter_number': 2}, ['efficiency'])
+        self.assertFalse(res.converged)
+        self.assertTrue(np.isnan(res.outputs['efficiency']))
+        self.assertTrue(res.error.startswith('RuntimeError'))
+
+    def test_point_error(self):
+        res = list(iter_solve(self.spec, [{}, {'comb_chamber.T_gas': 'hot'}, {}], ['efficiency']))
+        self.assertEqual([point_res.converged for point_res in res], [True, False, True])
+        self.assertTrue(res[1].error.startswith('ValueError'))
+        self.assertTrue(np.isnan(res[1].outputs['efficiency']))
+        self.assertIsNone(res[0].error)
+
+    def test_programming_error(self):
+        self.assertRaises(KeyError, solve_point, self.spec, {}, ['efficiency', 'compressr.T_stag_out'])
+        self.assertRaises(AttributeError, solve_point, self.spec, {}, ['compressor.T_stag_outlet'])
+        self.assertRaises(KeyError, list, iter_solve(self.spec, [{}], ['compressr.T_stag_out']))
+
+    def test_point_orders(self):
+        points = [{'a': a, 'b': b} for a in range(8) for b in range(8)]
+        np.random.RandomState(0).shuffle(points)
+        for get_order in [get_serpentine_order, get_hilbert_order]:
+            order = get_order(points)
+            self.assertEqual(sorted(order), list(range(64)))
+            coords = np.array([[points[n]['a'], points[n]['b']] for n in order])
+            self.assertEqual(np.abs(np.diff(coords, axis=0)).sum(axis=1).max(), 1)
+
+    def test_order_window(self):
+        points = [{'comb_chamber.T_gas': T_gas} for T_gas in range(1300, 1500, 25)]
+        np.random.RandomState(0).shuffle(points)
+        res = list(iter_solve(self.spec, iter(points), ['efficiency'], order='serpentine', order_window=3))
+        self.assertEqual(sorted(point_res.index for point_res in res), list(range(len(points))))
+        for start in range(0, len(points), 3):
+            window = res[start:start + 3]
+            self.assertEqual(sorted(point_res.index for point_res in window),
+                             list(range(start, min(start + 3, len(points)))))
+            T_gas_arr = [point_res.params['comb_chamber.T_gas'] for point_res in window]
+            self.assertEqual(T_gas_arr, sorted(T_gas_arr))
+            for point_res in window:
+                self.assertEqual(point_res.params, points[point_res.index])
+
+    def test_ordered_warm_start(self):
+        spec = self.spec.replace({'precision': 1e-5, 'comb_chamber.precision': 1e-6})
+        points = [{'comb_chamber.T_gas': T_gas, 'atmosphere.T0': T0} for T_gas in range(1300, 1500, 40)
+                  for T0 in range(263, 313, 10)]
+        np.random.RandomState(0).shuffle(points)
+        cold_res = list(iter_solve(spec, points, ['efficiency']))
+        res = list(iter_solve(spec, points, ['efficiency'], order='hilbert', warm_start=True, chunk_size=10))
+        self.assertEqual(sorted(point_res.index for point_res in res), list(range(len(points))))
+        self.assertLess(sum(point_res.iter_number for point_res in res),
+                        sum(point_res.iter_number for point_res in cold_res))
+        for point_res in res:
+            self.assertIsNone(point_res.state)
+            self.assertAlmostEqual(point_res.outputs['efficiency'], cold_res[point_res.index].outputs['efficiency'],
+                                   places=5)
+
+    def test_warm_start(self):
+        res = solve_point(self.spec, self.points[1], ['efficiency'], keep_state=True)
+        warm_res = solve_point(self.spec, self.points[1], ['efficiency'], init_state=res.state)
+        self.assertLess(warm_res.iter_number, res.iter_number)
+        self.assertAlmostEqual(warm_res.outputs['efficiency'], res.outputs['efficiency'], places=4)
+
+
+class ResultCacheTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.temp_dir.name)
+        self.spec = self.get_2N_spec()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_spec_key(self):
+        key = get_spec_key(self.spec)
+        self.assertEqual(key, get_spec_key(NetworkSpec.from_json(self.spec.to_json())))
+        self.assertNotEqual(key, get_spec_key(self.spec.replace({'comb_chamber.T_gas': 1401})))
+        self.assertNotEqual(key, get_spec_key(self.spec.replace({'precision': 0.001})))
+        self.assertNotEqual(key, get_spec_key(self.spec.replace({'hot_work_fluid': 'KeroseneCombustionProducts'})))
+        self.assertEqual(key, get_spec_key(self.spec.replace({'comp_turbine.eta_stag_p': 0.91})))
+        defaults = Turbine.__init__.__defaults__
+        with mock.patch.object(Turbine.__init__, '__defaults__', (defaults[0], 0.9) + defaults[2:]):
+            self.assertNotEqual(key, get_spec_key(self.spec))
+        with mock.patch('gas_turbine_cycle.core.cache.get_model_hash', return_value='changed'):
+            self.assertNotEqual(key, get_spec_key(self.spec))
+
+    def test_hit(self):
+        points = [{'comb_chamber.T_gas': T_gas} for T_gas in [1300, 1400]]
+        res = list(iter_solve(self.spec, points, cache=self.cache))
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.misses, 2)
+        cached_res = list(iter_solve(self.spec, points, cache=self.cache, keep_state=True))
+        self.assertEqual(self.cache.hits, 2)
+        for point_res, cached_point_res in zip(res, cached_res):
+            self.assertFalse(point_res.cached)
+            self.assertTrue(cached_point_res.cached)
+            self.assertEqual(point_res.outputs, cached_point_res.outputs)
+            self.assertIsNotNone(cached_point_res.state)
+
+    def test_new_outputs(self):
+        solve_point(self.spec, {}, ['efficiency'], cache=self.cache)
+        res = solve_point(self.spec, {}, ['efficiency', 'compressor.T_stag_out'], cache=self.cache)
+        self.assertFalse(res.cached)
+        res = solve_point(self.spec, {}, ['efficiency', 'compressor.T_stag_out'], cache=self.cache)
+        self.assertTrue(res.cached)
+
+    def test_not_converged(self):
+        res = solve_point(self.spec, {'max_iter_number': 2}, ['efficiency'], cache=self.cache)
+        self.assertFalse(res.converged)
+        self.assertEqual(len(self.cache), 0)
+        init_state = solve_point(self.spec, {}, ['efficiency'], keep_state=True).state
+        res = solve_point(self.spec, {'max_iter_number': 2}, ['efficiency'], init_state=init_state,
+                          cache=self.cache)
+        self.assertTrue(res.converged)
+        self.assertFalse(res.cached)
+        self.assertTrue(solve_point(self.spec, {'max_iter_number': 2}, ['efficiency'], cache=self.cache).cached)
+
+    def test_eviction(self):
+        solve_point(self.spec, {'comb_chamber.T_gas': 1300}, ['efficiency'], cache=self.cache)
+        self.cache.max_size = int(self.cache.size * 1.5)
+        for T_gas in [1350, 1400]:
+            solve_point(self.spec, {'comb_chamber.T_gas': T_gas}, ['efficiency'], cache=self.cache)
+        self.assertEqual(len(self.cache), 1)
+        self.assertLessEqual(self.cache.size, self.cache.max_size)
+        self.assertTrue(solve_point(self.spec, {'comb_chamber.T_gas': 1400}, ['efficiency'], cache=self.cache).cached)
+
+
+class ResultStoreTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spec = self.get_2N_spec()
+        self.points = [{'comb_chamber.T_gas': T_gas} for T_gas in [1300, 1400, 1500]]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_columns(self):
+        with ResultStore(self.temp_dir.name, buffer_size=2) as store:
+            store.extend(iter_solve(self.spec, self.points))
+            self.assertEqual(len(store), 2)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.inputs, ['comb_chamber.T_gas'])
+        self.assertEqual(store.outputs, get_default_outputs(self.spec))
+        self.assertIsInstance(store['efficiency'], np.memmap)
+        self.assertTrue(np.all(store['converged']))
+        self.assertEqual(list(store['index']), [0, 1, 2])
+        self.assertEqual(list(store['comb_chamber.T_gas']), [1300, 1400, 1500])
+        self.get_2N_solver().solve()
+        self.assertAlmostEqual(store['comb_chamber.g_fuel_prime'][1], self.comb_chamber.g_fuel_prime, places=8)
+        arr = store.to_structured_array(['index', 'iter_number', 'efficiency'])
+        self.assertEqual(arr.dtype.names, ('index', 'iter_number', 'efficiency'))
+        self.assertEqual(arr['efficiency'][2], store['efficiency'][2])
+
+    def test_append(self):
+        with ResultStore(self.temp_dir.name) as store:
+            store.extend(iter_solve(self.spec, self.points[:2], outputs=['efficiency']))
+        with ResultStore(self.temp_dir.name) as store:
+            self.assertEqual(len(store), 2)
+            store.extend(iter_solve(self.spec, self.points[2:], outputs=['efficiency']))
+        self.assertEqual(list(ResultStore(self.temp_dir.name)['comb_chamber.T_gas']), [1300, 1400, 1500])
+
+    def test_interrupted_write(self):
+        with ResultStore(self.temp_dir.name) as store:
+            store.extend(iter_solve(self.spec, self.points[:2], outputs=['efficiency']))
+        with open(os.path.join(self.temp_dir.name, 'efficiency.bin'), 'ab') as file:
+            file.write(b'1234')
+        store = ResultStore(self.temp_dir.name)
+        self.assertEqual(os.path.getsize(os.path.join(self.temp_dir.name, 'efficiency.bin')), 16)
+        self.assertEqual(len(store['efficiency']), 2)
+
+
+class InterruptedPoints(list):
+    """Список режимов, обращение к которому прерывается на заданном режиме"""
+    def __init__(self, points, stop_index):
+        list.__init__(self, points)
+        self.stop_index = stop_index
+
+    def __getitem__(self, index):
+        if index == self.stop_index:
+            raise KeyboardInterrupt()
+        return list.__getitem__(self, index)
+
+
+class CheckpointTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spec = self.get_2N_spec()
+        self.points = [{'comb_chamber.T_gas': T_gas, 'atmosphere.T0': T0}
+                       for T_gas in [1400, 1410, 1420] for T0 in [283, 288]]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resume(self):
+        self.assertRaises(KeyboardInterrupt, run_sweep, self.spec, InterruptedPoints(self.points, 4),
+                          self.temp_dir.name, ['efficiency'], chunk_size=1, checkpoint_interval=3)
+        store = ResultStore(self.temp_dir.name)
+        self.assertEqual(list(store['index']), [0, 1, 2, 3])
+        self.assertEqual(store['state'].shape, (4, store.state_size))
+        store = run_sweep(self.spec, self.points, self.temp_dir.name, ['efficiency'])
+        self.assertEqual(sorted(store['index']), list(range(6)))
+        self.assertTrue(np.all(store['converged']))
+        cold_store = run_sweep(self.spec, self.points, os.path.join(self.temp_dir.name, 'cold'), ['efficiency'],
+                               warm_start=False)
+        self.assertLess(sum(store['iter_number'][4:]), sum(cold_store['iter_number'][4:]))
+        for index in range(6):
+            self.assertAlmostEqual(store['efficiency'][list(store['index']).index(index)],
+                                   cold_store['efficiency'][index], places=4)
+
+    def test_finished(self):
+        run_sweep(self.spec, self.points, self.temp_dir.name, ['efficiency'])
+        store = run_sweep(self.spec, self.points, self.temp_dir.name, ['efficiency'])
+        self.assertEqual(len(store), 6)
+
+
+class ContinuationTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.spec = self.get_2VIH_spec().replace({'max_iter_number': 8})
+        self.target = {'compressor.pi_c': 60, 'atmosphere.T0': 320}
+
+    def test_hard_point(self):
+        self.assertFalse(solve_point(self.spec, self.target, ['efficiency']).converged)
+        steps = []
+        res = solve_continuation(self.spec, self.target, outputs=['efficiency'], steps=steps)
+        self.assertTrue(res.converged)
+        self.assertEqual(res.iter_number, sum(step.iter_number for step in steps))
+        self.assertEqual(steps[-1].lam, 1)
+        self.assertTrue(steps[-1].converged)
+        reference = solve_point(self.spec.replace({'max_iter_number': 50}), self.target, ['efficiency'])
+        self.assertAlmostEqual(res.outputs['efficiency'], reference.outputs['efficiency'], places=3)
+
+    def test_start_failure(self):
+        self.assertRaises(RuntimeError, solve_continuation, self.spec.replace({'max_iter_number': 2}), self.target)
+
+
+class TargetTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.spec = self.get_2N_spec().replace({'precision': 1e-5, 'comb_chamber.precision': 1e-6})
+
+    def test_T_gas(self):
+        outputs = ['specific_power', 'air_flow', 'fuel_flow']
+        reference = solve_point(self.spec, {'comb_chamber.T_gas': 1450}, outputs)
+        steps = []
+        res = solve_target(self.spec, 'comb_chamber.T_gas', 'specific_power', reference.outputs['specific_power'],
+                           rel_tol=1e-6, outputs=outputs, steps=steps)
+        self.assertAlmostEqual(res.params['comb_chamber.T_gas'], 1450, places=2)
+        self.assertAlmostEqual(res.outputs['air_flow'], reference.outputs['air_flow'], places=4)
+        self.assertEqual(res.iter_number, sum(step.iter_number for step in steps))
+        self.assertLess(steps[-1].iter_number, steps[0].iter_number)
+
+    def test_pi_c(self):
+        reference = solve_point(self.spec, {'compressor.pi_c': 6}, ['heat_rate'])
+        res = solve_target(self.spec, 'compressor.pi_c', 'heat_rate', reference.outputs['heat_rate'], x0=5,
+                           rel_tol=1e-6, bounds=(1.5, 40))
+        self.assertAlmostEqual(res.params['compressor.pi_c'], 6, places=3)
+
+    def test_bounds(self):
+        self.assertRaises(RuntimeError, solve_target, self.spec, 'comb_chamber.T_gas', 'specific_power', 4e5,
+                          bounds=(None, 1420))
+
+
+class SensitivityTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.spec = self.get_2N_spec().replace({'precision': 1e-5, 'comb_chamber.precision': 1e-6})
+        self.outputs = ['efficiency', 'specific_power', 'outlet.T_stag_out']
+        self.inputs = ['compressor.eta_stag_p', 'inlet.sigma', 'comb_chamber.T_gas', 'sink.g_cooling']
+
+    def test_rel_step(self):
+        self.assertLess(get_rel_step(self.spec.replace({'power_turbine.precision': 1e-6, 'comp_turbine.precision':
+                                                        1e-6})), get_rel_step(self.spec))
+
+    def test_derivatives(self):
+        res = sensitivities(self.spec, self.outputs, self.inputs, rel_step=1e-3)
+        self.assertEqual(res.derivatives.shape, (3, 4))
+        self.assertGreater(res.get('efficiency', 'compressor.eta_stag_p'), 0)
+        self.assertGreater(res.get('specific_power', 'comb_chamber.T_gas'), 0)
+        self.assertLess(res.get('specific_power', 'sink.g_cooling'), 0)
+        self.assertGreater(res.get('outlet.T_stag_out', 'comb_chamber.T_gas'), 0)
+        T_gas_step = 50
+        lower = solve_point(self.spec, {'comb_chamber.T_gas': 1400 - T_gas_step}, ['specific_power'])
+        upper = solve_point(self.spec, {'comb_chamber.T_gas': 1400 + T_gas_step}, ['specific_power'])
+        derivative = (upper.outputs['specific_power'] - lower.outputs['specific_power']) / (2 * T_gas_step)
+        self.assertAlmostEqual(res.get('specific_power', 'comb_chamber.T_gas') / derivative, 1, places=2)
+        self.assertAlmostEqual(res.elasticities[1, 2], res.get('specific_power', 'comb_chamber.T_gas') * 1400 /
+                               res.base_outputs['specific_power'])
+
+    def test_bounds(self):
+        for sigma in (0.99, 1):
+            spec = self.spec.replace({'inlet.sigma': sigma})
+            res = sensitivities(spec, ['specific_power'], ['inlet.sigma'], rel_step=0.05)
+            lower = solve_point(spec, {'inlet.sigma': sigma * 0.95}, ['specific_power'])
+            upper = solve_point(spec, {'inlet.sigma': 1}, ['specific_power'])
+            derivative = (upper.outputs['specific_power'] - lower.outputs['specific_power']) / (1 - sigma * 0.95)
+            self.assertTrue(np.isfinite(res.get('specific_power', 'inlet.sigma')))
+            self.assertGreater(res.get('specific_power', 'inlet.sigma'), 0)
+            self.assertAlmostEqual(res.get('specific_power', 'inlet.sigma') / derivative, 1, places=6)
+        self.assertEqual(get_param_bounds('inlet.sigma'), (0, 1))
+        self.assertEqual(get_param_bounds('comb_chamber.T_gas'), (None, None))
+
+    def test_parallel(self):
+        res = sensitivities(self.spec, self.outputs, self.inputs, rel_step=1e-3)
+        with ThreadPoolExecutor(2) as executor:
+            parallel_res = sensitivities(self.spec, self.outputs, self.inputs, rel_step=1e-3, executor=executor)
+        self.assertTrue(np.allclose(res.derivatives, parallel_res.derivatives))
+
+
+class PrecisionExplorationTests(SchemesTestCase):
+    def setUp(self):
+        SchemesTestCase.setUp(self)
+        self.spec = self.get_2N_spec()
+
+    def test_setting_params(self):
+        self.assertEqual(get_setting_params(self.spec, 'Turbine'), ['comp_turbine.precision',
+                                                                    'power_turbine.precision'])
+        self.assertEqual(get_setting_params(self.spec, 'max_iter_number'), ['max_iter_number'])
+        self.assertEqual(get_setting_params(self.spec, 'comb_chamber.precision'), ['comb_chamber.precision'])
+        self.assertRaises(KeyError, get_setting_params, self.spec, 'compressor2.precision')
+        self.assertRaises(ValueError, get_setting_params, self.spec, 'Compressor')
+        self.assertRaises(ValueError, get_setting_params, self.spec, 'FullExtensionNozzle')
+        self.assertRaises(ValueError, get_setting_params, self.spec, 'compressor.precision')
+
+    def test_recommendation(self):
+        res = explore_precision(self.spec, {'CombustionChamber': [1e-2, 1e-5], 'Turbine': [1e-2, 1e-5],
+                                            'precision': [1e-2, 1e-5]})
+        self.assertEqual(len(res.trials), 8)
+        loose = res.trials[0]
+        tight = res.trials[-1]
+        self.assertEqual(tight.settings, {'CombustionChamber': 1e-5, 'Turbine': 1e-5, 'precision': 1e-5})
+        self.assertLess(tight.max_error, 1e-4)
+        self.assertLess(tight.max_error, loose.max_error)
+        recommended = res.recommend(1e-4)
+        self.assertEqual(recommended.settings['Turbine'], 1e-5)
+        self.assertLessEqual(recommended.time, tight.time)
+        self.assertIsNotNone(res.recommend(1))
+        self.assertIsNone(res.recommend(-1))
+        self.assertEqual(len(str(res).split('\n')), 9)
+
+
 if __name__ == '__main__':
-    unittest.main(verbosity=1)
\ No newline at end of file
+    unittest.main(verbosity=1)